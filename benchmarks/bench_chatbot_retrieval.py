@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark EnhancedChatbot._find_best_match against the original linear scan.
+
+Every line of data/dialogs.txt (both sides of each exchange) is used as a
+query. The script checks that the indexed word-overlap lookup returns the
+same responses as the linear scan and reports per-query latency for both.
+With --bm25-scale it also times BM25 retrieval on synthetic pattern sets
+that are N times the size of dialogs.txt, to show its cost stays flat.
+"""
+
+import os
+import io
+import sys
+import time
+import argparse
+import contextlib
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from utils.enhanced_chatbot import EnhancedChatbot
+
+DIALOGS_PATH = os.path.join(project_root, 'data', 'dialogs.txt')
+
+
+def linear_scan_match(chat_pairs, user_input):
+    """The original O(patterns x words) scan, kept here as the reference."""
+    normalized_input = user_input.lower().strip()
+
+    if normalized_input in chat_pairs:
+        return chat_pairs[normalized_input]
+
+    best_match = None
+    max_overlap = 0
+
+    for pattern in chat_pairs.keys():
+        words = set(normalized_input.split())
+        pattern_words = set(pattern.split())
+        overlap = len(words.intersection(pattern_words))
+
+        if overlap > max_overlap:
+            max_overlap = overlap
+            best_match = pattern
+
+    if best_match and max_overlap >= 1:
+        return chat_pairs[best_match]
+
+    return None
+
+
+def load_queries(path=DIALOGS_PATH):
+    """Both sides of every dialog line, plus a perturbed variant that forces partial matching."""
+    queries = []
+    with open(path, 'r') as f:
+        for line in f:
+            for part in line.strip().split("\t"):
+                if part:
+                    queries.append(part)
+                    queries.append(part + " please")
+    return queries
+
+
+def time_queries(match_fn, queries):
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(match_fn(query))
+        latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+def synthetic_patterns(patterns, scale):
+    """Grow the pattern list `scale` times with distinct variants of each pattern."""
+    grown = list(patterns)
+    for copy in range(1, scale):
+        grown.extend(f"{pattern} variant{copy} topic{(i * 7 + copy) % 997}" for i, pattern in enumerate(patterns))
+    return grown
+
+
+def bench_bm25(patterns, queries, scales):
+    """Time BM25 retrieval over increasingly large synthetic pattern sets."""
+    from utils.chatbot_retrieval import BM25Index
+
+    for scale in scales:
+        grown = synthetic_patterns(patterns, scale)
+        start = time.perf_counter()
+        index = BM25Index.build(grown)
+        build_time = time.perf_counter() - start
+        _, latencies = time_queries(index.best, queries)
+        stats = summarize(latencies)
+        print(f"bm25 x{scale:<4} patterns={len(grown):<8} build={build_time:.2f}s "
+              f"mean={stats['mean_us']:.1f}us p50={stats['p50_us']:.1f}us p95={stats['p95_us']:.1f}us")
+
+
+def summarize(latencies):
+    values = sorted(latencies)
+    pick = lambda pct: values[min(len(values) - 1, int(pct / 100.0 * len(values)))] * 1e6
+    return {
+        'total_s': sum(values),
+        'mean_us': sum(values) / len(values) * 1e6,
+        'p50_us': pick(50),
+        'p95_us': pick(95),
+        'p99_us': pick(99),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare indexed and linear chatbot retrieval.")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N queries")
+    parser.add_argument("--bm25-scale", type=int, nargs="*", default=[],
+                        help="Also time BM25 on synthetic corpora this many times larger (e.g. 1 10 100)")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        chatbot = EnhancedChatbot(retrieval="overlap")
+
+    queries = load_queries()[:args.limit]
+    print(f"Patterns: {len(chatbot.chat_pairs)}  Queries: {len(queries)}")
+
+    # The reference scan runs over a plain dict, as the original pickled model did
+    reference_pairs = dict(chatbot.chat_pairs.items())
+    indexed_results, indexed_latencies = time_queries(chatbot._find_best_match, queries)
+    linear_results, linear_latencies = time_queries(lambda q: linear_scan_match(reference_pairs, q), queries)
+
+    mismatches = [q for q, a, b in zip(queries, indexed_results, linear_results) if a != b]
+
+    for name, latencies in (("linear scan", linear_latencies), ("inverted index", indexed_latencies)):
+        stats = summarize(latencies)
+        print(f"{name:<15} total={stats['total_s']:.3f}s mean={stats['mean_us']:.1f}us "
+              f"p50={stats['p50_us']:.1f}us p95={stats['p95_us']:.1f}us p99={stats['p99_us']:.1f}us")
+
+    speedup = sum(linear_latencies) / max(sum(indexed_latencies), 1e-9)
+    print(f"Speedup: {speedup:.1f}x")
+
+    if args.bm25_scale:
+        bench_bm25(list(chatbot.chat_pairs.keys()), queries[:2000], args.bm25_scale)
+
+    if mismatches:
+        print(f"[ERROR] {len(mismatches)} queries returned different responses, e.g. '{mismatches[0]}'")
+        sys.exit(1)
+    print("[SUCCESS] Indexed retrieval matches the linear scan on every query")
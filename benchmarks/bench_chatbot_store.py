@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Compare opening the chatbot model as a pickled dict vs. a memory-mapped ChatStore.
+
+A synthetic corpus N times the size of the trained model (default 10x) is
+written in both formats. Each format is then opened in a fresh Python
+process, which reports the load time, the RSS added by loading, and the
+latency of exact and token lookups, so neither run benefits from the other's
+imports or allocations.
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import argparse
+import tempfile
+import subprocess
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from utils.chatbot_store import ChatStore, load_chat_model, write_chat_store
+
+MODEL_PATH = os.path.join(project_root, 'models', 'chatbot_model.bin')
+
+
+def synthetic_corpus(chat_pairs, scale):
+    """Grow a trigger -> responses mapping `scale` times with distinct variants of each entry."""
+    grown = {trigger: list(responses) for trigger, responses in chat_pairs.items()}
+    for copy in range(1, scale):
+        for i, (trigger, responses) in enumerate(chat_pairs.items()):
+            topic = (i * 7 + copy) % 997
+            grown[f"{trigger} variant{copy} topic{topic}"] = [f"{r} ({copy})" for r in responses]
+    return grown
+
+
+def current_rss_kb():
+    """Resident set size of this process in KiB (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(path, queries_path):
+    """Open one model file and print its measurements as JSON."""
+    with open(queries_path) as f:
+        queries = json.load(f)
+
+    rss_before = current_rss_kb()
+    start = time.perf_counter()
+    chat_pairs = load_chat_model(path)
+    load_s = time.perf_counter() - start
+    rss_after_load = current_rss_kb()
+
+    start = time.perf_counter()
+    hits = sum(1 for query in queries if chat_pairs.get(query) is not None)
+    lookup_s = time.perf_counter() - start
+
+    # Token lookups go through the index the chatbot would use for partial matches
+    if isinstance(chat_pairs, ChatStore):
+        index = chat_pairs.token_index
+    else:
+        from collections import defaultdict
+        start_index = time.perf_counter()
+        built = defaultdict(list)
+        for pattern_id, pattern in enumerate(chat_pairs.keys()):
+            for token in set(pattern.split()):
+                built[token].append(pattern_id)
+        index = dict(built)
+        load_s += time.perf_counter() - start_index
+    tokens = [token for query in queries for token in query.split()]
+    start = time.perf_counter()
+    postings = sum(len(index[token]) for token in tokens if token in index)
+    token_s = time.perf_counter() - start
+
+    print(json.dumps({
+        'load_ms': load_s * 1e3,
+        'rss_load_mb': (rss_after_load - rss_before) / 1024,
+        'rss_total_mb': current_rss_kb() / 1024,
+        'exact_us': lookup_s / len(queries) * 1e6,
+        'token_us': token_s / max(len(tokens), 1) * 1e6,
+        'hits': hits,
+        'postings': postings,
+    }))
+
+
+def run_child(path, queries_path):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', path, '--child-queries', queries_path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare pickle and memory-mapped chatbot model loading.")
+    parser.add_argument("--scale", type=int, default=10, help="Size of the synthetic corpus relative to the model")
+    parser.add_argument("--queries", type=int, default=2000, help="Number of lookups timed per format")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--child-queries", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.child_queries)
+        sys.exit(0)
+
+    base = load_chat_model(MODEL_PATH)
+    corpus = synthetic_corpus(dict(base.items()), args.scale)
+    triggers = list(corpus.keys())
+    step = max(1, len(triggers) // args.queries)
+    queries = [trigger if i % 2 else trigger + " please" for i, trigger in enumerate(triggers[::step][:args.queries])]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = os.path.join(tmp, 'chatbot_model.pkl')
+        store_path = os.path.join(tmp, 'chatbot_model.bin')
+        queries_path = os.path.join(tmp, 'queries.json')
+        with open(pickle_path, 'wb') as f:
+            pickle.dump(corpus, f)
+        write_chat_store(corpus, store_path)
+        with open(queries_path, 'w') as f:
+            json.dump(queries, f)
+
+        print(f"Triggers: {len(corpus)} (x{args.scale})  Queries: {len(queries)}")
+        results = {}
+        for name, path in (("pickle", pickle_path), ("chat store", store_path)):
+            results[name] = stats = run_child(path, queries_path)
+            stats['file_mb'] = os.path.getsize(path) / 1e6
+            print(f"{name:<11} file={stats['file_mb']:6.1f}MB load={stats['load_ms']:8.1f}ms "
+                  f"rss+={stats['rss_load_mb']:6.1f}MB exact={stats['exact_us']:5.1f}us token={stats['token_us']:5.2f}us")
+
+    pickled, mapped = results["pickle"], results["chat store"]
+    if (pickled['hits'], pickled['postings']) != (mapped['hits'], mapped['postings']):
+        print("[ERROR] The two formats returned different lookup results")
+        sys.exit(1)
+    print(f"Load speedup: {pickled['load_ms'] / max(mapped['load_ms'], 1e-9):.0f}x  "
+          f"RSS saved: {pickled['rss_load_mb'] - mapped['rss_load_mb']:.1f}MB  "
+          f"File size: {mapped['file_mb'] / pickled['file_mb']:.2f}x the pickle (includes the token index)  "
+          f"Exact lookup: {mapped['exact_us'] / max(pickled['exact_us'], 1e-9):.1f}x the dict's time")
+    print("[SUCCESS] Both formats returned the same lookups")
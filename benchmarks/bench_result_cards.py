@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Measure UI frame time per results update: rebuilt cards vs. the recycled card pool.
+
+Each round renders a fresh list of fake tracks into a CTkScrollableFrame
+and then runs `update()`, so the time includes widget creation/destruction,
+geometry and drawing - everything the Tk thread does before it can paint
+the next frame. "rebuild" reproduces the original update_results_display
+(destroy every card, build a new widget tree per result); "pool" uses
+ResultCardPool. Needs a display (on a headless machine run under xvfb-run).
+"""
+
+import os
+import sys
+import time
+import argparse
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+import customtkinter as ctk
+
+from utils.result_cards import ResultCardPool
+
+
+def fake_results(count, round_number):
+    return [
+        {
+            "title": f"Track {round_number}-{i}",
+            "subtitle": f"by Artist {i % 7}",
+            "icon": "♪" if i % 2 else "♫",
+            "url": f"https://open.spotify.com/track/{round_number}{i}",
+            "name": f"Track {round_number}-{i}",
+            "metrics": f"Tracks: {i * 3} • Followers: {i * 100}" if i % 2 else None,
+        }
+        for i in range(count)
+    ]
+
+
+def rebuild_card(parent, title, subtitle, icon, url, name, metrics=None):
+    """The per-result widget tree the app used to build on every search."""
+    card = ctk.CTkFrame(parent, fg_color="#1E293B", corner_radius=10, cursor="hand2")
+    card.grid_columnconfigure(0, weight=1)
+    card.bind("<Button-1>", lambda e: None)
+    card.bind("<Enter>", lambda e: card.configure(fg_color="#2D3748"))
+    card.bind("<Leave>", lambda e: card.configure(fg_color="#1E293B"))
+    content = ctk.CTkFrame(card, fg_color="transparent")
+    content.grid(row=0, column=0, sticky="nsew", padx=10, pady=5)
+    content.grid_columnconfigure(1, weight=1)
+    ctk.CTkLabel(content, text=icon, font=("Arial", 20, "bold"), text_color="#3B82F6").grid(
+        row=0, column=0, rowspan=3, padx=(5, 10))
+    ctk.CTkLabel(content, text=title, font=("Poppins", 14, "bold"), text_color="white",
+                 anchor="w", justify="left").grid(row=0, column=1, sticky="w")
+    ctk.CTkLabel(content, text=subtitle, font=("Poppins", 12), text_color="#94A3B8",
+                 anchor="w", justify="left").grid(row=1, column=1, sticky="w", pady=(2, 0))
+    if metrics:
+        ctk.CTkLabel(content, text=metrics, font=("Poppins", 11), text_color="#64748B",
+                     anchor="w", justify="left").grid(row=2, column=1, sticky="w", pady=(2, 0))
+    return card
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def run(mode, root, frame, results_per_update, rounds):
+    pool = ResultCardPool(frame, lambda url, name: None) if mode == "pool" else None
+    frame_times = []
+    for round_number in range(rounds):
+        items = fake_results(results_per_update, round_number)
+        start = time.perf_counter()
+        if pool is not None:
+            pool.render(items)
+        else:
+            for widget in frame.winfo_children():
+                widget.destroy()
+            for item in items:
+                rebuild_card(frame, **item).pack(fill="x", padx=5, pady=2)
+        root.update()
+        frame_times.append(time.perf_counter() - start)
+    widgets = count_widgets(frame)
+    for widget in frame.winfo_children():
+        widget.destroy()
+    return frame_times, widgets
+
+
+def summarize(frame_times):
+    values = sorted(frame_times)
+    return {
+        'mean_ms': sum(values) / len(values) * 1e3,
+        'p50_ms': values[len(values) // 2] * 1e3,
+        'p95_ms': values[min(len(values) - 1, int(0.95 * len(values)))] * 1e3,
+        'max_ms': values[-1] * 1e3,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Frame time per results update: rebuilt vs pooled cards.")
+    parser.add_argument("--results", type=int, nargs="+", default=[10, 50],
+                        help="Results per update (lists longer than a page exercise paging)")
+    parser.add_argument("--rounds", type=int, default=30, help="Updates per configuration")
+    args = parser.parse_args()
+
+    try:
+        root = ctk.CTk()
+    except Exception as e:
+        print(f"[ERROR] A display is required to measure frame times: {e}")
+        sys.exit(1)
+    root.geometry("500x700")
+    frame = ctk.CTkScrollableFrame(root)
+    frame.pack(fill="both", expand=True)
+    root.update()
+
+    for count in args.results:
+        for mode in ("rebuild", "pool"):
+            frame_times, widgets = run(mode, root, frame, count, args.rounds)
+            stats = summarize(frame_times[1:] or frame_times)  # The first pooled round builds the cards
+            print(f"{count:>4} results  {mode:<8} mean={stats['mean_ms']:7.2f}ms p50={stats['p50_ms']:7.2f}ms "
+                  f"p95={stats['p95_ms']:7.2f}ms max={stats['max_ms']:7.2f}ms widgets={widgets}")
+    root.destroy()
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Load-test server.py against the local Spotify stand-in.
+
+Starts benchmarks/spotify_standin.py and server.py as subprocesses (the
+server is pointed at the stand-in through SPOTIFY_TOKEN_URL/SPOTIFY_API_URL
+and dummy credentials). Then --users virtual users each open a keep-alive
+connection and session and send --messages chat messages back to back.
+Reports throughput, latency percentiles and status codes; 429/503 mean the
+server shed load as designed. Also shows the server's and the stand-in's
+own counters.
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from utils.async_http import Connection
+
+DEFAULT_MESSAGES = [
+    "I'm feeling really happy today",
+    "I feel sad and lonely",
+    "play faded by alan walker",
+    "find songs by taylor swift",
+    "I want music for studying",
+    "music for my workout",
+    "hello",
+    "I'm so angry right now",
+    "something calm please",
+    "help",
+]
+
+
+async def wait_for_health(host, port, path, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        connection = Connection(host, port)
+        try:
+            status, _, body = await connection.request("GET", path, timeout=2)
+            if status == 200:
+                return body
+        except (OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            await connection.close()
+        await asyncio.sleep(0.25)
+    raise RuntimeError(f"{host}:{port} did not come up within {timeout}s")
+
+
+async def virtual_user(user_id, host, port, messages, count, think_time, latencies, statuses):
+    connection = Connection(host, port)
+    session_id = f"load-user-{user_id}"
+    rng = random.Random(user_id)
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                status, _, _ = await connection.request(
+                    "POST", "/chat", {"session_id": session_id, "message": rng.choice(messages)}, timeout=60
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            if think_time:
+                await asyncio.sleep(think_time)
+    finally:
+        await connection.close()
+
+
+async def run_load(args, messages):
+    await wait_for_health(args.host, args.standin_port, "/stats", 30)
+    await wait_for_health(args.host, args.port, "/health", 120)
+
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        virtual_user(i, args.host, args.port, messages, args.messages, args.think_ms / 1000.0, latencies, statuses)
+        for i in range(args.users)
+    ))
+    elapsed = time.perf_counter() - start
+
+    server_stats = await wait_for_health(args.host, args.port, "/health", 5)
+    standin_stats = await wait_for_health(args.host, args.standin_port, "/stats", 5)
+    return latencies, statuses, elapsed, server_stats, standin_stats
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(p * len(values)))] * 1e3 if values else 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the HTTP service against a Spotify stand-in.")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent virtual users (one session each)")
+    parser.add_argument("--messages", type=int, default=10, help="Messages per user")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between a user's messages")
+    parser.add_argument("--messages-file", help="One message per line (default: a built-in mix)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="Port for server.py")
+    parser.add_argument("--standin-port", type=int, default=9765, help="Port for the Spotify stand-in")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="Stand-in latency per Spotify call")
+    parser.add_argument("--server-args", default="", help="Extra arguments for server.py (quoted)")
+    args = parser.parse_args()
+
+    messages = DEFAULT_MESSAGES
+    if args.messages_file:
+        with open(args.messages_file, "r", encoding="utf-8") as f:
+            messages = [line.strip() for line in f if line.strip()]
+
+    env = dict(os.environ)
+    env.update({
+        "SPOTIPY_CLIENT_ID": "standin-client-id",
+        "SPOTIPY_CLIENT_SECRET": "standin-client-secret",
+        "SPOTIFY_TOKEN_URL": f"http://{args.host}:{args.standin_port}/api/token",
+        "SPOTIFY_API_URL": f"http://{args.host}:{args.standin_port}/v1/",
+    })
+    standin = subprocess.Popen(
+        [sys.executable, os.path.join(script_dir, "spotify_standin.py"), "--host", args.host,
+         "--port", str(args.standin_port), "--latency-ms", str(args.latency_ms)],
+        cwd=project_root, stdout=subprocess.DEVNULL,
+    )
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(project_root, "server.py"), "--host", args.host, "--port", str(args.port),
+         "--quiet", *args.server_args.split()],
+        cwd=project_root, env=env, stderr=subprocess.DEVNULL,
+    )
+    try:
+        latencies, statuses, elapsed, server_stats, standin_stats = asyncio.run(run_load(args, messages))
+    finally:
+        for process in (server, standin):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"\nUsers: {args.users}   messages/user: {args.messages}   stand-in latency: {args.latency_ms:.0f}ms")
+    print(f"Requests: {total} in {elapsed:.2f}s -> {total / elapsed:.1f} req/s")
+    print(f"Latency: p50={percentile(latencies, 0.5):.0f}ms p95={percentile(latencies, 0.95):.0f}ms "
+          f"p99={percentile(latencies, 0.99):.0f}ms max={percentile(latencies, 1.0):.0f}ms")
+    print(f"Status codes: {', '.join(f'{k}={v}' for k, v in sorted(statuses.items(), key=lambda kv: str(kv[0])))}")
+    print(f"Server: {server_stats}")
+    print(f"Stand-in: {standin_stats}")
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark speech recognition backends on a folder of recorded utterances.
+
+Every .wav/.aiff/.flac file (and .raw/.pcm files, read as mono 16-bit PCM at
+--sample-rate) in the folder is decoded by each backend. Per backend the
+script reports the real-time factor (decode time / audio duration; below 1
+is faster than real time) and end-to-end latency (file read + decode).
+
+Reference transcripts are optional: either `<utterance>.txt` next to the
+audio file or a `transcripts.tsv` (filename<TAB>text) in the folder. When
+present, the word error rate is reported too.
+
+With --streaming, each utterance is also replayed in real time through
+SpeechToTextConverter.recognize_stream (VAD segmentation with overlapped
+decoding), and the delay between the end of the audio and the final
+transcript is reported next to the whole-utterance decode time.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+import speech_recognition as sr
+
+from utils.speech_backends import BACKENDS, get_backend
+from utils.voice_input import SpeechToTextConverter
+
+AUDIO_EXTENSIONS = ('.wav', '.aiff', '.aif', '.flac')
+PCM_EXTENSIONS = ('.raw', '.pcm')
+
+
+def load_utterances(folder):
+    """Return [(path, reference_text_or_None)] for every audio file in the folder."""
+    references = {}
+    tsv_path = os.path.join(folder, 'transcripts.tsv')
+    if os.path.exists(tsv_path):
+        with open(tsv_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t", 1)
+                if len(parts) == 2:
+                    references[parts[0]] = parts[1]
+
+    utterances = []
+    for filename in sorted(os.listdir(folder)):
+        stem, ext = os.path.splitext(filename)
+        if ext.lower() not in AUDIO_EXTENSIONS + PCM_EXTENSIONS:
+            continue
+        reference = references.get(filename)
+        txt_path = os.path.join(folder, stem + '.txt')
+        if reference is None and os.path.exists(txt_path):
+            with open(txt_path, 'r', encoding='utf-8') as f:
+                reference = f.read().strip()
+        utterances.append((os.path.join(folder, filename), reference))
+    return utterances
+
+
+def load_audio(path, sample_rate):
+    if path.lower().endswith(PCM_EXTENSIONS):
+        with open(path, 'rb') as f:
+            return SpeechToTextConverter.pcm_to_audio(f, sample_rate=sample_rate)
+    return SpeechToTextConverter.load_file(path)
+
+
+def audio_duration(audio):
+    return len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance and reference length."""
+    ref, hyp = reference.lower().split(), (hypothesis or "").lower().split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def bench_backend(backend, utterances, sample_rate):
+    """Decode every utterance; return per-utterance rows, or None if the backend is unavailable."""
+    rows = []
+    for path, reference in utterances:
+        start = time.perf_counter()
+        audio = load_audio(path, sample_rate)
+        decode_start = time.perf_counter()
+        try:
+            text = backend.recognize(audio)
+        except sr.UnknownValueError:
+            text = None
+        except sr.RequestError as e:
+            print(f"[WARNING] Skipping backend '{backend.name}': {e}")
+            return None
+        end = time.perf_counter()
+
+        duration = audio_duration(audio)
+        rows.append({
+            'file': os.path.basename(path),
+            'duration_s': duration,
+            'decode_s': end - decode_start,
+            'latency_s': end - start,
+            'rtf': (end - decode_start) / duration if duration else 0.0,
+            'text': text,
+            'errors': word_errors(reference, text) if reference is not None else None,
+        })
+    return rows
+
+
+def realtime_buffers(audio, chunk_frames=1024):
+    """Yield the audio in microphone-sized buffers at real-time pace."""
+    step = chunk_frames * audio.sample_width
+    for offset in range(0, len(audio.frame_data), step):
+        time.sleep(chunk_frames / float(audio.sample_rate))
+        yield audio.frame_data[offset:offset + step]
+
+
+def bench_streaming(backend, utterances, sample_rate, energy_threshold):
+    """Replay each utterance in real time; return the delays (s) from end of audio to final text."""
+    converter = SpeechToTextConverter(backend=backend)
+    converter.recognizer.energy_threshold = energy_threshold
+    delays = []
+    skipped = 0
+    for path, _ in utterances:
+        audio = load_audio(path, sample_rate)
+        finished_at = []
+
+        def buffers():
+            yield from realtime_buffers(audio)
+            finished_at.append(time.perf_counter())
+
+        try:
+            converter.recognize_stream(buffers(), audio.sample_rate, audio.sample_width,
+                                       timeout=audio_duration(audio) + 1, phrase_time_limit=None)
+        except sr.WaitTimeoutError:
+            continue
+        done = time.perf_counter()
+        if not finished_at:
+            # The VAD ended the utterance before the replay reached the end of the audio,
+            # so there is no end-of-audio time to measure from; recording 0 would flatter the latency
+            skipped += 1
+            continue
+        delays.append(max(0.0, done - finished_at[0]))
+    if skipped:
+        print(f"[INFO] {backend.name}: {skipped} utterance(s) ended by the VAD before the audio did; "
+              f"left out of the streaming delay")
+    return delays
+
+
+def summarize(rows):
+    latencies = sorted(row['latency_s'] for row in rows)
+    pick = lambda pct: latencies[min(len(latencies) - 1, int(pct / 100.0 * len(latencies)))] * 1e3
+    audio_s = sum(row['duration_s'] for row in rows)
+    decode_s = sum(row['decode_s'] for row in rows)
+    scored = [row['errors'] for row in rows if row['errors'] is not None]
+    return {
+        'utterances': len(rows),
+        'audio_s': audio_s,
+        'rtf': decode_s / audio_s if audio_s else 0.0,
+        'latency_p50_ms': pick(50),
+        'latency_p95_ms': pick(95),
+        'latency_max_ms': latencies[-1] * 1e3,
+        'recognized': sum(1 for row in rows if row['text']),
+        'wer': sum(e for e, _ in scored) / max(sum(n for _, n in scored), 1) if scored else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare speech recognition backends on recorded utterances.")
+    parser.add_argument("folder", help="Folder of .wav/.flac/.aiff (or .raw/.pcm) utterances")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), help="Backends to compare")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="Sample rate of .raw/.pcm files")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N utterances")
+    parser.add_argument("--json", action="store_true", help="Print per-utterance rows as JSON")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Also replay utterances in real time through streaming VAD recognition")
+    parser.add_argument("--energy-threshold", type=float, default=300,
+                        help="VAD energy threshold for --streaming (speech_recognition's default is 300)")
+    args = parser.parse_args()
+
+    utterances = load_utterances(args.folder)[:args.limit]
+    if not utterances:
+        print(f"[ERROR] No audio files found in {args.folder}")
+        sys.exit(1)
+    print(f"Utterances: {len(utterances)}  "
+          f"with transcripts: {sum(1 for _, reference in utterances if reference is not None)}")
+
+    report = {}
+    for name in args.backends:
+        rows = bench_backend(get_backend(name), utterances, args.sample_rate)
+        if rows is None:
+            continue
+        stats = summarize(rows)
+        report[name] = {'summary': stats, 'rows': rows}
+        wer = f"{stats['wer']:.1%}" if stats['wer'] is not None else "n/a"
+        print(f"{name:<8} audio={stats['audio_s']:.1f}s RTF={stats['rtf']:.3f} "
+              f"latency p50={stats['latency_p50_ms']:.0f}ms p95={stats['latency_p95_ms']:.0f}ms "
+              f"max={stats['latency_max_ms']:.0f}ms recognized={stats['recognized']}/{stats['utterances']} WER={wer}")
+
+        if args.streaming:
+            delays = sorted(bench_streaming(get_backend(name), utterances, args.sample_rate, args.energy_threshold))
+            if delays:
+                stats['streaming_final_delay_p50_ms'] = delays[len(delays) // 2] * 1e3
+                stats['streaming_final_delay_max_ms'] = delays[-1] * 1e3
+                whole = sorted(row['decode_s'] for row in rows)
+                print(f"{'':<8} streaming: final text {stats['streaming_final_delay_p50_ms']:.0f}ms "
+                      f"(max {stats['streaming_final_delay_max_ms']:.0f}ms) after the audio ends, "
+                      f"vs {whole[len(whole) // 2] * 1e3:.0f}ms to decode the whole utterance")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    if not report:
+        print("[ERROR] No backend could be benchmarked")
+        sys.exit(1)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Measure how long `import app` takes and fail if it exceeds a budget.
+
+Each run imports the app in a fresh interpreter with `-X importtime` and
+reads the cumulative time of the `app` entry, so interpreter startup and
+site hooks are excluded. The slowest modules imported directly by the app
+are listed to point at the regression. It also fails if any module that
+should be deferred to first use (plotting, sklearn, spotipy,
+speech_recognition, ...) was imported at startup, since that usually means a
+new top-level import. Exits with status 1 on failure, so it can gate CI.
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+DEFERRED_MODULES = [
+    'matplotlib', 'seaborn', 'pandas', 'sklearn', 'scipy', 'numpy',
+    'joblib', 'spotipy', 'requests', 'speech_recognition', 'pyaudio',
+]
+
+CHILD_CODE = (
+    "import sys, app; "
+    "print(','.join(m for m in sys.argv[1:] if m in sys.modules))"
+)
+
+
+def parse_importtime(stderr):
+    """Return ({module: cumulative_us}, [(cumulative_us, module)] for direct imports of app)."""
+    totals = {}
+    children = []
+    pending = []  # Entries are printed after their own imports, so app's children precede it
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        module = name.strip()
+        cumulative_us = int(cumulative_us)
+        totals.setdefault(module, cumulative_us)
+        if module == 'app' and depth == 0:
+            children = pending
+            break
+        if depth == 1:
+            pending.append((cumulative_us, module))
+        elif depth == 0:
+            pending = []
+    return totals, sorted(children, reverse=True)
+
+
+def measure_once():
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD_CODE, *DEFERRED_MODULES],
+        cwd=project_root, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise RuntimeError("Importing app failed")
+    totals, children = parse_importtime(result.stderr)
+    loaded = [m for m in result.stdout.strip().splitlines()[-1].split(',') if m] if result.stdout.strip() else []
+    return totals['app'] / 1000.0, children, loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time `import app` with -X importtime against a budget.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument("--budget-ms", type=float, default=300.0,
+                        help="Fail if the median import time exceeds this (ms)")
+    parser.add_argument("--top", type=int, default=8, help="Slowest direct imports to list")
+    args = parser.parse_args()
+
+    times = []
+    for run in range(args.runs):
+        total_ms, children, loaded = measure_once()
+        times.append(total_ms)
+        print(f"[INFO] Run {run + 1}: import app took {total_ms:.1f} ms")
+
+    times_sorted = sorted(times)
+    median_ms = times_sorted[len(times_sorted) // 2]
+    print(f"\nFirst run: {times[0]:.1f} ms   median: {median_ms:.1f} ms   max: {times_sorted[-1]:.1f} ms   "
+          f"budget: {args.budget_ms:.0f} ms")
+    print(f"\nSlowest modules imported by app (last run):")
+    for cumulative_us, module in children[:args.top]:
+        print(f"  {cumulative_us / 1000.0:8.1f} ms  {module}")
+
+    failed = False
+    if loaded:
+        print(f"\n[ERROR] Imported at startup but should be deferred to first use: {', '.join(loaded)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"\n[ERROR] Startup regressed: median {median_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print(f"\n[SUCCESS] Startup within budget")
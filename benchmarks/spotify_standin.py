@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+A local stand-in for the Spotify Web API, for load tests.
+
+It implements just what the app calls: the client-credentials token
+endpoint, /v1/search for tracks, artists and playlists, and
+/v1/artists/<id>/top-tracks. Results are deterministic fakes derived from
+the query. Each API call waits --latency-ms (plus up to --jitter-ms) to
+simulate the network round trip. GET /stats reports request counts and the
+peak number of concurrent requests.
+
+Point the app at it with:
+    SPOTIFY_TOKEN_URL=http://127.0.0.1:9090/api/token
+    SPOTIFY_API_URL=http://127.0.0.1:9090/v1/
+"""
+
+import os
+import sys
+import random
+import asyncio
+import hashlib
+import argparse
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from utils.async_http import HTTPError, connection_handler
+
+
+def _seed(text):
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def fake_track(query, i):
+    n = _seed(query) + i
+    artist = f"Artist {n % 97}"
+    return {
+        "name": f"{query.title()[:40]} Song {i}",
+        "artists": [{"name": artist, "uri": f"spotify:artist:{n % 97}"}],
+        "external_urls": {"spotify": f"https://open.spotify.com/track/standin{n}"},
+        "popularity": n % 100,
+    }
+
+
+def fake_artist(query, i):
+    n = _seed(query) + i
+    return {
+        "name": query if i == 0 else f"{query} {i}",
+        "uri": f"spotify:artist:{n % 9973}",
+        "popularity": 100 - i,
+    }
+
+
+def fake_playlist(query, i):
+    n = _seed(query) + i
+    return {
+        "name": f"{query.title()[:40]} Mix {i}",
+        "owner": {"display_name": f"curator{n % 50}"},
+        "external_urls": {"spotify": f"https://open.spotify.com/playlist/standin{n}"},
+        "tracks": {"total": 20 + n % 180},
+        "followers": {"total": n % 5000},
+    }
+
+
+class SpotifyStandIn:
+    def __init__(self, latency_ms=80.0, jitter_ms=20.0):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.counts = {"token": 0, "search": 0, "top_tracks": 0}
+        self.active = 0
+        self.peak_active = 0
+
+    async def handle(self, request):
+        if request.path == "/stats":
+            return 200, {**self.counts, "peak_concurrent": self.peak_active}
+        if request.path == "/api/token" and request.method == "POST":
+            self.counts["token"] += 1
+            return 200, {"access_token": "standin-token", "token_type": "Bearer", "expires_in": 3600}
+
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            await asyncio.sleep(self.latency + random.random() * self.jitter)
+            if request.path == "/v1/search":
+                self.counts["search"] += 1
+                return 200, self.search(request.query)
+            if request.path.startswith("/v1/artists/") and request.path.endswith("/top-tracks"):
+                self.counts["top_tracks"] += 1
+                artist_id = request.path.split("/")[3]
+                return 200, {"tracks": [fake_track(f"artist {artist_id}", i) for i in range(10)]}
+            raise HTTPError(404, f"Stand-in does not implement {request.path}")
+        finally:
+            self.active -= 1
+
+    def search(self, query):
+        q = query.get("q", "")
+        limit = min(int(query.get("limit", 10)), 50)
+        result = {}
+        for kind in query.get("type", "track").split(","):
+            make = {"track": fake_track, "artist": fake_artist, "playlist": fake_playlist}.get(kind)
+            if make is None:
+                raise HTTPError(400, f"Unsupported type '{kind}'")
+            result[kind + "s"] = {"items": [make(q, i) for i in range(limit)], "total": limit}
+        return result
+
+
+async def serve(standin, host, port):
+    server = await asyncio.start_server(connection_handler(standin.handle), host, port, backlog=1024)
+    print(f"[SUCCESS] Spotify stand-in on http://{host}:{port} "
+          f"(latency {standin.latency * 1000:.0f}ms + up to {standin.jitter * 1000:.0f}ms)", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Spotify Web API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9090)
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="Simulated round trip per API call")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Random extra latency per call")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(SpotifyStandIn(args.latency_ms, args.jitter_ms), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Accuracy and throughput benchmark for the rule-based EnhancedIntentDetector.
+
+Runs every message of the labeled corpus (data/intent_benchmark.tsv, built by
+training/build_intent_corpus.py) through the detector and reports per-intent
+accuracy, per-stage match-time distributions and messages per second. A
+snapshot of the detector's outputs can be saved and compared later to show
+that a change to the pattern engine does not change behavior.
+"""
+
+import os
+import io
+import sys
+import csv
+import json
+import time
+import argparse
+import contextlib
+from collections import defaultdict, Counter
+
+# Get the directory where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(script_dir)
+
+from utils.enhanced_intent_detector import EnhancedIntentDetector
+
+CORPUS_PATH = os.path.join(script_dir, 'data', 'intent_benchmark.tsv')
+# Conversation the benchmark detects in; each row's context is set on it first
+CONVERSATION_ID = "benchmark"
+
+# Detector stages in the order detect_intent tries them
+STAGES = [
+    "_is_greeting",
+    "_match_song_patterns",
+    "_match_artist_patterns",
+    "_match_mood_patterns",
+    "_match_activity_patterns",
+    "_match_genre",
+    "_match_feedback",
+    "_is_help_request",
+]
+
+
+def load_corpus(path=CORPUS_PATH):
+    """Load (text, expected_intent, context) rows from the benchmark TSV."""
+    with open(path, 'r', newline='') as f:
+        reader = csv.DictReader(f, delimiter='\t')
+        return [(row['text'], row['intent'], row.get('context') or "") for row in reader]
+
+
+def _detect(detector, text, context):
+    """Detect `text` as if the conversation were in `context` (e.g. right after a song was shown)."""
+    detector.update_context(CONVERSATION_ID, context)
+    return detector.detect_intent(text, CONVERSATION_ID)
+
+
+def _instrument(detector, timings):
+    """Wrap the detector's stage methods so each call is timed into `timings`."""
+    for stage in STAGES:
+        method = getattr(detector, stage)
+
+        def timed(*args, _method=method, _stage=stage, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                timings[_stage].append(time.perf_counter() - start)
+
+        setattr(detector, stage, timed)
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _outcome(result):
+    """The part of a detector result that defines its behavior."""
+    return {key: result.get(key) for key in ("intent", "entity", "artist")}
+
+
+def run_accuracy(corpus):
+    """Detect every message with stage timing enabled and collect outputs."""
+    detector = EnhancedIntentDetector()
+    timings = defaultdict(list)
+    _instrument(detector, timings)
+
+    outputs = []
+    # The detector prints debug output for every mood check
+    with contextlib.redirect_stdout(io.StringIO()):
+        for text, _, context in corpus:
+            outputs.append(_outcome(_detect(detector, text, context)))
+
+    return outputs, timings
+
+
+def run_throughput(corpus, repeat=3):
+    """Measure messages per second on an uninstrumented detector."""
+    detector = EnhancedIntentDetector()
+    best = float('inf')
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for text, _, context in corpus:
+                _detect(detector, text, context)
+            best = min(best, time.perf_counter() - start)
+
+    return len(corpus) / best if best > 0 else 0.0
+
+
+def summarize(corpus, outputs, timings, messages_per_second):
+    """Build the accuracy, per-intent and per-stage report."""
+    totals = Counter()
+    correct = Counter()
+    confusions = Counter()
+    for (text, expected, _), output in zip(corpus, outputs):
+        totals[expected] += 1
+        if output["intent"] == expected:
+            correct[expected] += 1
+        else:
+            confusions[(expected, output["intent"])] += 1
+
+    per_intent = {
+        intent: {"accuracy": correct[intent] / totals[intent], "support": totals[intent]}
+        for intent in sorted(totals)
+    }
+
+    stages = {}
+    for stage in STAGES:
+        values = sorted(timings.get(stage, []))
+        if not values:
+            continue
+        stages[stage] = {
+            "calls": len(values),
+            "mean_us": sum(values) / len(values) * 1e6,
+            "p50_us": _percentile(values, 50) * 1e6,
+            "p95_us": _percentile(values, 95) * 1e6,
+            "p99_us": _percentile(values, 99) * 1e6,
+            "total_ms": sum(values) * 1000,
+        }
+
+    return {
+        "messages": len(corpus),
+        "accuracy": sum(correct.values()) / len(corpus) if corpus else 0.0,
+        "per_intent": per_intent,
+        "top_confusions": [
+            {"expected": expected, "predicted": predicted, "count": count}
+            for (expected, predicted), count in confusions.most_common(10)
+        ],
+        "stages": stages,
+        "messages_per_second": messages_per_second,
+    }
+
+
+def save_snapshot(path, corpus, outputs):
+    """Save the detector's outputs for every corpus message."""
+    snapshot = {text: output for (text, _, _), output in zip(corpus, outputs)}
+    with open(path, 'w') as f:
+        json.dump(snapshot, f, indent=1, sort_keys=True)
+
+
+def compare_snapshot(path, corpus, outputs):
+    """Return the messages whose outputs differ from a saved snapshot."""
+    with open(path, 'r') as f:
+        snapshot = json.load(f)
+    differences = []
+    for (text, _, _), output in zip(corpus, outputs):
+        if text in snapshot and snapshot[text] != output:
+            differences.append({"text": text, "before": snapshot[text], "after": output})
+    return differences
+
+
+def print_report(report):
+    """Print the benchmark report."""
+    print(f"Messages: {report['messages']}")
+    print(f"Overall accuracy: {report['accuracy']:.4f}")
+    print(f"Throughput: {report['messages_per_second']:.0f} messages/s")
+
+    print("\nPer-intent accuracy:")
+    for intent, scores in report['per_intent'].items():
+        print(f"  {intent:<15} {scores['accuracy']:.3f}  (n={scores['support']})")
+
+    if report['top_confusions']:
+        print("\nMost common confusions (expected -> predicted):")
+        for item in report['top_confusions']:
+            print(f"  {item['expected']:<15} -> {item['predicted']:<15} {item['count']}")
+
+    print("\nPer-stage match time (microseconds):")
+    print(f"  {'stage':<26} {'calls':>6} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'total_ms':>9}")
+    for stage, stats in report['stages'].items():
+        print(f"  {stage:<26} {stats['calls']:>6} {stats['mean_us']:>8.1f} {stats['p50_us']:>8.1f} "
+              f"{stats['p95_us']:>8.1f} {stats['p99_us']:>8.1f} {stats['total_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark EnhancedIntentDetector accuracy and speed.")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="Labeled TSV corpus (text, intent, source, context)")
+    parser.add_argument("--repeat", type=int, default=3, help="Throughput passes; the fastest one is reported")
+    parser.add_argument("--save-snapshot", metavar="PATH", help="Save detector outputs for later comparison")
+    parser.add_argument("--compare-snapshot", metavar="PATH", help="Fail if outputs differ from a saved snapshot")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.corpus):
+        print(f"[ERROR] Corpus not found at {args.corpus}. Run training/build_intent_corpus.py first.")
+        sys.exit(1)
+
+    corpus = load_corpus(args.corpus)
+    outputs, timings = run_accuracy(corpus)
+    report = summarize(corpus, outputs, timings, run_throughput(corpus, args.repeat))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.save_snapshot:
+        save_snapshot(args.save_snapshot, corpus, outputs)
+        print(f"\n[SUCCESS] Snapshot saved to {args.save_snapshot}")
+
+    if args.compare_snapshot:
+        differences = compare_snapshot(args.compare_snapshot, corpus, outputs)
+        if differences:
+            print(f"\n[ERROR] {len(differences)} messages changed behavior:")
+            for diff in differences[:20]:
+                print(f"  '{diff['text']}': {diff['before']} -> {diff['after']}")
+            sys.exit(1)
+        print("\n[SUCCESS] Detector outputs match the snapshot")
@@ -1,110 +1,282 @@
 # -*- coding: utf-8 -*-
 """
-Quick accuracy evaluation for Smart Mood Player models
+Whole-dataset evaluation for Smart Mood Player models.
+
+Streams the datasets in chunks, predicts in batches across worker processes
+and reports accuracy metrics together with latency percentiles and throughput.
+The emotion classifier is scored on the held-out split that
+train_emotion_classifier.py leaves out, with the same text cleaning.
 """
 
-import pandas as pd
-import numpy as np
 import os
 import sys
-import pickle
-from sklearn.metrics import accuracy_score, classification_report
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import joblib
 
 # Get the directory where this script is located
 script_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(script_dir)
 
-def evaluate_models():
-    """Evaluate existing models and return accuracy metrics"""
-    results = {}
-
-    # Use absolute paths based on script location
-    models_dir = os.path.join(script_dir, 'models')
-    data_dir = os.path.join(script_dir, 'data')
-
-    if not os.path.exists(models_dir):
-        return {"error": f"Models directory not found at {models_dir}"}
-
-    # 1. Check Emotion Classifier
-    emotion_model_path = os.path.join(models_dir, 'emotion_classifier.pkl')
-    if os.path.exists(emotion_model_path):
-        try:
-            with open(emotion_model_path, 'rb') as f:
-                emotion_model = pickle.load(f)
-
-            print(f"Emotion model loaded: {type(emotion_model)}")
-
-            # Load emotion data for evaluation
-            emotion_data_path = os.path.join(data_dir, 'emotion_dataset_raw.csv')
-            if os.path.exists(emotion_data_path):
-                df = pd.read_csv(emotion_data_path)
-                print(f"Data shape: {df.shape}")
-
-                if 'text' in df.columns and 'emotion' in df.columns:
-                    # Get sample for testing (limit to avoid memory issues)
-                    sample_df = df.sample(n=min(1000, len(df)), random_state=42)
-                    X_sample = sample_df['text'].tolist()
-                    y_true = sample_df['emotion'].tolist()
-
-                    # Try to predict (adjust based on your model's interface)
-                    if hasattr(emotion_model, 'predict'):
-                        try:
-                            y_pred = emotion_model.predict(X_sample)
-                            accuracy = accuracy_score(y_true, y_pred)
-                            results['emotion_classifier'] = {
-                                'accuracy': accuracy,
-                                'samples_tested': len(X_sample),
-                                'report': classification_report(y_true, y_pred, output_dict=True)
-                            }
-                        except Exception as e:
-                            results['emotion_classifier'] = {"error": f"Prediction failed: {str(e)}"}
-                    else:
-                        results['emotion_classifier'] = {"error": "Model does not have predict method"}
-                else:
-                    results['emotion_classifier'] = {"error": f"Required columns not found in data: {list(df.columns)}"}
-            else:
-                results['emotion_classifier'] = {"error": f"Emotion dataset not found at {emotion_data_path}"}
-        except Exception as e:
-            results['emotion_classifier'] = {"error": f"Model loading failed: {str(e)}"}
-    else:
-        results['emotion_classifier'] = {"error": f"Model file not found at {emotion_model_path}"}
-
-    # 2. Check Intent Detector
-    intent_model_path = os.path.join(models_dir, 'chatbot_model.pkl')
-    if os.path.exists(intent_model_path):
-        try:
-            with open(intent_model_path, 'rb') as f:
-                intent_model = pickle.load(f)
-
-            results['intent_detector'] = {
-                "status": "Model loaded successfully - manual evaluation needed",
-                "model_type": str(type(intent_model))
-            }
-        except Exception as e:
-            results['intent_detector'] = {"error": f"Model loading failed: {str(e)}"}
+from utils.emotion_text import clean_text, is_holdout
+from utils.performance_analyzer import PerformanceAnalyzer
+
+MODELS_DIR = os.path.join(script_dir, 'models')
+DATA_DIR = os.path.join(script_dir, 'data')
+EMOTION_MODEL_PATH = os.path.join(MODELS_DIR, 'emotion_classifier.pkl')
+EMOTION_DATA_PATH = os.path.join(DATA_DIR, 'emotion_dataset_raw.csv')
+CHATBOT_MODEL_PATH = os.path.join(MODELS_DIR, 'chatbot_model.bin')
+DIALOGS_PATH = os.path.join(DATA_DIR, 'dialogs.txt')
+
+# Column names used by emotion_dataset_raw.csv
+TEXT_COLUMN = 'Text'
+LABEL_COLUMN = 'Emotion'
+
+DEFAULT_CHUNKSIZE = 5000
+DEFAULT_BATCH_SIZE = 256
+
+# Model held by each worker process, loaded once by _init_worker
+_worker_model = None
+
+
+def _init_worker(kind, model_path):
+    """Load the model once per worker process."""
+    global _worker_model
+    if kind == 'emotion':
+        _worker_model = joblib.load(model_path)
     else:
-        results['intent_detector'] = {"error": f"Model file not found at {intent_model_path}"}
+        import io
+        import contextlib
+        from utils.enhanced_chatbot import EnhancedChatbot
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Chat store files are memory-mapped, so workers share one copy of the model pages
+            _worker_model = EnhancedChatbot(model_path=model_path)
+
+
+def _predict_emotion_batch(texts):
+    """Clean and predict a batch of emotions (as NlpMoodDetector does) and time the call."""
+    start = time.perf_counter()
+    predictions = _worker_model.predict([clean_text(text) for text in texts])
+    return list(predictions), time.perf_counter() - start
+
+
+def _match_chatbot_batch(pairs):
+    """Check whether the chatbot retrieves the reference response for each trigger.
+
+    Returns 1 for a hit and 0 for a miss per pair, plus the elapsed time.
+    """
+    start = time.perf_counter()
+    hits = []
+    for trigger, reference in pairs:
+        responses = _worker_model._find_best_match(trigger) or []
+        hits.append(1 if reference in responses else 0)
+    return hits, time.perf_counter() - start
+
+
+def iter_emotion_batches(path, chunksize=DEFAULT_CHUNKSIZE, batch_size=DEFAULT_BATCH_SIZE, limit=None):
+    """Stream (texts, labels) batches of the held-out split from the emotion CSV without loading it all at once."""
+    seen = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=[LABEL_COLUMN, TEXT_COLUMN]):
+        chunk = chunk.dropna(subset=[TEXT_COLUMN, LABEL_COLUMN])
+        chunk = chunk[chunk[TEXT_COLUMN].apply(is_holdout)]
+        texts = chunk[TEXT_COLUMN].astype(str).tolist()
+        labels = chunk[LABEL_COLUMN].astype(str).tolist()
+        for i in range(0, len(texts), batch_size):
+            if limit is not None and seen >= limit:
+                return
+            end = i + batch_size
+            if limit is not None:
+                end = min(end, i + limit - seen)
+            seen += end - i
+            yield texts[i:end], labels[i:end]
+
+
+def iter_dialog_batches(path, batch_size=DEFAULT_BATCH_SIZE, limit=None):
+    """Stream (trigger, reference response) batches from dialogs.txt."""
+    batch = []
+    seen = 0
+    with open(path, 'r') as f:
+        for line in f:
+            parts = line.strip().split("\t")
+            if len(parts) != 2:
+                continue
+            if limit is not None and seen >= limit:
+                break
+            batch.append((parts[0], parts[1]))
+            seen += 1
+            if len(batch) >= batch_size:
+                yield batch, None
+                batch = []
+    if batch:
+        yield batch, None
+
+
+def run_batches(kind, model_path, batches, batch_fn, workers):
+    """Run batches across a process pool, keeping a bounded number of batches in flight.
+
+    Returns the concatenated outputs, the reference labels, per-batch latencies,
+    the number of rows processed and the wall-clock time.
+    """
+    outputs, references, latencies = [], [], []
+    rows = 0
+    max_in_flight = max(1, workers) * 2
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(kind, model_path)) as executor:
+        in_flight = deque()
+
+        def drain_one():
+            future, labels = in_flight.popleft()
+            batch_output, elapsed = future.result()
+            outputs.extend(batch_output)
+            if labels is not None:
+                references.extend(labels)
+            latencies.append((elapsed, len(batch_output)))
+
+        for inputs, labels in batches:
+            in_flight.append((executor.submit(batch_fn, inputs), labels))
+            rows += len(inputs)
+            if len(in_flight) >= max_in_flight:
+                drain_one()
+        while in_flight:
+            drain_one()
+    wall_time = time.perf_counter() - start
+
+    return outputs, references, latencies, rows, wall_time
+
+
+def summarize_latency(latencies, rows, wall_time):
+    """Summarize batch latencies as percentiles, per-row latency and throughput."""
+    if not latencies:
+        return {}
+    batch_ms = np.array([elapsed for elapsed, _ in latencies]) * 1000
+    per_row_ms = np.array([elapsed / max(size, 1) for elapsed, size in latencies]) * 1000
+    return {
+        'batches': len(latencies),
+        'batch_latency_ms': {
+            'p50': float(np.percentile(batch_ms, 50)),
+            'p95': float(np.percentile(batch_ms, 95)),
+            'p99': float(np.percentile(batch_ms, 99)),
+            'max': float(batch_ms.max()),
+        },
+        'row_latency_ms': {
+            'p50': float(np.percentile(per_row_ms, 50)),
+            'p95': float(np.percentile(per_row_ms, 95)),
+            'p99': float(np.percentile(per_row_ms, 99)),
+        },
+        'rows_per_second': rows / wall_time if wall_time > 0 else 0.0,
+        'wall_time_s': wall_time,
+    }
+
+
+def evaluate_emotion_classifier(analyzer, chunksize, batch_size, workers, limit=None):
+    """Evaluate the emotion classifier on the held-out split of the dataset."""
+    if not os.path.exists(EMOTION_MODEL_PATH):
+        return {"error": f"Model file not found at {EMOTION_MODEL_PATH}"}
+    if not os.path.exists(EMOTION_DATA_PATH):
+        return {"error": f"Emotion dataset not found at {EMOTION_DATA_PATH}"}
+
+    try:
+        batches = iter_emotion_batches(EMOTION_DATA_PATH, chunksize, batch_size, limit)
+        y_pred, y_true, latencies, rows, wall_time = run_batches(
+            'emotion', EMOTION_MODEL_PATH, batches, _predict_emotion_batch, workers
+        )
+    except Exception as e:
+        return {"error": f"Evaluation failed: {str(e)}"}
+
+    labels = sorted(set(y_true) | set(y_pred))
+    result = analyzer.compute_ml_metrics(y_true, y_pred, labels=labels)
+    result['labels'] = labels
+    result['samples_tested'] = rows
+    result['report'] = analyzer.generate_classification_report(y_true, y_pred, labels=labels)
+    result['performance'] = summarize_latency(latencies, rows, wall_time)
+    return result
+
+
+def evaluate_chatbot(batch_size, workers, limit=None):
+    """Evaluate chatbot retrieval: does each dialogs.txt trigger retrieve its reference response?"""
+    if not os.path.exists(CHATBOT_MODEL_PATH):
+        return {"error": f"Model file not found at {CHATBOT_MODEL_PATH}"}
+    if not os.path.exists(DIALOGS_PATH):
+        return {"error": f"Dialogs dataset not found at {DIALOGS_PATH}"}
+
+    try:
+        batches = iter_dialog_batches(DIALOGS_PATH, batch_size, limit)
+        hits, _, latencies, rows, wall_time = run_batches(
+            'chatbot', CHATBOT_MODEL_PATH, batches, _match_chatbot_batch, workers
+        )
+    except Exception as e:
+        return {"error": f"Evaluation failed: {str(e)}"}
+
+    return {
+        'accuracy': float(np.mean(hits)) if hits else 0.0,
+        'samples_tested': rows,
+        'performance': summarize_latency(latencies, rows, wall_time),
+    }
+
+
+def evaluate_models(chunksize=DEFAULT_CHUNKSIZE, batch_size=DEFAULT_BATCH_SIZE, workers=None, limit=None):
+    """Evaluate existing models and return accuracy and throughput metrics"""
+    if not os.path.exists(MODELS_DIR):
+        return {"error": f"Models directory not found at {MODELS_DIR}"}
+
+    workers = workers or os.cpu_count() or 1
+    analyzer = PerformanceAnalyzer(log_dir=os.path.join(script_dir, "analysis_logs"))
+
+    return {
+        'emotion_classifier': evaluate_emotion_classifier(analyzer, chunksize, batch_size, workers, limit),
+        'chatbot': evaluate_chatbot(batch_size, workers, limit),
+    }
+
+
+def print_performance(performance):
+    """Print latency percentiles and throughput."""
+    if not performance:
+        return
+    batch = performance['batch_latency_ms']
+    row = performance['row_latency_ms']
+    print(f"  Throughput: {performance['rows_per_second']:.1f} rows/s "
+          f"({performance['batches']} batches in {performance['wall_time_s']:.2f}s)")
+    print(f"  Batch latency (ms): p50={batch['p50']:.2f} p95={batch['p95']:.2f} "
+          f"p99={batch['p99']:.2f} max={batch['max']:.2f}")
+    print(f"  Per-row latency (ms): p50={row['p50']:.4f} p95={row['p95']:.4f} p99={row['p99']:.4f}")
 
-    return results
 
 if __name__ == "__main__":
-    results = evaluate_models()
+    parser = argparse.ArgumentParser(description="Evaluate Smart Mood Player models on their full datasets.")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows read from the CSV per chunk")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per prediction batch")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--limit", type=int, default=None, help="Evaluate only the first N rows of each dataset")
+    args = parser.parse_args()
+
+    results = evaluate_models(args.chunksize, args.batch_size, args.workers, args.limit)
     print("Model Accuracy Results:")
+    if 'error' in results:
+        print(f"  Error: {results['error']}")
+        sys.exit(1)
+
     for model, result in results.items():
         print(f"\n{model.upper()}:")
-        if isinstance(result, dict):
-            if 'error' in result:
-                print(f"  Error: {result['error']}")
-            elif 'accuracy' in result:
-                print(f"  Accuracy: {result['accuracy']:.2f}")
-                print(f"  Samples Tested: {result.get('samples_tested', 'N/A')}")
-                if 'report' in result:
-                    print(f"  Report: {result['report']}")
-            elif 'status' in result:
-                print(f"  Status: {result['status']}")
-                if 'model_type' in result:
-                    print(f"  Model Type: {result['model_type']}")
-            else:
-                print(f"  Unknown result: {result}")
-        else:
-            print(f"  Invalid result type: {result}")
\ No newline at end of file
+        if 'error' in result:
+            print(f"  Error: {result['error']}")
+            continue
+
+        print(f"  Accuracy: {result['accuracy']:.4f}")
+        print(f"  Samples Tested: {result.get('samples_tested', 'N/A')}")
+        if 'f1_score' in result:
+            print(f"  Weighted Precision/Recall/F1: {result['precision']:.4f} / "
+                  f"{result['recall']:.4f} / {result['f1_score']:.4f}")
+        if 'report' in result:
+            print("  Per-class metrics:")
+            for label in result['labels']:
+                scores = result['report'].get(label)
+                if scores:
+                    print(f"    {label:<10} precision={scores['precision']:.3f} recall={scores['recall']:.3f} "
+                          f"f1={scores['f1-score']:.3f} support={int(scores['support'])}")
+        print_performance(result.get('performance'))
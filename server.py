@@ -0,0 +1,320 @@
+# server.py (Asyncio HTTP/JSON service for the mood-to-music pipeline)
+"""
+Serve the recommendation engine to many concurrent users over HTTP/JSON.
+
+    POST   /chat            {"message": "...", "session_id": "..."?}  -> reply, mood, intent, results
+    GET    /sessions/<id>   conversation history of a session
+    DELETE /sessions/<id>   end a session
+    GET    /health          load and session counters
+    GET    /stages          per-stage latency histograms (utils.tracing)
+
+The event loop only parses requests and keeps per-session state. Mood and
+intent inference runs on a small executor (it is CPU-bound). Spotify
+searches are awaited on the loop through one shared aiohttp client
+(utils.async_spotify), so thousands of searches need no threads; with
+--thread-search (or without aiohttp) they run on a separate, larger
+executor through blocking spotipy instead. At most --max-concurrent messages are processed at once.
+Beyond that, up to --max-pending wait their turn and anything more gets 503
+with Retry-After. A session may have at most --max-session-queue messages
+in flight (429 otherwise), and its messages are answered in order.
+"""
+
+import os
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+import functools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(script_dir)
+
+from utils.async_http import HTTPError, connection_handler
+from utils.enhanced_spotify_utils import get_spotify_client
+from utils.recommendation_engine import RecommendationEngine
+from utils.tracing import Tracer
+
+# Load environment variables
+load_dotenv()
+
+
+class Session:
+    """Conversation state for one user."""
+    def __init__(self, session_id, history_size=20):
+        self.id = session_id
+        self.history = deque(maxlen=history_size)
+        self.last_mood = None
+        self.last_intent = None
+        self.turns = 0
+        self.in_flight = 0
+        self.lock = asyncio.Lock()  # Answers a session's messages in order
+        self.created = time.time()
+        self.last_seen = self.created
+
+    def record(self, message, decision, result):
+        self.turns += 1
+        self.last_seen = time.time()
+        if decision.mood:
+            self.last_mood = decision.mood
+        self.last_intent = decision.intent
+        self.history.append({
+            "turn": self.turns,
+            "message": message,
+            "mood": decision.mood,
+            "intent": decision.intent,
+            "reply": decision.reply,
+            "results": len(result.payload) if result is not None and result.status != "Error" else 0,
+            "time": self.last_seen,
+        })
+
+    def summary(self):
+        return {
+            "session_id": self.id,
+            "turns": self.turns,
+            "last_mood": self.last_mood,
+            "last_intent": self.last_intent,
+            "history": list(self.history),
+        }
+
+
+class CachedClientFactory:
+    """Reuse one Spotify client across searches instead of building (and authenticating) one per search."""
+    def __init__(self, factory=get_spotify_client):
+        self.factory = factory
+        self.client = None
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            if self.client is None:
+                self.client = self.factory()
+            return self.client
+
+
+class MusicService:
+    def __init__(self, engine, max_concurrent=32, max_pending=256, max_session_queue=4,
+                 inference_workers=2, search_workers=16, session_ttl=1800, max_sessions=10000,
+                 search_timeout=20.0, spotify=None):
+        self.engine = engine
+        self.spotify = spotify  # AsyncSpotifyClient; None searches on search_executor
+        self.max_concurrent = max_concurrent
+        self.max_pending = max_pending
+        self.max_session_queue = max_session_queue
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self.search_timeout = search_timeout
+        self.inference_executor = ThreadPoolExecutor(max_workers=inference_workers, thread_name_prefix="inference")
+        self.search_executor = ThreadPoolExecutor(max_workers=search_workers, thread_name_prefix="spotify")
+        self.sessions = {}
+        self.slots = None  # asyncio.Semaphore, created on the serving loop
+        self.pending = 0
+        self.in_flight = 0
+        self.stats = {"requests": 0, "ok": 0, "rejected_busy": 0, "rejected_session": 0, "errors": 0}
+        self.tracer = Tracer()
+
+    async def start(self):
+        self.slots = asyncio.Semaphore(self.max_concurrent)
+        asyncio.get_running_loop().create_task(self._expire_sessions())
+
+    async def aclose(self):
+        if self.spotify is not None:
+            await self.spotify.close()
+
+    def close(self):
+        self.inference_executor.shutdown(wait=False, cancel_futures=True)
+        self.search_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _expire_sessions(self):
+        while True:
+            await asyncio.sleep(min(60, self.session_ttl))
+            cutoff = time.time() - self.session_ttl
+            expired = [sid for sid, s in self.sessions.items() if s.last_seen < cutoff and not s.in_flight]
+            for sid in expired:
+                del self.sessions[sid]
+                self.engine.intent_detector.forget_context(sid)
+            if expired:
+                print(f"[INFO] Expired {len(expired)} idle sessions")
+
+    def _session(self, session_id):
+        if session_id and session_id in self.sessions:
+            return self.sessions[session_id]
+        if len(self.sessions) >= self.max_sessions:
+            raise HTTPError(503, "Too many active sessions", {"Retry-After": "5"})
+        session = Session(session_id or uuid.uuid4().hex)
+        self.sessions[session.id] = session
+        return session
+
+    async def handle(self, request):
+        if request.path == "/health" and request.method == "GET":
+            return 200, {"status": "ok", "sessions": len(self.sessions), "in_flight": self.in_flight,
+                         "pending": self.pending, **self.stats}
+        if request.path == "/stages" and request.method == "GET":
+            return 200, self.tracer.summary()
+        if request.path == "/chat":
+            if request.method != "POST":
+                raise HTTPError(405, "Use POST /chat")
+            return await self.chat(request.json())
+        if request.path.startswith("/sessions/"):
+            session_id = request.path[len("/sessions/"):]
+            if session_id not in self.sessions:
+                raise HTTPError(404, "Unknown session")
+            if request.method == "GET":
+                return 200, self.sessions[session_id].summary()
+            if request.method == "DELETE":
+                del self.sessions[session_id]
+                self.engine.intent_detector.forget_context(session_id)
+                return 200, {"session_id": session_id, "deleted": True}
+            raise HTTPError(405, "Use GET or DELETE")
+        raise HTTPError(404, "Not found")
+
+    async def chat(self, body):
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        session_id = body.get("session_id")
+        if session_id is not None and not isinstance(session_id, str):
+            raise HTTPError(400, "'session_id' must be a string")
+        message = str(body.get("message", "")).strip()
+        if not message:
+            raise HTTPError(400, "'message' is required")
+        search = body.get("search", True)
+        self.stats["requests"] += 1
+
+        # Backpressure: shed load up front instead of queueing without bound
+        if self.pending >= self.max_pending:
+            self.stats["rejected_busy"] += 1
+            raise HTTPError(503, "Server busy, retry shortly", {"Retry-After": "1"})
+        session = self._session(session_id)
+        if session.in_flight >= self.max_session_queue:
+            self.stats["rejected_session"] += 1
+            raise HTTPError(429, "Too many messages in flight for this session", {"Retry-After": "1"})
+
+        self.pending += 1
+        session.in_flight += 1
+        admitted = False
+        trace = self.tracer.start(message)
+        trace.begin("queue.admission")
+        try:
+            # Wait for this session's previous message first, then for a global slot
+            async with session.lock, self.slots:
+                trace.end("queue.admission")
+                self.pending -= 1
+                admitted = True
+                self.in_flight += 1
+                try:
+                    response = await self._answer(session, message, search, trace)
+                    trace.finish(status=200)
+                    return 200, response
+                finally:
+                    self.in_flight -= 1
+        except HTTPError:
+            raise
+        except asyncio.TimeoutError:
+            self.stats["errors"] += 1
+            trace.finish(status=504)
+            raise HTTPError(504, "Music search timed out")
+        except Exception as e:
+            self.stats["errors"] += 1
+            trace.finish(status=500)
+            print(f"[ERROR] Could not answer message: {e}")
+            raise HTTPError(500, "Could not process the message")
+        finally:
+            if not admitted:
+                self.pending -= 1
+            session.in_flight -= 1
+
+    async def _answer(self, session, message, search, trace):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        with trace.span("inference"):
+            decision = await loop.run_in_executor(
+                self.inference_executor,
+                functools.partial(self.engine.route, message, trace=trace, conversation_id=session.id)
+            )
+
+        result = None
+        if search and decision.search is not None:
+            if self.spotify is not None:
+                searching = self.engine.search_async(decision.search, self.spotify, trace=trace)
+            else:
+                searching = loop.run_in_executor(
+                    self.search_executor, functools.partial(self.engine.search, decision.search, trace=trace)
+                )
+            result = await asyncio.wait_for(searching, self.search_timeout)
+        session.record(message, decision, result)
+        self.stats["ok"] += 1
+
+        response = {
+            "session_id": session.id,
+            "turn": session.turns,
+            "mood": decision.mood,
+            "intent": decision.intent,
+            "entity": decision.entity,
+            "reply": decision.reply,
+            "search": decision.search._asdict() if decision.search else None,
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+        if result is not None:
+            response["status"] = result.status
+            response["results"] = result.payload if result.status != "Error" else []
+            response["error"] = result.payload if result.status == "Error" else None
+            response["note"] = result.note
+        return response
+
+
+async def serve(service, host, port):
+    await service.start()
+    server = await asyncio.start_server(connection_handler(service.handle), host, port, backlog=1024)
+    print(f"[SUCCESS] Serving on http://{host}:{port} (max {service.max_concurrent} concurrent, "
+          f"{service.max_pending} pending, {'async' if service.spotify else 'threaded'} Spotify search)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.aclose()
+
+
+def make_async_spotify(max_connections):
+    """Shared aiohttp Spotify client, or None (threaded search) if aiohttp is missing or unconfigured."""
+    try:
+        from utils.async_spotify import get_async_spotify_client
+    except ImportError:
+        print("[WARNING] aiohttp is not installed; Spotify searches will use threads")
+        return None
+    return get_async_spotify_client(max_connections=max_connections)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the mood-to-music pipeline over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-concurrent", type=int, default=32, help="Messages processed at once")
+    parser.add_argument("--max-pending", type=int, default=256, help="Messages allowed to wait before 503")
+    parser.add_argument("--max-session-queue", type=int, default=4, help="In-flight messages per session before 429")
+    parser.add_argument("--inference-workers", type=int, default=2, help="Threads for mood/intent inference")
+    parser.add_argument("--search-workers", type=int, default=16, help="Threads for blocking Spotify calls")
+    parser.add_argument("--thread-search", action="store_true", help="Search with blocking spotipy on threads")
+    parser.add_argument("--spotify-connections", type=int, default=100, help="Open connections for async search")
+    parser.add_argument("--session-ttl", type=int, default=1800, help="Seconds before an idle session is dropped")
+    parser.add_argument("--quiet", action="store_true", help="Silence the pipeline's per-message debug output")
+    args = parser.parse_args()
+
+    if args.quiet:
+        sys.stdout = open(os.devnull, "w")
+
+    engine = RecommendationEngine(client_factory=CachedClientFactory())
+    spotify = None if args.thread_search else make_async_spotify(args.spotify_connections)
+    service = MusicService(engine, max_concurrent=args.max_concurrent, max_pending=args.max_pending,
+                           max_session_queue=args.max_session_queue, inference_workers=args.inference_workers,
+                           search_workers=args.search_workers, session_ttl=args.session_ttl, spotify=spotify)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
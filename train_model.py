@@ -3,26 +3,242 @@
 import subprocess
 import sys
 import os
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from utils.model_registry import ModelRegistry
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+
+# Hashes of each step's inputs and outputs from the last successful build
+BUILD_STATE_PATH = os.path.join(project_root, "models", ".build_state.json")
+
+# Build graph: every step declares the files it reads and the artifacts it writes.
+# The training script itself is always an implicit input, so code changes retrain too.
+# "publish" maps registry model names to the outputs published after a successful build;
+# the first output is the artifact and any others are published alongside it.
+BUILD_STEPS = {
+    "emotion_classifier": {
+        "script": "train_emotion_classifier.py",
+        "inputs": ["data/emotion_dataset_raw.csv", "utils/emotion_text.py"],
+        "outputs": ["models/emotion_classifier.pkl"],
+        "publish": {"emotion_classifier": ["models/emotion_classifier.pkl"]},
+        "deps": [],
+    },
+    "chatbot": {
+        "script": "train_chatbot.py",
+        "inputs": ["data/dialogs.txt", "data/intent.json", "utils/chatbot_store.py", "utils/chatbot_retrieval.py"],
+        "outputs": ["models/chatbot_model.bin", "models/chatbot_index.npz"],
+        "publish": {"chatbot_model": ["models/chatbot_model.bin", "models/chatbot_index.npz"]},
+        "deps": [],
+    },
+    "intent_detector": {
+        "script": "train_intent_detector.py",  # This script just prints info and benchmarks
+        "inputs": ["data/intent.json", "data/intent_benchmark.tsv", "utils/enhanced_intent_detector.py",
+                   "evaluate_intent_detector.py"],
+        "outputs": [],
+        "deps": [],
+    },
+}
+
+
+def _abs(path):
+    return os.path.join(project_root, path)
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """Return the SHA-256 of a file, or None if it does not exist."""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def step_input_files(step):
+    return [os.path.join("training", step["script"])] + step["inputs"]
+
+
+def hash_inputs(step):
+    """Hash every input of a step into a single fingerprint."""
+    digest = hashlib.sha256()
+    for path in sorted(step_input_files(step)):
+        digest.update(path.encode("utf-8"))
+        digest.update((hash_file(_abs(path)) or "missing").encode("utf-8"))
+    return digest.hexdigest()
+
+
+def hash_outputs(step):
+    return {path: hash_file(_abs(path)) for path in step["outputs"]}
+
+
+def output_mtimes(step):
+    """Modification time (ns) of each output, None for outputs that do not exist yet."""
+    mtimes = {}
+    for path in step["outputs"]:
+        try:
+            mtimes[path] = os.stat(_abs(path)).st_mtime_ns
+        except FileNotFoundError:
+            mtimes[path] = None
+    return mtimes
+
+
+def unwritten_outputs(step, before):
+    """Outputs the step did not (re)write since `before` was taken with output_mtimes."""
+    after = output_mtimes(step)
+    return [path for path in step["outputs"] if after[path] is None or after[path] == before[path]]
+
+
+def load_build_state(path=BUILD_STATE_PATH):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_build_state(state, path=BUILD_STATE_PATH):
+    """Write the build state atomically so an interrupted build never corrupts it."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=4, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_up_to_date(name, step, state):
+    """A step is up to date if its inputs and outputs match the last successful build."""
+    previous = state.get(name)
+    if not previous or previous.get("inputs") != hash_inputs(step):
+        return False
+    outputs = hash_outputs(step)
+    return all(outputs.values()) and outputs == previous.get("outputs")
+
 
 def run_script(script_name):
     """Runs a Python script located in the 'training' directory and checks for errors."""
-    script_path = os.path.join("training", script_name)
-    try:
-        print(f"--- Running {script_path} ---")
-        subprocess.run([sys.executable, script_path], check=True)
-        print(f"--- Finished {script_path} ---\n")
-    except FileNotFoundError:
-        print(f"[ERROR] Script not found at {script_path}")
-        sys.exit(1)
-    except subprocess.CalledProcessError as e:
-        print(f"[ERROR] Error running {script_path}: {e}")
-        sys.exit(1)
+    script_path = os.path.join(project_root, "training", script_name)
+    if not os.path.exists(script_path):
+        return False, f"Script not found at {script_path}", 0.0
+
+    start = time.time()
+    completed = subprocess.run([sys.executable, script_path], cwd=project_root,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    elapsed = time.time() - start
+    return completed.returncode == 0, completed.stdout, elapsed
+
+
+def publish_outputs(name, step, elapsed, registry):
+    """Publish a step's artifacts as new registry versions and make them current."""
+    for model_name, paths in step.get("publish", {}).items():
+        manifest = registry.publish(
+            model_name, _abs(paths[0]),
+            companion_files=[_abs(path) for path in paths[1:]],
+            metrics={"training_seconds": round(elapsed, 2)},
+            extra={"build_step": name, "inputs_sha256": hash_inputs(step)},
+        )
+        print(f"[INFO] Published {model_name} {manifest['version']} to the model registry")
+
+
+def plan(steps, state, force=False):
+    """Split the graph into steps to run and steps that can be skipped.
+
+    A step is rebuilt if it is stale or depends on a step that is rebuilt.
+    """
+    to_run = set()
+    changed = True
+    while changed:
+        changed = False
+        for name, step in steps.items():
+            if name in to_run:
+                continue
+            if force or not is_up_to_date(name, step, state) or any(dep in to_run for dep in step["deps"]):
+                to_run.add(name)
+                changed = True
+    return to_run
+
+
+def build(steps=BUILD_STEPS, force=False, jobs=None, dry_run=False, publish=True):
+    """Run stale steps of the build graph, independent steps in parallel processes."""
+    state = load_build_state()
+    registry = ModelRegistry() if publish else None
+    to_run = plan(steps, state, force)
+
+    for name in steps:
+        if name not in to_run:
+            print(f"[SKIP] {name}: inputs unchanged since last build")
+    if dry_run or not to_run:
+        for name in sorted(to_run):
+            print(f"[PLAN] {name}: would run training/{steps[name]['script']}")
+        return True
+
+    done = {name for name in steps if name not in to_run}
+    failed = set()
+    pending = set(to_run)
+    jobs = jobs or len(to_run)
+
+    started_mtimes = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        running = {}
+        while pending or running:
+            # Start every step whose dependencies are built
+            for name in sorted(pending):
+                deps = steps[name]["deps"]
+                if any(dep in failed for dep in deps):
+                    print(f"[ERROR] {name}: skipped because a dependency failed")
+                    pending.discard(name)
+                    failed.add(name)
+                elif all(dep in done for dep in deps):
+                    print(f"--- Running training/{steps[name]['script']} ---")
+                    started_mtimes[name] = output_mtimes(steps[name])
+                    running[executor.submit(run_script, steps[name]["script"])] = name
+                    pending.discard(name)
+
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                ok, output, elapsed = future.result()
+                print(f"\n[{name}]\n{output.rstrip()}")
+                unwritten = unwritten_outputs(steps[name], started_mtimes[name]) if ok else []
+                if unwritten:
+                    # A script that swallows its error can still exit 0; don't record stale artifacts as built
+                    ok = False
+                    print(f"[ERROR] {name}: exited cleanly but did not write {', '.join(unwritten)}")
+                if ok:
+                    state[name] = {"inputs": hash_inputs(steps[name]), "outputs": hash_outputs(steps[name])}
+                    save_build_state(state)
+                    if registry:
+                        publish_outputs(name, steps[name], elapsed, registry)
+                    done.add(name)
+                    print(f"--- Finished training/{steps[name]['script']} in {elapsed:.1f}s ---\n")
+                else:
+                    failed.add(name)
+                    print(f"[ERROR] Error running training/{steps[name]['script']}\n")
+
+    return not failed
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train all models, skipping steps whose inputs are unchanged.")
+    parser.add_argument("--force", action="store_true", help="Retrain every model even if its inputs are unchanged")
+    parser.add_argument("--jobs", type=int, default=None, help="Maximum number of training steps run in parallel")
+    parser.add_argument("--dry-run", action="store_true", help="Only show which steps would run")
+    parser.add_argument("--no-publish", action="store_true", help="Do not publish new artifacts to the model registry")
+    args = parser.parse_args()
+
     print("🚀 Starting all training processes...\n")
 
-    run_script("train_emotion_classifier.py")
-    run_script("train_chatbot.py")
-    run_script("train_intent_detector.py") # This script just prints info
+    if not build(force=args.force, jobs=args.jobs, dry_run=args.dry_run, publish=not args.no_publish):
+        print("[ERROR] Some training processes failed.")
+        sys.exit(1)
 
-    print("[SUCCESS] All training processes completed successfully!")
\ No newline at end of file
+    print("[SUCCESS] All training processes completed successfully!")
@@ -0,0 +1,280 @@
+# training/prune_emotion_classifier.py
+
+import os
+import io
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score
+import joblib
+
+# Get the directory of the current script (e.g., .../training/)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (the project root, e.g., .../smart-mood-player/)
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from utils.emotion_text import clean_text, is_holdout
+
+# Define paths relative to the project root
+DATA_PATH = os.path.join(project_root, "data", "emotion_dataset_raw.csv")
+MODEL_DIR = os.path.join(project_root, "models")
+MODEL_PATH = os.path.join(MODEL_DIR, "emotion_classifier.pkl")
+# The app loads the registry's current version, so a written model is published there too
+REGISTRY_NAME = "emotion_classifier"
+
+# Candidate (min_df, max_features) limits. (1, None) is the current unpruned configuration.
+VOCAB_LIMITS = [
+    (1, None),
+    (2, None),
+    (3, None),
+    (5, None),
+    (2, 20000),
+    (2, 10000),
+    (3, 5000),
+    (3, 2000),
+]
+
+# Fraction of features kept after dropping the lowest-weight ones
+KEEP_RATIOS = [1.0, 0.75, 0.5, 0.25]
+
+# Number of messages used to measure single-message predict latency
+LATENCY_SAMPLES = 300
+
+
+def load_dataset(path=DATA_PATH):
+    """Load the training rows of the emotion dataset, cleaned like train_emotion_classifier.py does."""
+    df = pd.read_csv(path)
+    df = df[~df['Text'].apply(is_holdout)].copy()
+    df['Clean_Text'] = df['Text'].apply(clean_text)
+    return df['Clean_Text'], df['Emotion']
+
+
+def build_pipeline(min_df=1, max_features=None, vocabulary=None):
+    """Build the emotion pipeline with the given vocabulary limits."""
+    return Pipeline(steps=[
+        ('cv', CountVectorizer(min_df=min_df, max_features=max_features, vocabulary=vocabulary)),
+        ('lr', LogisticRegression(max_iter=1000))
+    ])
+
+
+def strip_fit_artifacts(pipeline):
+    """Drop attributes that are only needed during fitting.
+
+    CountVectorizer keeps every term removed by min_df/max_features in
+    ``stop_words_`` and a copy of any fixed vocabulary in ``vocabulary``,
+    both of which would otherwise be pickled along with the model.
+    """
+    cv = pipeline.named_steps['cv']
+    if hasattr(cv, 'stop_words_'):
+        del cv.stop_words_
+    cv.vocabulary = None
+    return pipeline
+
+
+def drop_low_weight_features(pipeline, keep_ratio):
+    """Keep only the highest-weight features of a fitted pipeline, without re-fitting.
+
+    A feature's weight is its largest absolute coefficient over all classes.
+    The vocabulary is remapped to the kept columns so the pruned pipeline
+    predicts exactly as the original would with the dropped terms ignored.
+    """
+    if keep_ratio >= 1.0:
+        return pipeline
+
+    cv = pipeline.named_steps['cv']
+    lr = pipeline.named_steps['lr']
+
+    weights = np.abs(lr.coef_).max(axis=0)
+    n_keep = max(1, int(len(weights) * keep_ratio))
+    keep = np.sort(np.argsort(weights)[::-1][:n_keep])
+
+    # Map old column -> new column for the kept features
+    remap = {old: new for new, old in enumerate(keep)}
+    cv.vocabulary_ = {term: remap[idx] for term, idx in cv.vocabulary_.items() if idx in remap}
+    if hasattr(cv, 'fixed_vocabulary_'):
+        cv.fixed_vocabulary_ = True
+    lr.coef_ = np.ascontiguousarray(lr.coef_[:, keep])
+    lr.n_features_in_ = n_keep
+
+    return pipeline
+
+
+def refit_on_vocabulary(pipeline, X_train, y_train):
+    """Re-fit the classifier on the (already pruned) vocabulary of a pipeline."""
+    vocabulary_ = pipeline.named_steps['cv'].vocabulary_
+    vocabulary = sorted(vocabulary_, key=vocabulary_.get)
+    refitted = build_pipeline(vocabulary=vocabulary)
+    refitted.fit(X_train, y_train)
+    return strip_fit_artifacts(refitted)
+
+
+def measure(pipeline, X_test, y_test):
+    """Measure artifact size, load time, predict latency and accuracy for a pipeline."""
+    buffer = io.BytesIO()
+    joblib.dump(pipeline, buffer)
+    artifact = buffer.getvalue()
+
+    start = time.perf_counter()
+    loaded = joblib.load(io.BytesIO(artifact))
+    load_time = time.perf_counter() - start
+
+    # Single-message latency, which is what the app pays per chat message
+    samples = list(X_test[:LATENCY_SAMPLES])
+    latencies = []
+    for text in samples:
+        start = time.perf_counter()
+        loaded.predict([text])
+        latencies.append(time.perf_counter() - start)
+
+    accuracy = accuracy_score(y_test, loaded.predict(X_test))
+
+    return {
+        'vocab_size': len(loaded.named_steps['cv'].vocabulary_),
+        'artifact_bytes': len(artifact),
+        'load_ms': load_time * 1000,
+        'predict_ms': float(np.median(latencies)) * 1000 if latencies else 0.0,
+        'accuracy': accuracy,
+    }
+
+
+def evaluate_candidates(X_train, X_test, y_train, y_test, refit=False):
+    """Build every pruning candidate on the training split and measure it on the test split."""
+    rows = []
+    for min_df, max_features in VOCAB_LIMITS:
+        base = build_pipeline(min_df=min_df, max_features=max_features)
+        base.fit(X_train, y_train)
+        strip_fit_artifacts(base)
+
+        for keep_ratio in KEEP_RATIOS:
+            candidate = joblib.load(_roundtrip(base))
+            candidate = drop_low_weight_features(candidate, keep_ratio)
+            if refit and keep_ratio < 1.0:
+                candidate = refit_on_vocabulary(candidate, X_train, y_train)
+
+            result = measure(candidate, X_test, y_test)
+            result.update({'min_df': min_df, 'max_features': max_features, 'keep_ratio': keep_ratio})
+            rows.append(result)
+            print(f"[INFO] min_df={min_df} max_features={max_features} keep={keep_ratio:.2f} "
+                  f"-> vocab={result['vocab_size']} acc={result['accuracy']:.4f}")
+    return rows
+
+
+def _roundtrip(pipeline):
+    """Serialize a pipeline to an in-memory buffer so it can be copied cheaply."""
+    buffer = io.BytesIO()
+    joblib.dump(pipeline, buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def select_smallest(rows, tolerance):
+    """Pick the smallest artifact whose accuracy is within `tolerance` of the best candidate."""
+    best_accuracy = max(row['accuracy'] for row in rows)
+    eligible = [row for row in rows if row['accuracy'] >= best_accuracy - tolerance]
+    return min(eligible, key=lambda row: (row['artifact_bytes'], -row['accuracy']))
+
+
+def print_table(rows, selected=None):
+    """Print the trade-off table."""
+    header = f"{'min_df':>6} {'max_feat':>8} {'keep':>5} {'vocab':>7} {'bytes':>10} {'load_ms':>8} {'pred_ms':>8} {'accuracy':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in sorted(rows, key=lambda r: r['artifact_bytes']):
+        marker = "  <- selected" if row is selected else ""
+        print(f"{row['min_df']:>6} {str(row['max_features']):>8} {row['keep_ratio']:>5.2f} "
+              f"{row['vocab_size']:>7} {row['artifact_bytes']:>10} {row['load_ms']:>8.1f} "
+              f"{row['predict_ms']:>8.3f} {row['accuracy']:>8.4f}{marker}")
+
+
+def build_final_model(config, X, y, refit=False):
+    """Train the selected configuration on the full dataset."""
+    pipeline = build_pipeline(min_df=config['min_df'], max_features=config['max_features'])
+    pipeline.fit(X, y)
+    strip_fit_artifacts(pipeline)
+    pipeline = drop_low_weight_features(pipeline, config['keep_ratio'])
+    if refit and config['keep_ratio'] < 1.0:
+        pipeline = refit_on_vocabulary(pipeline, X, y)
+    return pipeline
+
+
+def publish_pruned(pipeline, config, refit):
+    """Publish the written model as the registry's current emotion classifier version."""
+    from utils.model_registry import ModelRegistry
+
+    manifest = ModelRegistry().publish(
+        REGISTRY_NAME, MODEL_PATH,
+        metrics={"holdout_accuracy": round(config['accuracy'], 4),
+                 "vocab_size": len(pipeline.named_steps['cv'].vocabulary_)},
+        extra={"build_step": "prune_emotion_classifier",
+               "pruning": {"min_df": config['min_df'], "max_features": config['max_features'],
+                           "keep_ratio": config['keep_ratio'], "refit": refit}},
+    )
+    print(f"[INFO] Published {REGISTRY_NAME} {manifest['version']} to the model registry")
+    return manifest
+
+
+def record_build_state():
+    """Mark train_model.py's emotion_classifier step as built from the current inputs,
+    so the next build keeps the pruned model instead of retraining over it."""
+    from train_model import BUILD_STEPS, hash_inputs, hash_outputs, load_build_state, save_build_state
+
+    step = BUILD_STEPS["emotion_classifier"]
+    state = load_build_state()
+    state["emotion_classifier"] = {"inputs": hash_inputs(step), "outputs": hash_outputs(step)}
+    save_build_state(state)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prune the emotion classifier vocabulary and report size/latency trade-offs.")
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="Maximum accuracy drop allowed versus the best candidate (default: 0.01)")
+    parser.add_argument("--refit", action="store_true",
+                        help="Re-fit the classifier after dropping low-weight features")
+    parser.add_argument("--test-size", type=float, default=0.2,
+                        help="Fraction of the dataset held out for accuracy measurement")
+    parser.add_argument("--write", action="store_true",
+                        help=f"Retrain the selected configuration on the full dataset, save it to {MODEL_PATH} "
+                             "and publish it as the current registry version")
+    args = parser.parse_args(argv)
+
+    print("🚀 Starting vocabulary pruning for the emotion classifier...")
+
+    try:
+        X, y = load_dataset()
+    except FileNotFoundError:
+        print(f"Error: The dataset was not found at {DATA_PATH}")
+        return 1
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=args.test_size, random_state=42, stratify=y)
+
+    rows = evaluate_candidates(X_train, X_test, y_train, y_test, refit=args.refit)
+    selected = select_smallest(rows, args.tolerance)
+
+    print()
+    print_table(rows, selected)
+    print(f"\n[SUCCESS] Smallest model within {args.tolerance:.3f} accuracy: "
+          f"min_df={selected['min_df']}, max_features={selected['max_features']}, keep_ratio={selected['keep_ratio']:.2f} "
+          f"({selected['artifact_bytes']} bytes, accuracy {selected['accuracy']:.4f})")
+
+    if args.write:
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        pipeline = build_final_model(selected, X, y, refit=args.refit)
+        with open(MODEL_PATH, "wb") as f:
+            joblib.dump(pipeline, f)
+        print(f"✅ Pruned emotion classifier saved as {MODEL_PATH} "
+              f"({len(pipeline.named_steps['cv'].vocabulary_)} terms, {os.path.getsize(MODEL_PATH)} bytes)")
+        publish_pruned(pipeline, selected, args.refit)
+        record_build_state()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
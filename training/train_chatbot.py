@@ -1,20 +1,24 @@
 # training/train_chatbot.py
 
 import os
+import sys
 import json
-import pickle
 import random
 
 # Get the directory of the current script (e.g., .../training/)
 script_dir = os.path.dirname(os.path.abspath(__file__))
 # Get the parent directory (the project root, e.g., .../smart-mood-player/)
 project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from utils.chatbot_store import write_chat_store
 
 # Define paths relative to the project root
 DIALOGS_PATH = os.path.join(project_root, "data", "dialogs.txt")
 INTENT_PATH = os.path.join(project_root, "data", "intent.json")
 MODEL_DIR = os.path.join(project_root, "models")
-MODEL_PATH = os.path.join(MODEL_DIR, "chatbot_model.pkl")
+MODEL_PATH = os.path.join(MODEL_DIR, "chatbot_model.bin")
+INDEX_PATH = os.path.join(MODEL_DIR, "chatbot_index.npz")
 
 # Create models directory if it doesn't exist
 os.makedirs(MODEL_DIR, exist_ok=True)
@@ -55,14 +59,22 @@ try:
                 dialogs[trigger_key].extend(responses)
 except FileNotFoundError:
     print(f"Error: The intent file was not found at {INTENT_PATH}")
-    exit()
+    sys.exit(1)
 except json.JSONDecodeError:
     print(f"Error: Could not decode the JSON from {INTENT_PATH}")
-    exit()
+    sys.exit(1)
+
 
+# Save the dialogs dictionary as a compact, memory-mappable chat store
+write_chat_store(dialogs, MODEL_PATH)
 
-# Save the dialogs dictionary as a model
-with open(MODEL_PATH, "wb") as f:
-    pickle.dump(dialogs, f)
+print(f"✅ Chatbot model trained with {len(dialogs)} unique triggers and saved as {MODEL_PATH}")
+
+# Precompute the sparse BM25 retrieval index in the same pattern order as the model
+try:
+    from utils.chatbot_retrieval import BM25Index
 
-print(f"✅ Chatbot model trained with {len(dialogs)} unique triggers and saved as {MODEL_PATH}")
\ No newline at end of file
+    BM25Index.build(list(dialogs.keys())).save(INDEX_PATH)
+    print(f"✅ BM25 retrieval index saved as {INDEX_PATH}")
+except ImportError as e:
+    print(f"Warning: Could not build the BM25 index ({e}). The chatbot will build it at startup.")
@@ -1,17 +1,20 @@
 # training/train_emotion_classifier.py
 
 import os
+import sys
 import pandas as pd
 from sklearn.pipeline import Pipeline
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.linear_model import LogisticRegression
 import joblib
-import neattext.functions as nfx
 
 # Get the directory of the current script (e.g., .../training/)
 script_dir = os.path.dirname(os.path.abspath(__file__))
 # Get the parent directory (the project root, e.g., .../smart-mood-player/)
 project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from utils.emotion_text import clean_text, is_holdout
 
 # Define paths relative to the project root
 DATA_PATH = os.path.join(project_root, "data", "emotion_dataset_raw.csv")
@@ -29,11 +32,15 @@ try:
 except FileNotFoundError:
     print(f"Error: The dataset was not found at {DATA_PATH}")
     print("Please make sure the 'emotion_dataset_raw.csv' file is in the 'data' directory.")
-    exit()
+    sys.exit(1)
+
+# Keep the held-out split out of training so evaluate_models.py can score on it
+holdout = df['Text'].apply(is_holdout)
+df = df[~holdout].copy()
+print(f"Training on {len(df)} messages ({int(holdout.sum())} held out for evaluation)")
 
 # Data Cleaning
-df['Clean_Text'] = df['Text'].apply(nfx.remove_userhandles)
-df['Clean_Text'] = df['Clean_Text'].apply(nfx.remove_stopwords)
+df['Clean_Text'] = df['Text'].apply(clean_text)
 
 # Features and Labels
 Xfeatures = df['Clean_Text']
@@ -2,6 +2,7 @@
 
 import json
 import os
+import sys
 
 # Get the directory of the current script (e.g., .../training/)
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -10,6 +11,7 @@ project_root = os.path.dirname(script_dir)
 
 # Define the path relative to the project root
 INTENT_DATA_PATH = os.path.join(project_root, "data", "intent.json")
+CORPUS_PATH = os.path.join(project_root, "data", "intent_benchmark.tsv")
 
 print("🚀 Analyzing the intent detector...")
 
@@ -24,7 +26,7 @@ The intents are defined in `data/intent.json`, which contains patterns and keywo
 - Requesting songs by artist or title
 - Requesting songs for a specific activity (e.g., study, workout)
 
-The `utils/intent_detector.py` script contains the logic to match user input against these predefined patterns.
+The `utils/enhanced_intent_detector.py` script contains the logic to match user input against these predefined patterns.
 Therefore, no training is necessary for this component.
 """)
 
@@ -33,4 +35,18 @@ if os.path.exists(INTENT_DATA_PATH):
     print(f"[SUCCESS] Intent data file found at {INTENT_DATA_PATH}")
 else:
     # This error message will now show the correct, expected path
-    print(f"[ERROR] The intent data file was not found at {INTENT_DATA_PATH}")
\ No newline at end of file
+    print(f"[ERROR] The intent data file was not found at {INTENT_DATA_PATH}")
+
+# Benchmark the detector against the labeled corpus, if it has been built
+if os.path.exists(CORPUS_PATH):
+    sys.path.append(project_root)
+    from evaluate_intent_detector import load_corpus, run_accuracy, run_throughput, summarize
+
+    corpus = load_corpus(CORPUS_PATH)
+    outputs, timings = run_accuracy(corpus)
+    report = summarize(corpus, outputs, timings, run_throughput(corpus, repeat=1))
+    print(f"[INFO] Intent benchmark: {report['accuracy']:.2%} accuracy on {report['messages']} messages, "
+          f"{report['messages_per_second']:.0f} messages/s")
+    print("Run evaluate_intent_detector.py for the per-intent and per-stage report.")
+else:
+    print(f"[INFO] No benchmark corpus at {CORPUS_PATH}. Run training/build_intent_corpus.py to create it.")
@@ -0,0 +1,182 @@
+# utils/async_http.py
+import json
+import asyncio
+from urllib.parse import urlsplit, parse_qs
+
+REASONS = {
+    200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    408: "Request Timeout", 413: "Payload Too Large", 429: "Too Many Requests",
+    500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+MAX_HEADER_BYTES = 16 * 1024
+
+
+class HTTPError(Exception):
+    """Raised by handlers (or the parser) to answer with an error status and JSON message."""
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class Request:
+    def __init__(self, method, target, headers, body):
+        self.method = method
+        parts = urlsplit(target)
+        self.path = parts.path
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        if not self.body:
+            return {}
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+
+
+async def _read_head(reader, timeout):
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None  # Client closed an idle keep-alive connection
+        raise HTTPError(400, "Incomplete request")
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "Request headers too large")
+    lines = head.decode("latin-1").split("\r\n")
+    return lines[0], lines[1:]
+
+
+def _content_length(headers):
+    """The Content-Length header as a non-negative int (0 when absent)."""
+    value = headers.get("content-length", "") or "0"
+    if not (value.isascii() and value.isdigit()):
+        raise HTTPError(400, f"Invalid Content-Length: {value!r}")
+    return int(value)
+
+
+def _parse_headers(lines):
+    headers = {}
+    for line in lines:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return headers
+
+
+async def read_request(reader, max_body=64 * 1024, timeout=30.0):
+    """Read one HTTP/1.1 request; returns None when the client closed the connection."""
+    head = await _read_head(reader, timeout)
+    if head is None:
+        return None
+    request_line, header_lines = head
+    try:
+        method, target, _ = request_line.split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    headers = _parse_headers(header_lines)
+    length = _content_length(headers)
+    if length > max_body:
+        raise HTTPError(413, f"Request body over {max_body} bytes")
+    body = await asyncio.wait_for(reader.readexactly(length), timeout) if length else b""
+    return Request(method.upper(), target, headers, body)
+
+
+def encode_response(status, payload=None, headers=None, keep_alive=True):
+    body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}"]
+    all_headers = {"Content-Type": "application/json; charset=utf-8", "Content-Length": str(len(body)),
+                   "Connection": "keep-alive" if keep_alive else "close"}
+    all_headers.update(headers or {})
+    lines.extend(f"{name}: {value}" for name, value in all_headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+def connection_handler(handle, max_body=64 * 1024, idle_timeout=30.0):
+    """
+    Wrap `async handle(request) -> (status, payload[, headers])` as an
+    asyncio.start_server callback that serves keep-alive connections.
+    """
+    async def on_connection(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader, max_body, idle_timeout)
+                except HTTPError as e:
+                    writer.write(encode_response(e.status, {"error": e.message}, e.headers, keep_alive=False))
+                    break
+                except (asyncio.TimeoutError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                try:
+                    result = await handle(request)
+                    status, payload = result[0], result[1]
+                    headers = result[2] if len(result) > 2 else None
+                except HTTPError as e:
+                    status, payload, headers = e.status, {"error": e.message}, e.headers
+                except Exception as e:
+                    import traceback
+                    print(f"[ERROR] Unhandled error for {request.method} {request.path}: {type(e).__name__}: {e}")
+                    print(traceback.format_exc())
+                    status, payload, headers = 500, {"error": "Internal server error"}, None
+                writer.write(encode_response(status, payload, headers, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+    return on_connection
+
+
+class Connection:
+    """A minimal keep-alive JSON client connection (for the load test and local tools)."""
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None, timeout=30.0):
+        """Send one request; returns (status, headers, parsed JSON body or None)."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+        try:
+            status_line, header_lines = await _read_head(self.reader, timeout) or (None, None)
+            if status_line is None:
+                raise ConnectionError("Server closed the connection")
+            headers = _parse_headers(header_lines)
+            length = _content_length(headers)
+            data = await asyncio.wait_for(self.reader.readexactly(length), timeout) if length else b""
+        except Exception:
+            await self.close()
+            raise
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return int(status_line.split(" ", 2)[1]), headers, json.loads(data) if data else None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.reader = self.writer = None
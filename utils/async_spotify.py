@@ -0,0 +1,148 @@
+# utils/async_spotify.py
+import os
+import time
+import asyncio
+
+import aiohttp
+
+from utils.enhanced_spotify_utils import track_search_steps, artist_top_tracks_steps, playlist_search_steps
+
+API_URL = "https://api.spotify.com/v1/"
+TOKEN_URL = "https://accounts.spotify.com/api/token"
+
+
+class SpotifyRequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f"Spotify returned {status}: {message}")
+        self.status = status
+
+
+class AsyncSpotifyClient:
+    """
+    A client-credentials Spotify Web API client for asyncio.
+
+    All requests share one aiohttp session, so connections (and TLS) are
+    reused across searches; `max_connections` caps how many are open at once.
+    Each request has its own `timeout`. The access token is fetched once and
+    refreshed shortly before it expires, with concurrent callers waiting on
+    the same refresh. A 429 is retried once after its Retry-After.
+    """
+    def __init__(self, client_id, client_secret, api_url=None, token_url=None, timeout=5.0, max_connections=100):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.api_url = (api_url or API_URL).rstrip("/") + "/"
+        self.token_url = token_url or TOKEN_URL
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_connections = max_connections
+        self._session = None
+        self._token = None
+        self._token_expires = 0.0
+        self._token_lock = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _ensure_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._token_lock = asyncio.Lock()
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _access_token(self):
+        session = self._ensure_session()
+        async with self._token_lock:
+            if self._token is None or time.time() > self._token_expires - 60:
+                auth = aiohttp.BasicAuth(self.client_id, self.client_secret)
+                async with session.post(self.token_url, data={"grant_type": "client_credentials"}, auth=auth) as response:
+                    if response.status != 200:
+                        raise SpotifyRequestError(response.status, await response.text())
+                    data = await response.json(content_type=None)
+                self._token = data["access_token"]
+                self._token_expires = time.time() + int(data.get("expires_in", 3600))
+            return self._token
+
+    async def _get(self, path, params):
+        session = self._ensure_session()
+        url = self.api_url + path
+        params = {key: value for key, value in params.items() if value is not None}
+        for attempt in range(2):
+            token = await self._access_token()
+            async with session.get(url, params=params, headers={"Authorization": f"Bearer {token}"}) as response:
+                if response.status == 200:
+                    return await response.json(content_type=None)
+                if response.status == 401 and attempt == 0:
+                    self._token = None  # Expired or revoked; fetch a new one and retry
+                    continue
+                if response.status == 429 and attempt == 0:
+                    await asyncio.sleep(min(float(response.headers.get("Retry-After", 1)), 10))
+                    continue
+                raise SpotifyRequestError(response.status, await response.text())
+
+    async def search(self, q, limit=10, offset=0, type="track", market=None):
+        return await self._get("search", {"q": q, "limit": limit, "offset": offset, "type": type, "market": market})
+
+    async def artist_top_tracks(self, artist_id, country="US"):
+        artist_id = artist_id.split(":")[-1]
+        return await self._get(f"artists/{artist_id}/top-tracks", {"country": country})
+
+    async def call(self, kind, arg, label=None):
+        """Perform one search-step request (see enhanced_spotify_utils.drive_search_steps)."""
+        if kind == "search":
+            return await self.search(**arg)
+        if kind == "artist_top_tracks":
+            return await self.artist_top_tracks(arg)
+        raise ValueError(f"Unknown Spotify request '{kind}'")
+
+
+def get_async_spotify_client(timeout=5.0, max_connections=100):
+    """Build an AsyncSpotifyClient from the same environment as get_spotify_client (None if unconfigured)."""
+    client_id = os.getenv("SPOTIPY_CLIENT_ID")
+    client_secret = os.getenv("SPOTIPY_CLIENT_SECRET")
+    if not client_id or not client_secret:
+        print("[ERROR] Missing Spotify credentials. Please check your .env file.")
+        return None
+    return AsyncSpotifyClient(client_id, client_secret, api_url=os.getenv("SPOTIFY_API_URL"),
+                              token_url=os.getenv("SPOTIFY_TOKEN_URL"), timeout=timeout,
+                              max_connections=max_connections)
+
+
+async def drive_search_steps_async(steps, call):
+    """Async counterpart of drive_search_steps: `await call(kind, arg, label)` for each request."""
+    try:
+        request = next(steps)
+        while True:
+            try:
+                response = await call(*request)
+            except asyncio.CancelledError:
+                steps.close()
+                raise
+            except Exception as e:
+                request = steps.throw(e)
+            else:
+                request = steps.send(response)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def async_search_for_track(client, query, limit=5):
+    """Async search_for_track; returns the same formatted track dicts."""
+    return await drive_search_steps_async(track_search_steps(query, limit), client.call)
+
+
+async def async_search_for_artist_top_tracks(client, artist_name):
+    """Async search_for_artist_top_tracks; returns the same formatted track dicts."""
+    return await drive_search_steps_async(artist_top_tracks_steps(artist_name), client.call)
+
+
+async def async_search_for_playlists(client, query, limit=10):
+    """Async search_for_playlists; returns the same formatted playlist dicts."""
+    return await drive_search_steps_async(playlist_search_steps(query, limit), client.call)
@@ -0,0 +1,163 @@
+# utils/chat_transcript.py
+from collections import deque, namedtuple
+from datetime import datetime
+
+import customtkinter as ctk
+
+TranscriptMessage = namedtuple("TranscriptMessage", ["sender", "text", "timestamp"])
+
+
+class Transcript:
+    """The full chat history as plain data; widgets only ever show a window of it."""
+    def __init__(self):
+        self.messages = []
+
+    def append(self, sender, text, timestamp=None):
+        message = TranscriptMessage(sender, text, timestamp or datetime.now())
+        self.messages.append(message)
+        return message
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __getitem__(self, index):
+        return self.messages[index]
+
+
+class ChatBubble:
+    """
+    One reusable chat row. It holds the widgets for both user and bot messages
+    and switches between the two layouts when it is refilled.
+    """
+    def __init__(self, parent, accent_color):
+        self.accent_color = accent_color
+        self.sender = None
+
+        self.container = ctk.CTkFrame(parent, fg_color="transparent")
+        self.time_label = ctk.CTkLabel(self.container, text="", font=("Poppins", 10, "bold"), text_color="#94A3B8")
+        self.bubble = ctk.CTkFrame(self.container, corner_radius=12, border_width=1)
+
+        # Bot-only header with icon and name
+        self.header_frame = ctk.CTkFrame(self.bubble, fg_color="transparent")
+        ctk.CTkLabel(self.header_frame, text="🤖", font=("Poppins", 13)).pack(side="left", padx=(0, 4))
+        ctk.CTkLabel(self.header_frame, text="Smart Music Bot", font=("Poppins", 11, "bold"),
+                     text_color="#E2E8F0").pack(side="left")
+
+        self.label = ctk.CTkLabel(self.bubble, text="", font=("Poppins", 13), text_color="white",
+                                  wraplength=400, justify="left")
+        # Bot-only timestamp inside the bubble
+        self.inner_time_label = ctk.CTkLabel(self.bubble, text="", font=("Poppins", 10, "bold"),
+                                             text_color="#94A3B8")
+
+    def _layout(self, sender):
+        """Re-pack the children for the sender's layout (only when it changes)."""
+        for widget in (self.time_label, self.bubble, self.header_frame, self.label, self.inner_time_label):
+            widget.pack_forget()
+        if sender == "You":
+            self.time_label.pack(anchor="e", padx=20, pady=(2, 0))
+            self.bubble.configure(fg_color=self.accent_color, border_color="#60A5FA")
+            self.bubble.pack(anchor="e", padx=15, pady=(0, 2), ipadx=12, ipady=8)
+            self.label.pack(padx=10, pady=2)
+        else:
+            self.time_label.pack(anchor="w", padx=20, pady=(2, 0))
+            self.bubble.configure(fg_color="#1E293B", border_color="#3B82F6")
+            self.bubble.pack(anchor="w", padx=15, pady=(0, 2), ipadx=12, ipady=6)
+            self.header_frame.pack(fill="x", padx=8, pady=(4, 2))
+            self.label.pack(padx=5)
+            self.inner_time_label.pack(anchor="w", padx=15, pady=(5, 8))
+        self.sender = sender
+
+    def update(self, message):
+        sender = "You" if message.sender == "You" else "Bot"
+        if sender != self.sender:
+            self._layout(sender)
+        time_text = message.timestamp.strftime("%H:%M")
+        self.time_label.configure(text=time_text)
+        self.label.configure(text=message.text)
+        if sender == "Bot":
+            self.inner_time_label.configure(text=time_text)
+
+
+class ChatTranscriptView:
+    """
+    Renders a window of at most `max_bubbles` messages from a Transcript.
+
+    New messages recycle the oldest bubble instead of adding widgets, so
+    widget count, layout cost and memory stay constant however long the
+    session runs. Older messages remain in the Transcript and can be paged
+    back in with the "Show earlier messages" button.
+    """
+    def __init__(self, parent, transcript=None, max_bubbles=50, accent_color="#3B82F6"):
+        self.parent = parent
+        self.transcript = transcript or Transcript()
+        self.max_bubbles = max_bubbles
+        self.accent_color = accent_color
+        self.bubbles = deque()  # In on-screen order
+        self.start = 0  # Transcript index of the first rendered message
+
+        self.earlier_button = ctk.CTkButton(parent, text="Show earlier messages", height=24,
+                                            fg_color="transparent", border_width=1, border_color=accent_color,
+                                            command=self.show_earlier)
+        self.latest_button = ctk.CTkButton(parent, text="Back to latest messages", height=24,
+                                           fg_color="transparent", border_width=1, border_color=accent_color,
+                                           command=self.show_latest)
+
+    @property
+    def end(self):
+        return self.start + len(self.bubbles)
+
+    def append(self, sender, text):
+        """Record a message and show it at the bottom of the chat."""
+        message = self.transcript.append(sender, text)
+        if self.end < len(self.transcript) - 1:
+            # The user paged back; jump to the latest messages again
+            self._render(max(0, len(self.transcript) - self.max_bubbles))
+            return message
+
+        if len(self.bubbles) < self.max_bubbles:
+            bubble = ChatBubble(self.parent, self.accent_color)
+        else:
+            # Recycle the oldest bubble as the newest one
+            bubble = self.bubbles.popleft()
+            bubble.container.pack_forget()
+            self.start += 1
+        bubble.update(message)
+        bubble.container.pack(fill="x", pady=2)
+        self.bubbles.append(bubble)
+        self._update_earlier_button()
+        return message
+
+    def show_earlier(self):
+        """Page the window back by up to `max_bubbles` messages."""
+        self._render(max(0, self.start - self.max_bubbles))
+
+    def show_latest(self):
+        self._render(max(0, len(self.transcript) - self.max_bubbles))
+        self.scroll_to_end()
+
+    def _render(self, start):
+        """Refill the existing bubbles with transcript[start:start + max_bubbles]."""
+        messages = self.transcript[start:start + self.max_bubbles]
+        while len(self.bubbles) < len(messages):
+            bubble = ChatBubble(self.parent, self.accent_color)
+            bubble.container.pack(fill="x", pady=2)
+            self.bubbles.append(bubble)
+        for bubble, message in zip(self.bubbles, messages):
+            bubble.update(message)
+        self.start = start
+        self._update_earlier_button()
+        if self.end < len(self.transcript):
+            if not self.latest_button.winfo_manager():
+                self.latest_button.pack(pady=4)
+        else:
+            self.latest_button.pack_forget()
+
+    def _update_earlier_button(self):
+        if self.start > 0 and self.bubbles:
+            if not self.earlier_button.winfo_manager():
+                self.earlier_button.pack(pady=4, before=self.bubbles[0].container)
+        else:
+            self.earlier_button.pack_forget()
+
+    def scroll_to_end(self):
+        self.parent._parent_canvas.yview_moveto(1.0)
@@ -0,0 +1,152 @@
+# utils/chatbot_retrieval.py
+import re
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+from utils.chatbot_store import patterns_digest
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text):
+    """Lowercase word tokens used for both patterns and queries."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Sparse BM25 retrieval over chatbot trigger patterns.
+
+    Weights are precomputed into a (terms x patterns) CSR matrix, so scoring a
+    query is one sparse vector-matrix product (plus argpartition for top-k)
+    whose cost depends on the postings of the query terms rather than on the
+    number of patterns. Each
+    term keeps at most `max_postings` of its highest-weight patterns, which
+    bounds that cost for very common words as the corpus grows.
+    """
+    DEFAULT_MAX_POSTINGS = 1024
+
+    def __init__(self, terms, term_doc, digest):
+        self.terms = list(terms)
+        self.term_ids = {term: i for i, term in enumerate(self.terms)}
+        self.term_doc = term_doc.tocsr()
+        self.digest = digest
+
+    @property
+    def num_patterns(self):
+        return self.term_doc.shape[1]
+
+    @classmethod
+    def build(cls, patterns, k1=1.5, b=0.75, max_postings=DEFAULT_MAX_POSTINGS):
+        """Build the index from patterns in model key order (pattern id = position)."""
+        term_ids = {}
+        rows, cols, tfs = [], [], []
+        doc_lengths = np.zeros(len(patterns), dtype=np.float64)
+
+        for doc_id, pattern in enumerate(patterns):
+            counts = Counter(tokenize(pattern))
+            doc_lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                rows.append(term_ids.setdefault(term, len(term_ids)))
+                cols.append(doc_id)
+                tfs.append(tf)
+
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+        tf = np.asarray(tfs, dtype=np.float64)
+
+        n = len(patterns)
+        df = np.bincount(rows, minlength=len(term_ids))
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        avg_length = doc_lengths.mean() if n else 1.0
+        length_norm = k1 * (1 - b + b * doc_lengths[cols] / max(avg_length, 1e-9))
+        weights = idf[rows] * tf * (k1 + 1) / (tf + length_norm)
+
+        term_doc = sparse.csr_matrix((weights.astype(np.float32), (rows, cols)), shape=(len(term_ids), n))
+        if max_postings:
+            term_doc = cls._prune_postings(term_doc, max_postings)
+        terms = sorted(term_ids, key=term_ids.get)
+        return cls(terms, term_doc, patterns_digest(patterns))
+
+    @staticmethod
+    def _prune_postings(term_doc, max_postings):
+        """Keep only the `max_postings` highest-weight patterns of every term."""
+        lengths = np.diff(term_doc.indptr)
+        if lengths.max(initial=0) <= max_postings:
+            return term_doc
+        term_doc = term_doc.tolil()
+        for term_id in np.flatnonzero(lengths > max_postings):
+            doc_ids = np.asarray(term_doc.rows[term_id])
+            weights = np.asarray(term_doc.data[term_id])
+            keep = np.sort(np.argpartition(-weights, max_postings - 1)[:max_postings])
+            term_doc.rows[term_id] = doc_ids[keep].tolist()
+            term_doc.data[term_id] = weights[keep].tolist()
+        return term_doc.tocsr()
+
+    def _scores(self, text):
+        """Return (pattern_ids, scores) for every pattern sharing a term with `text`.
+
+        The query is a binary term vector, so the vector-matrix product is the
+        sum of the query terms' rows. It is computed directly on the CSR
+        arrays, which avoids building a scipy matrix for every query.
+        """
+        ids = {self.term_ids[term] for term in tokenize(text) if term in self.term_ids}
+        if not ids:
+            return None, None
+        indptr, indices, data = self.term_doc.indptr, self.term_doc.indices, self.term_doc.data
+        if len(ids) == 1:
+            term_id = ids.pop()
+            doc_ids = indices[indptr[term_id]:indptr[term_id + 1]]
+            return (doc_ids, data[indptr[term_id]:indptr[term_id + 1]]) if len(doc_ids) else (None, None)
+
+        doc_ids = np.concatenate([indices[indptr[i]:indptr[i + 1]] for i in ids])
+        if not len(doc_ids):
+            return None, None
+        weights = np.concatenate([data[indptr[i]:indptr[i + 1]] for i in ids])
+        doc_ids, positions = np.unique(doc_ids, return_inverse=True)
+        return doc_ids, np.bincount(positions, weights=weights)
+
+    def top_k(self, text, k=5):
+        """Return up to k (pattern_id, score) pairs, best first; ties go to the earlier pattern."""
+        doc_ids, data = self._scores(text)
+        if doc_ids is None:
+            return []
+        if k < len(data):
+            part = np.argpartition(-data, k - 1)[:k]
+            doc_ids, data = doc_ids[part], data[part]
+        order = np.lexsort((doc_ids, -data))
+        return [(int(doc_ids[i]), float(data[i])) for i in order]
+
+    def best(self, text):
+        """Return the id of the best-scoring pattern, or None if nothing matches."""
+        doc_ids, data = self._scores(text)
+        if doc_ids is None:
+            return None
+        top = data.max()
+        if top <= 0:
+            return None
+        return int(doc_ids[np.flatnonzero(data == top)].min())
+
+    def save(self, path):
+        """Save the index as an uncompressed .npz so it loads without decompression."""
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                terms=np.asarray(self.terms, dtype=np.str_),
+                data=self.term_doc.data,
+                indices=self.term_doc.indices,
+                indptr=self.term_doc.indptr,
+                shape=np.asarray(self.term_doc.shape, dtype=np.int64),
+                digest=np.asarray(self.digest),
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as archive:
+            term_doc = sparse.csr_matrix(
+                (archive["data"], archive["indices"], archive["indptr"]),
+                shape=tuple(archive["shape"]),
+            )
+            return cls(archive["terms"].tolist(), term_doc, str(archive["digest"]))
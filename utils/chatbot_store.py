@@ -0,0 +1,328 @@
+# utils/chatbot_store.py
+import os
+import sys
+import mmap
+import struct
+import hashlib
+import zlib
+from collections import defaultdict
+
+MAGIC = b"SMPCHAT2"
+# Files written by older versions of write_chat_store start with this too
+MAGIC_PREFIX = b"SMPCHAT"
+
+# Header: magic, counts, the byte offset of every section, the array typecode of every
+# section but the blob, then the pattern digest
+_SECTIONS = (
+    "string_offsets",    # [n_strings + 1] offsets into the string blob
+    "trigger_table",     # open-addressing hash table of trigger id + 1 (0 = empty slot)
+    "response_offsets",  # [n_triggers + 1] offsets into response_strings
+    "response_strings",  # [n_responses] string id of each response
+    "token_table",       # open-addressing hash table of token id + 1 (0 = empty slot)
+    "posting_offsets",   # [n_tokens + 1] offsets into postings
+    "postings",          # [n_postings] trigger ids per token, ascending
+    "blob",              # UTF-8 bytes of every interned string
+)
+_ARRAYS = _SECTIONS[:-1]
+_HEADER = struct.Struct(f"<8sIIIII{len(_SECTIONS)}Q{len(_ARRAYS)}s20s")
+
+
+def patterns_digest(patterns):
+    """Fingerprint of the pattern list, used to check an index matches its model."""
+    digest = hashlib.sha1()
+    for pattern in patterns:
+        digest.update(pattern.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _typecode(max_value):
+    """Narrowest unsigned array typecode that holds `max_value`."""
+    for typecode, limit in (("B", 0xFF), ("H", 0xFFFF), ("I", 0xFFFFFFFF)):
+        if max_value <= limit:
+            return typecode
+    return "Q"
+
+
+def _pad(f, alignment=8):
+    remainder = f.tell() % alignment
+    if remainder:
+        f.write(b"\0" * (alignment - remainder))
+
+
+def _write_array(f, typecode, values):
+    import array
+    data = array.array(typecode, values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    _pad(f)
+    offset = f.tell()
+    f.write(data.tobytes())
+    return offset
+
+
+def _table_size(n_keys):
+    """Slot count that keeps a hash table of `n_keys` at most two-thirds full."""
+    return n_keys + n_keys // 2 + 1
+
+
+def _hash_table(keys):
+    """Open-addressing table (linear probing) of key index + 1, slotted by CRC-32."""
+    size = _table_size(len(keys))
+    table = [0] * size
+    for i, key in enumerate(keys):
+        slot = zlib.crc32(key) % size
+        while table[slot]:
+            slot = (slot + 1) % size
+        table[slot] = i + 1
+    return table
+
+
+def write_chat_store(chat_pairs, path):
+    """Write a trigger -> responses mapping in the compact chat store format.
+
+    Triggers take string ids 0..n_triggers-1 in model order and tokens the
+    next n_tokens ids, so neither needs an id array; responses refer to
+    interned strings by id, so a response repeated across triggers (or equal
+    to a trigger) is stored once. Every array uses the narrowest integer
+    type its values fit, and exact lookups go through CRC-32 hash tables.
+    """
+    string_ids = {}
+    strings = []
+
+    def intern(text, unique=False):
+        string_id = None if unique else string_ids.get(text)
+        if string_id is None:
+            string_id = len(strings)
+            string_ids.setdefault(text, string_id)
+            strings.append(text.encode("utf-8"))
+        return string_id
+
+    triggers = list(chat_pairs.keys())
+    for trigger in triggers:
+        intern(trigger, unique=True)
+
+    postings_by_token = defaultdict(list)
+    for trigger_id, trigger in enumerate(triggers):
+        for token in set(trigger.split()):
+            postings_by_token[token].append(trigger_id)
+    tokens = list(postings_by_token)
+    for token in tokens:
+        intern(token, unique=True)
+    posting_offsets = [0]
+    postings = []
+    for token in tokens:
+        postings.extend(postings_by_token[token])
+        posting_offsets.append(len(postings))
+
+    response_offsets = [0]
+    response_strings = []
+    for trigger in triggers:
+        responses = chat_pairs[trigger]
+        if not isinstance(responses, list):
+            responses = [responses]
+        response_strings.extend(intern(response) for response in responses)
+        response_offsets.append(len(response_strings))
+
+    string_offsets = [0]
+    for data in strings:
+        string_offsets.append(string_offsets[-1] + len(data))
+
+    arrays = {
+        "string_offsets": string_offsets,
+        "trigger_table": _hash_table(strings[:len(triggers)]),
+        "response_offsets": response_offsets,
+        "response_strings": response_strings,
+        "token_table": _hash_table(strings[len(triggers):len(triggers) + len(tokens)]),
+        "posting_offsets": posting_offsets,
+        "postings": postings,
+    }
+    typecodes = {name: _typecode(max(values, default=0)) for name, values in arrays.items()}
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        offsets = {name: _write_array(f, typecodes[name], arrays[name]) for name in _ARRAYS}
+        _pad(f)
+        offsets["blob"] = f.tell()
+        for data in strings:
+            f.write(data)
+
+        f.seek(0)
+        f.write(_HEADER.pack(
+            MAGIC, len(strings), len(triggers), len(response_strings), len(tokens), len(postings),
+            *(offsets[name] for name in _SECTIONS),
+            "".join(typecodes[name] for name in _ARRAYS).encode("ascii"),
+            bytes.fromhex(patterns_digest(triggers)),
+        ))
+    os.replace(tmp_path, path)
+
+
+class _Patterns:
+    """Sequence view of the triggers in model order."""
+    def __init__(self, store):
+        self._store = store
+
+    def __len__(self):
+        return len(self._store)
+
+    def __getitem__(self, trigger_id):
+        return self._store.trigger(trigger_id)
+
+
+class _TokenIndex:
+    """Read-only token -> trigger-id postings view backed by the mapped file."""
+    def __init__(self, store):
+        self._store = store
+
+    def __contains__(self, token):
+        return self._store._find_token(token) is not None
+
+    def __getitem__(self, token):
+        postings = self.get(token)
+        if postings is None:
+            raise KeyError(token)
+        return postings
+
+    def get(self, token, default=None):
+        index = self._store._find_token(token)
+        return default if index is None else self._store._postings_at(index)
+
+
+class ChatStore:
+    """
+    Memory-mapped, read-only chatbot model.
+
+    Behaves like the trigger -> list-of-responses dict that train_chatbot.py
+    pickles, but nothing is decoded until it is looked up, so opening a large
+    model costs neither a full unpickle nor per-object memory.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if sys.byteorder != "little":
+            raise OSError("The chat store format requires a little-endian machine")
+
+        magic = self._mmap[:len(MAGIC)]
+        if magic != MAGIC:
+            self._mmap.close()
+            if magic.startswith(MAGIC_PREFIX):
+                raise ValueError(f"{path} uses an older chat store format; re-run training/train_chatbot.py")
+            raise ValueError(f"{path} is not a chat store file")
+        header = _HEADER.unpack_from(self._mmap, 0)
+        self._n_strings, self._n_triggers, self._n_responses, self._n_tokens, self._n_postings = header[1:6]
+        offsets = dict(zip(_SECTIONS, header[6:6 + len(_SECTIONS)]))
+        typecodes = dict(zip(_ARRAYS, header[-2].decode("ascii")))
+        self.digest = header[-1].hex()
+
+        view = memoryview(self._mmap)
+        sections = {}
+        for name, count in (("string_offsets", self._n_strings + 1), ("response_offsets", self._n_triggers + 1),
+                            ("response_strings", self._n_responses), ("posting_offsets", self._n_tokens + 1),
+                            ("postings", self._n_postings)):
+            sections[name] = self._section(view, offsets[name], count, typecodes[name])
+        for name, keys in (("trigger_table", self._n_triggers), ("token_table", self._n_tokens)):
+            sections[name] = self._section(view, offsets[name], _table_size(keys), typecodes[name])
+        self._sections = list(sections.values())
+        self._string_offsets = sections["string_offsets"]
+        self._trigger_table = sections["trigger_table"]
+        self._response_offsets = sections["response_offsets"]
+        self._response_strings = sections["response_strings"]
+        self._token_table = sections["token_table"]
+        self._posting_offsets = sections["posting_offsets"]
+        self._postings = sections["postings"]
+        self._blob_offset = offsets["blob"]
+
+        self.patterns = _Patterns(self)
+        self.token_index = _TokenIndex(self)
+
+    @staticmethod
+    def _section(view, offset, count, typecode):
+        size = struct.calcsize(typecode)
+        return view[offset:offset + count * size].cast(typecode)
+
+    def _string_bytes(self, string_id):
+        start = self._blob_offset + self._string_offsets[string_id]
+        return self._mmap[start:self._blob_offset + self._string_offsets[string_id + 1]]
+
+    def _string(self, string_id):
+        return self._string_bytes(string_id).decode("utf-8")
+
+    def _lookup(self, key, table, first_string_id):
+        """Probe a hash table for the UTF-8 `key`; return its index (string id - first_string_id) or None."""
+        mapped, offsets, base = self._mmap, self._string_offsets, self._blob_offset
+        size = len(table)
+        slot = zlib.crc32(key) % size
+        while True:
+            entry = table[slot]
+            if not entry:
+                return None
+            string_id = first_string_id + entry - 1
+            if mapped[base + offsets[string_id]:base + offsets[string_id + 1]] == key:
+                return entry - 1
+            slot = (slot + 1) % size
+
+    def find(self, trigger):
+        """Return the trigger id of an exact trigger, or None."""
+        return self._lookup(trigger.encode("utf-8"), self._trigger_table, 0)
+
+    def _find_token(self, token):
+        return self._lookup(token.encode("utf-8"), self._token_table, self._n_triggers)
+
+    def _postings_at(self, token_index):
+        return self._postings[self._posting_offsets[token_index]:self._posting_offsets[token_index + 1]]
+
+    def trigger(self, trigger_id):
+        return self._string(trigger_id)
+
+    def responses_at(self, trigger_id):
+        start, end = self._response_offsets[trigger_id], self._response_offsets[trigger_id + 1]
+        return [self._string(self._response_strings[i]) for i in range(start, end)]
+
+    # Mapping interface, so the store can stand in for the pickled dict
+    def __len__(self):
+        return self._n_triggers
+
+    def __contains__(self, trigger):
+        return isinstance(trigger, str) and self.find(trigger) is not None
+
+    def __getitem__(self, trigger):
+        trigger_id = self.find(trigger)
+        if trigger_id is None:
+            raise KeyError(trigger)
+        return self.responses_at(trigger_id)
+
+    def get(self, trigger, default=None):
+        trigger_id = self.find(trigger)
+        return default if trigger_id is None else self.responses_at(trigger_id)
+
+    def keys(self):
+        return (self.trigger(i) for i in range(self._n_triggers))
+
+    __iter__ = keys
+
+    def items(self):
+        return ((self.trigger(i), self.responses_at(i)) for i in range(self._n_triggers))
+
+    def close(self):
+        """Release the mapping. Views handed out earlier must not be used afterwards."""
+        # The section views export the mapping; mmap.close() refuses while any is alive
+        for section in self._sections:
+            section.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Views are still referenced; the mapping is released with them
+            pass
+
+
+def load_chat_model(path):
+    """Open a chatbot model, memory-mapping chat store files and unpickling anything else."""
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+    if magic.startswith(MAGIC_PREFIX):
+        return ChatStore(path)
+    import pickle
+    with open(path, "rb") as f:
+        return pickle.load(f)
@@ -0,0 +1,17 @@
+# utils/emotion_text.py
+import zlib
+
+# One dataset message in this many is held out of training, so evaluate_models.py measures generalization
+HOLDOUT_BUCKETS = 10
+
+
+def clean_text(text):
+    """The cleaning the emotion classifier is trained on; predictions must apply it too."""
+    # neattext is imported on first use so importing the mood detector stays cheap
+    import neattext.functions as nfx
+    return nfx.remove_stopwords(nfx.remove_userhandles(str(text)))
+
+
+def is_holdout(text):
+    """Whether a dataset message is in the held-out evaluation split (decided by its text, so stable across runs)."""
+    return zlib.crc32(str(text).encode("utf-8")) % HOLDOUT_BUCKETS == 0
@@ -1,70 +1,202 @@
-import pickle
 import os
-import json
 import random
 import re
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from collections import deque
+from collections import deque, defaultdict, Counter
+from itertools import chain
+
+from utils.model_registry import ModelRegistry, RegistryWatcher, resolve_model_path
+from utils.chatbot_store import ChatStore, load_chat_model, patterns_digest
+from utils.routing_tables import shared_routing_tables
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# Compact memory-mapped chat store written by train_chatbot.py (pickled dicts still load)
+DEFAULT_MODEL_PATH = os.path.join(script_dir, "..", "models", "chatbot_model.bin")
+REGISTRY_NAME = "chatbot_model"
+# Precomputed BM25 index written next to the model by train_chatbot.py
+INDEX_FILENAME = "chatbot_index.npz"
 
 class EnhancedChatbot:
-    def __init__(self):
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        model_path = os.path.join(script_dir, "..", "models", "chatbot_model.pkl")
-        emotion_path = os.path.join(script_dir, "..", "data", "emotion_responses.json")
-        
-        # Load chatbot model
-        try:
-            with open(model_path, "rb") as f:
-                self.chat_pairs = pickle.load(f)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Chatbot model not found at {model_path}. Please run the training script.")
-            
-        # Load emotion responses
-        try:
-            with open(emotion_path, "rb") as f:
-                self.emotion_responses = json.load(f)["moods"]
-        except FileNotFoundError:
-            print(f"Warning: Emotion responses not found at {emotion_path}")
-            self.emotion_responses = {}
-        
+    def __init__(self, model_path=None, registry=None, retrieval="bm25", routing=None):
+        """
+        `retrieval` selects how partial matches are ranked: "bm25" (sparse BM25
+        scoring, falls back to "overlap" if scipy is unavailable) or "overlap"
+        (most shared words). Emotion responses come from `routing`, a
+        RoutingTableStore (default: the one shared with the recommendation engine).
+        """
+        # Load chatbot model, preferring the registry's current version
+        self.registry = registry or ModelRegistry()
+        if model_path is None:
+            model_path = resolve_model_path(REGISTRY_NAME, DEFAULT_MODEL_PATH, self.registry)
+        self.retrieval = retrieval
+        # Lookups in flight per model (by id), so a swapped-out model is closed only once they finish
+        self._model_readers = Counter()
+        self._model_changed = threading.Condition()
+        self._model = self._build_model(self._load_chat_pairs(model_path), model_path)
+        self.model_path = model_path
+        self._watcher = None
+        self.routing = routing or shared_routing_tables()
+
         self.conversation_history = deque(maxlen=10)  # Keep last 10 messages for context
+        # get_response is called from several worker threads and mutates the history and last_* fields
+        self._conversation_lock = threading.Lock()
         self.session_start = datetime.now()
         self.last_intent = None
         self.last_emotion = None
         self.context = {}
 
+    @property
+    def emotion_responses(self):
+        """emotion -> {"responses", "playlists"} from the current routing tables."""
+        return self.routing.get().moods
+
+    def _load_chat_pairs(self, model_path):
+        """Load the trigger -> responses mapping (a ChatStore or a pickled dict)."""
+        try:
+            return load_chat_model(model_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Chatbot model not found at {model_path}. Please run the training script.")
+
+    def _build_model(self, chat_pairs, model_path):
+        """Bundle the chat pairs with a token -> pattern-id inverted index.
+
+        Pattern ids follow the model's key order, so ties are broken exactly as
+        a linear scan over ``chat_pairs`` would break them. A ChatStore already
+        carries the pattern list and inverted index in its mapped file, so
+        nothing is decoded or rebuilt here.
+        """
+        if isinstance(chat_pairs, ChatStore):
+            patterns, index, digest = chat_pairs.patterns, chat_pairs.token_index, chat_pairs.digest
+        else:
+            patterns = list(chat_pairs.keys())
+            index = defaultdict(list)
+            for pattern_id, pattern in enumerate(patterns):
+                for token in set(pattern.split()):
+                    index[token].append(pattern_id)
+            index, digest = dict(index), None
+        bm25 = self._load_bm25(patterns, model_path, digest) if self.retrieval == "bm25" else None
+        return chat_pairs, patterns, index, bm25
+
+    def _load_bm25(self, patterns, model_path, digest=None):
+        """Load the precomputed BM25 index for a model, or build it if missing or stale."""
+        try:
+            from utils.chatbot_retrieval import BM25Index
+        except ImportError as e:
+            print(f"[WARNING] BM25 retrieval unavailable ({e}); using word overlap.")
+            return None
+
+        index_path = os.path.join(os.path.dirname(model_path), INDEX_FILENAME)
+        if os.path.exists(index_path):
+            try:
+                bm25 = BM25Index.load(index_path)
+                if bm25.num_patterns == len(patterns) and bm25.digest == (digest or patterns_digest(patterns)):
+                    return bm25
+                print(f"[WARNING] {index_path} does not match the chatbot model; rebuilding it in memory.")
+            except Exception as e:
+                print(f"[WARNING] Could not load {index_path}: {e}")
+        return BM25Index.build([patterns[i] for i in range(len(patterns))])
+
+    @property
+    def chat_pairs(self):
+        return self._model[0]
+
+    @contextmanager
+    def _using_model(self):
+        """Yield the current model, keeping it open until the block exits even if it is swapped out meanwhile."""
+        with self._model_changed:
+            model = self._model
+            self._model_readers[id(model)] += 1
+        try:
+            yield model
+        finally:
+            with self._model_changed:
+                self._model_readers[id(model)] -= 1
+                if not self._model_readers[id(model)]:
+                    del self._model_readers[id(model)]
+                    self._model_changed.notify_all()
+
+    def _swap_model(self, model):
+        """Make `model` current, then close the previous one once no lookup is using it."""
+        with self._model_changed:
+            previous, self._model = self._model, model
+            while self._model_readers[id(previous)]:
+                self._model_changed.wait()
+        if isinstance(previous[0], ChatStore):
+            previous[0].close()
+
+    def reload(self, model_path, background=True):
+        """Load a new chatbot model and swap it in without pausing in-flight responses."""
+        def load_and_swap():
+            try:
+                model = self._build_model(self._load_chat_pairs(model_path), model_path)
+            except Exception as e:
+                print(f"[WARNING] Keeping the current chatbot model; reload failed: {e}")
+                return
+            self.model_path = model_path
+            self._swap_model(model)
+            print(f"[SUCCESS] Chatbot switched to '{model_path}'.")
+
+        if not background:
+            load_and_swap()
+            return None
+        thread = threading.Thread(target=load_and_swap, name="chatbot-model-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def watch_registry(self, interval=5.0):
+        """Hot-swap to new registry versions as they are activated."""
+        if self._watcher is None:
+            self._watcher = RegistryWatcher(
+                self.registry, REGISTRY_NAME,
+                lambda path, version: self.reload(path, background=False),
+                interval=interval,
+            ).start()
+        return self._watcher
+
     def _preprocess_input(self, user_input):
         """Normalize and preprocess user input."""
         return user_input.lower().strip()
 
     def _find_best_match(self, user_input):
-        """Find the best matching response using improved pattern matching."""
+        """Find the best matching pattern for the input.
+
+        With BM25 retrieval the highest-scoring pattern wins. Otherwise the
+        pattern sharing the most words wins, scoring only patterns that share
+        at least one token with the input via the inverted index.
+        """
         normalized_input = self._preprocess_input(user_input)
-        
+        # Use one model for the whole lookup so a concurrent hot-swap can't mix two versions or close it under us
+        with self._using_model() as model:
+            return self._match(normalized_input, *model)
+
+    @staticmethod
+    def _match(normalized_input, chat_pairs, patterns, index, bm25):
         # Exact match
-        if normalized_input in self.chat_pairs:
-            return self.chat_pairs[normalized_input]
-        
-        # Partial match
-        best_match = None
-        max_overlap = 0
-        
-        for pattern in self.chat_pairs.keys():
-            words = set(normalized_input.split())
-            pattern_words = set(pattern.split())
-            overlap = len(words.intersection(pattern_words))
-            
-            if overlap > max_overlap:
-                max_overlap = overlap
-                best_match = pattern
-        
-        if best_match and max_overlap >= 1:  # At least one word matches
-            return self.chat_pairs[best_match]
+        if normalized_input in chat_pairs:
+            return chat_pairs[normalized_input]
+
+        if bm25 is not None:
+            best_id = bm25.best(normalized_input)
+            return chat_pairs[patterns[best_id]] if best_id is not None else None
         
-        return None
+        # Partial match: count shared tokens per candidate pattern
+        postings = [p for p in map(index.get, set(normalized_input.split())) if p is not None]
+        if not postings:
+            return None
+        overlaps = Counter(chain.from_iterable(postings))
+
+        # Highest overlap wins; the earliest pattern wins ties
+        best_id = min(overlaps, key=lambda pattern_id: (-overlaps[pattern_id], pattern_id))
+        return chat_pairs[patterns[best_id]]
 
     def get_response(self, user_input, intent=None, emotion=None):
-        """Get a response based on user input, emotion and conversation context."""
+        """Get a response based on user input, emotion and conversation context (one caller at a time)."""
+        with self._conversation_lock:
+            return self._respond(user_input, intent, emotion)
+
+    def _respond(self, user_input, intent, emotion):
         # Update conversation history and context
         self.conversation_history.append(("user", user_input))
         self.last_intent = intent
@@ -80,14 +212,15 @@ class EnhancedChatbot:
         is_greeting = any(re.search(pattern, user_input.lower()) for pattern in greeting_patterns)
 
         # If it's a greeting, use greeting responses
-        if is_greeting and "greeting" in self.emotion_responses:
-            response = random.choice(self.emotion_responses["greeting"]["responses"])
+        emotion_responses = self.emotion_responses
+        if is_greeting and "greeting" in emotion_responses:
+            response = random.choice(emotion_responses["greeting"]["responses"])
             self.conversation_history.append(("bot", response))
             return response
 
         # If we have a detected emotion and emotion responses, prioritize those
-        if emotion and emotion in self.emotion_responses:
-            response = random.choice(self.emotion_responses[emotion]["responses"])
+        if emotion and emotion in emotion_responses:
+            response = random.choice(emotion_responses[emotion]["responses"])
             self.conversation_history.append(("bot", response))
             return response
 
@@ -150,9 +283,10 @@ class EnhancedChatbot:
 
     def get_conversation_summary(self):
         """Get a summary of the current conversation."""
-        return {
-            "session_duration": (datetime.now() - self.session_start).seconds,
-            "message_count": len(self.conversation_history),
-            "last_intent": self.last_intent,
-            "context": self.context
-        }
\ No newline at end of file
+        with self._conversation_lock:
+            return {
+                "session_duration": (datetime.now() - self.session_start).seconds,
+                "message_count": len(self.conversation_history),
+                "last_intent": self.last_intent,
+                "context": self.context
+            }
\ No newline at end of file
@@ -414,4 +414,8 @@ class EnhancedIntentDetector:
     def clear_context(self, conversation_id):
         """Clear conversation context"""
         self.conversation_context[conversation_id] = ""
-        self.last_intent = None
\ No newline at end of file
+        self.last_intent = None
+
+    def forget_context(self, conversation_id):
+        """Drop a finished conversation's context entirely"""
+        self.conversation_context.pop(conversation_id, None)
\ No newline at end of file
@@ -1,6 +1,4 @@
 import os
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
 from difflib import SequenceMatcher
 import re
 
@@ -24,8 +22,8 @@ def get_spotify_client():
     client_id = os.getenv("SPOTIPY_CLIENT_ID")
     client_secret = os.getenv("SPOTIPY_CLIENT_SECRET")
 
-    print(f"[DEBUG] Spotify Client ID: {client_id[:5]}... (length: {len(client_id) if client_id else 0})")
-    print(f"[DEBUG] Spotify Client Secret: {client_secret[:5]}... (length: {len(client_secret) if client_secret else 0})")
+    print(f"[DEBUG] Spotify Client ID: {(client_id or '')[:5]}... (length: {len(client_id) if client_id else 0})")
+    print(f"[DEBUG] Spotify Client Secret: {(client_secret or '')[:5]}... (length: {len(client_secret) if client_secret else 0})")
 
     if not client_id or not client_secret:
         print("[ERROR] Missing Spotify credentials. Please check your .env file.")
@@ -39,8 +37,23 @@ def get_spotify_client():
 
     try:
         print("[INFO] Creating Spotify client...")
-        client_credentials_manager = SpotifyClientCredentials(client_id=client_id, client_secret=client_secret)
+        # spotipy (and requests) are only needed once a search runs
+        import spotipy
+        from spotipy.oauth2 import SpotifyClientCredentials
+        # SPOTIFY_TOKEN_URL / SPOTIFY_API_URL redirect the client, e.g. to the load-test stand-in
+        token_url = os.getenv("SPOTIFY_TOKEN_URL")
+        if token_url:
+            # Keep that token in memory so it never lands in the .cache file real runs read
+            from spotipy.cache_handler import MemoryCacheHandler
+            client_credentials_manager = SpotifyClientCredentials(client_id=client_id, client_secret=client_secret,
+                                                                  cache_handler=MemoryCacheHandler())
+            client_credentials_manager.OAUTH_TOKEN_URL = token_url
+        else:
+            client_credentials_manager = SpotifyClientCredentials(client_id=client_id, client_secret=client_secret)
         sp = spotipy.Spotify(client_credentials_manager=client_credentials_manager)
+        api_url = os.getenv("SPOTIFY_API_URL")
+        if api_url:
+            sp.prefix = api_url.rstrip("/") + "/"
         print("[SUCCESS] Successfully created Spotify client")
         return sp
     except Exception as e:
@@ -48,6 +61,38 @@ def get_spotify_client():
         print("Please check your Spotify API credentials in the .env file.")
         return None
 
+# The searches below are written as generators of Spotify requests, so the same
+# matching and ranking code runs on blocking spotipy calls and on the asyncio
+# client in utils/async_spotify.py. A step generator yields
+# ("search", search_kwargs, label) or ("artist_top_tracks", artist_uri, label),
+# is sent the JSON response (or has the request's exception thrown in), and
+# returns the formatted result. The label names the strategy, for tracing.
+
+def drive_search_steps(steps, call):
+    """Run a step generator with a blocking `call(kind, arg, label)`; returns its result."""
+    try:
+        request = next(steps)
+        while True:
+            try:
+                response = call(*request)
+            except Exception as e:
+                request = steps.throw(e)
+            else:
+                request = steps.send(response)
+    except StopIteration as stop:
+        return stop.value
+
+def spotipy_call(sp, kind, arg, label=None):
+    """Perform one step request with a spotipy client."""
+    if kind == "search":
+        return sp.search(**arg)
+    if kind == "artist_top_tracks":
+        return sp.artist_top_tracks(arg)
+    raise ValueError(f"Unknown Spotify request '{kind}'")
+
+def run_search_steps(steps, sp):
+    return drive_search_steps(steps, lambda kind, arg, label=None: spotipy_call(sp, kind, arg))
+
 def normalize_name(name):
     """Normalize artist/track names for better matching."""
     # Convert to lowercase and remove special characters
@@ -143,6 +188,10 @@ def extract_song_and_artist(query):
 
 def search_for_track(sp, query, limit=5):
     """Enhanced track search with improved accuracy and multiple search strategies."""
+    return run_search_steps(track_search_steps(query, limit), sp)
+
+def track_search_steps(query, limit=5):
+    """Search steps behind search_for_track (see run_search_steps)."""
     try:
         print(f"[DEBUG] Searching for track with query: '{query}'")
 
@@ -157,7 +206,7 @@ def search_for_track(sp, query, limit=5):
         if artist_name and song_title:
             print("[DEBUG] Strategy 1: Searching with both song and artist")
             exact_query = f"track:\"{song_title}\" artist:\"{artist_name}\""
-            results = sp.search(q=exact_query, type='track', limit=limit)
+            results = yield ("search", dict(q=exact_query, type='track', limit=limit), "track.exact")
 
             if results and results.get('tracks', {}).get('items'):
                 tracks = [_format_track(item) for item in results['tracks']['items'][:limit]]
@@ -167,7 +216,7 @@ def search_for_track(sp, query, limit=5):
         # Strategy 2: Try searching for just the song title
         if song_title:
             print("[DEBUG] Strategy 2: Searching for song title only")
-            results = sp.search(q=song_title, type='track', limit=limit*2)
+            results = yield ("search", dict(q=song_title, type='track', limit=limit*2), "track.title")
 
             if results and results.get('tracks', {}).get('items'):
                 scored_tracks = []
@@ -192,7 +241,7 @@ def search_for_track(sp, query, limit=5):
         # Strategy 3: If we have artist name, search for artist and get top tracks
         if artist_name:
             print("[DEBUG] Strategy 3: Searching for artist top tracks")
-            artist_tracks = search_for_artist_top_tracks(sp, artist_name)
+            artist_tracks = yield from artist_top_tracks_steps(artist_name)
             if artist_tracks:
                 # Filter tracks that contain the song title if we have it
                 if song_title:
@@ -203,7 +252,7 @@ def search_for_track(sp, query, limit=5):
 
         # Strategy 4: Fallback - search for the original query
         print("[DEBUG] Strategy 4: Fallback search with original query")
-        results = sp.search(q=query, type='track', limit=limit*2)
+        results = yield ("search", dict(q=query, type='track', limit=limit*2), "track.fallback")
 
         if results and results.get('tracks', {}).get('items'):
             scored_tracks = []
@@ -305,6 +354,10 @@ def _format_track(item):
 
 def search_for_artist_top_tracks(sp, artist_name):
     """Enhanced artist search with better name matching and fuzzy search."""
+    return run_search_steps(artist_top_tracks_steps(artist_name), sp)
+
+def artist_top_tracks_steps(artist_name):
+    """Search steps behind search_for_artist_top_tracks (see run_search_steps)."""
     try:
         print(f"[DEBUG] Searching for artist: '{artist_name}'")
 
@@ -336,7 +389,7 @@ def search_for_artist_top_tracks(sp, artist_name):
 
             try:
                 # Search for exact artist match
-                results = sp.search(q=f"artist:\"{variation}\"", type='artist', limit=5)
+                results = yield ("search", dict(q=f"artist:\"{variation}\"", type='artist', limit=5), "artist.exact")
                 if results and 'artists' in results and results['artists']['items']:
                     for artist in results['artists']['items']:
                         similarity = string_similarity(artist['name'], artist_name)
@@ -347,7 +400,7 @@ def search_for_artist_top_tracks(sp, artist_name):
 
                 # Also try general search if no exact match
                 if not search_results:
-                    general_results = sp.search(q=variation, type='artist', limit=3)
+                    general_results = yield ("search", dict(q=variation, type='artist', limit=3), "artist.general")
                     if general_results and 'artists' in general_results and general_results['artists']['items']:
                         for artist in general_results['artists']['items']:
                             similarity = string_similarity(artist['name'], artist_name)
@@ -368,7 +421,7 @@ def search_for_artist_top_tracks(sp, artist_name):
         print(f"[DEBUG] Best artist match: '{best_match['name']}' (similarity: {search_results[0][0]:.2f})")
 
         # Get top tracks for the best matching artist
-        top_tracks_results = sp.artist_top_tracks(best_match['uri'])
+        top_tracks_results = yield ("artist_top_tracks", best_match['uri'], "artist.top_tracks")
 
         tracks = []
         if top_tracks_results and top_tracks_results.get('tracks'):
@@ -388,9 +441,13 @@ def search_for_artist_top_tracks(sp, artist_name):
 
 def search_for_playlists(sp, query, limit=10):
     """Enhanced playlist search with better relevance ranking and fallback terms."""
+    return run_search_steps(playlist_search_steps(query, limit), sp)
+
+def playlist_search_steps(query, limit=10):
+    """Search steps behind search_for_playlists (see run_search_steps)."""
     try:
         # Try the original query first
-        results = sp.search(q=query, type='playlist', limit=limit*2)
+        results = yield ("search", dict(q=query, type='playlist', limit=limit*2), "playlist.query")
         playlists = []
 
         if results and 'playlists' in results:
@@ -435,7 +492,7 @@ def search_for_playlists(sp, query, limit=10):
                     break
 
                 try:
-                    fallback_results = sp.search(q=fallback_query, type='playlist', limit=limit)
+                    fallback_results = yield ("search", dict(q=fallback_query, type='playlist', limit=limit), "playlist.fallback")
                     if fallback_results and 'playlists' in fallback_results:
                         for item in fallback_results['playlists']['items'][:limit-len(playlists)]:
                             if not isinstance(item, dict):
@@ -0,0 +1,61 @@
+# utils/message_router.py
+import itertools
+import queue
+import threading
+import time
+
+from utils.recommendation_engine import RoutedDecision, DEFAULT_FALLBACK_MESSAGE
+
+
+class MessageRouter:
+    """
+    Runs RecommendationEngine.route on one long-lived worker thread.
+
+    The Tk thread only calls `submit`; each finished RoutedDecision is put
+    on `result_queue` in submission order, so the UI never waits on the models.
+    """
+    def __init__(self, engine, result_queue=None):
+        self.engine = engine
+        self.result_queue = result_queue
+        self._requests = queue.Queue()
+        self._ids = itertools.count(1)
+        self._worker = None
+
+    def start(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._worker_loop, name="message-router", daemon=True)
+            self._worker.start()
+
+    def submit(self, text, started_at=None, trace=None):
+        """
+        Queue `text` for classification on the worker; returns its request id.
+        With a `trace`, the wait for the worker is a queue.router span and the
+        hand-off back to the UI a queue.decision span (closed by the consumer).
+        """
+        self.start()
+        request_id = next(self._ids)
+        if trace is not None:
+            trace.begin("queue.router")
+        self._requests.put((request_id, text, started_at or time.time(), trace))
+        return request_id
+
+    def stop(self):
+        self._requests.put(None)
+
+    def _worker_loop(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            request_id, text, started_at, trace = request
+            if trace is not None:
+                trace.end("queue.router")
+            try:
+                decision = self.engine.route(text, request_id, started_at, trace)
+            except Exception as e:
+                print(f"[ERROR] Could not classify message: {e}")
+                decision = RoutedDecision(request_id, text, None, None, None, DEFAULT_FALLBACK_MESSAGE,
+                                          None, None, started_at, 0.0, trace)
+            if trace is not None:
+                trace.begin("queue.decision")
+            self.result_queue.put(decision)
@@ -0,0 +1,244 @@
+# utils/model_registry.py
+import os
+import json
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+
+# Get the absolute path to the directory containing this script (utils)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# Go up one directory to the project root
+project_root = os.path.dirname(script_dir)
+DEFAULT_REGISTRY_ROOT = os.path.join(project_root, "models", "registry")
+
+MANIFEST_NAME = "manifest.json"
+CURRENT_POINTER = "CURRENT"
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, text):
+    """Write a small text file so readers only ever see the old or the new content."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ModelRegistry:
+    """
+    Versioned model artifacts with manifests and an atomic "current" pointer.
+
+    Layout::
+
+        models/registry/<name>/v0001/<artifact>
+        models/registry/<name>/v0001/manifest.json
+        models/registry/<name>/CURRENT            # contains "v0001"
+    """
+    def __init__(self, root=DEFAULT_REGISTRY_ROOT):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _model_dir(self, name):
+        return os.path.join(self.root, name)
+
+    def versions(self, name):
+        """List published versions of a model, oldest first."""
+        model_dir = self._model_dir(name)
+        if not os.path.isdir(model_dir):
+            return []
+        return sorted(
+            entry for entry in os.listdir(model_dir)
+            if entry.startswith("v") and os.path.exists(os.path.join(model_dir, entry, MANIFEST_NAME))
+        )
+
+    def manifest(self, name, version):
+        """Load the manifest of a published version."""
+        with open(os.path.join(self._model_dir(name), version, MANIFEST_NAME), "r") as f:
+            return json.load(f)
+
+    def publish(self, name, source_path, metrics=None, extra=None, activate=True, companion_files=None):
+        """Copy an artifact into a new version directory and optionally make it current.
+
+        `companion_files` are copied into the same version directory (e.g. an
+        index built alongside the model) and checksummed in the manifest.
+        """
+        companion_files = [path for path in (companion_files or []) if os.path.exists(path)]
+        if not os.path.exists(source_path):
+            raise FileNotFoundError(f"Artifact not found at {source_path}")
+
+        with self._lock:
+            existing = self.versions(name)
+            number = int(existing[-1][1:]) + 1 if existing else 1
+            version = f"v{number:04d}"
+            version_dir = os.path.join(self._model_dir(name), version)
+            staging_dir = version_dir + ".staging"
+
+            # Stage the whole version first so a half-copied version is never visible
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            os.makedirs(staging_dir)
+            artifact_name = os.path.basename(source_path)
+            shutil.copy2(source_path, os.path.join(staging_dir, artifact_name))
+            for path in companion_files:
+                shutil.copy2(path, os.path.join(staging_dir, os.path.basename(path)))
+
+            manifest = {
+                "name": name,
+                "version": version,
+                "artifact": artifact_name,
+                "sha256": file_sha256(source_path),
+                "size_bytes": os.path.getsize(source_path),
+                "created": datetime.now().isoformat(),
+                "metrics": metrics or {},
+                "companions": {os.path.basename(path): file_sha256(path) for path in companion_files},
+            }
+            if extra:
+                manifest.update(extra)
+            with open(os.path.join(staging_dir, MANIFEST_NAME), "w") as f:
+                json.dump(manifest, f, indent=4)
+
+            os.replace(staging_dir, version_dir)
+
+        if activate:
+            self.activate(name, version)
+        return manifest
+
+    def current_version(self, name):
+        """Return the version the "current" pointer refers to, or None."""
+        try:
+            with open(os.path.join(self._model_dir(name), CURRENT_POINTER), "r") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def activate(self, name, version):
+        """Atomically point "current" at a published version (also used for rollbacks)."""
+        if version not in self.versions(name):
+            raise ValueError(f"Unknown version '{version}' for model '{name}'")
+        _atomic_write(os.path.join(self._model_dir(name), CURRENT_POINTER), version)
+
+    def verify(self, name, version):
+        """Check an artifact against the checksum in its manifest."""
+        manifest = self.manifest(name, version)
+        version_dir = os.path.join(self._model_dir(name), version)
+        expected = {manifest["artifact"]: manifest["sha256"], **manifest.get("companions", {})}
+        for filename, sha256 in expected.items():
+            path = os.path.join(version_dir, filename)
+            if not os.path.exists(path) or file_sha256(path) != sha256:
+                return False
+        return True
+
+    def resolve(self, name, version=None, verify=True):
+        """Return the artifact path of a version (default: current).
+
+        Raises FileNotFoundError if nothing is published and ValueError if the
+        artifact does not match its manifest checksum.
+        """
+        version = version or self.current_version(name)
+        if not version:
+            raise FileNotFoundError(f"No current version of '{name}' in registry {self.root}")
+        manifest = self.manifest(name, version)
+        path = os.path.join(self._model_dir(name), version, manifest["artifact"])
+        if verify and not self.verify(name, version):
+            raise ValueError(f"Checksum mismatch for {name} {version} at {path}")
+        return path
+
+
+def resolve_model_path(name, fallback_path, registry=None):
+    """Use the registry's current version of a model if there is one, else the legacy path."""
+    registry = registry or ModelRegistry()
+    try:
+        return registry.resolve(name)
+    except (FileNotFoundError, ValueError) as e:
+        if registry.current_version(name):
+            print(f"[WARNING] {e}. Falling back to {fallback_path}")
+        return fallback_path
+
+
+class RegistryWatcher:
+    """
+    Polls a model's "current" pointer and calls `on_change(path, version)`
+    from a background thread whenever it moves to another version.
+    """
+    def __init__(self, registry, name, on_change, interval=5.0):
+        self.registry = registry
+        self.name = name
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._version = registry.current_version(name)
+        self._thread = threading.Thread(target=self._run, name=f"registry-watch-{name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            version = self.registry.current_version(self.name)
+            if not version or version == self._version:
+                continue
+            try:
+                path = self.registry.resolve(self.name, version)
+                self.on_change(path, version)
+                self._version = version
+            except Exception as e:
+                print(f"[ERROR] Could not switch {self.name} to {version}: {e}")
+                # Remember the failure so a broken version is not retried every tick
+                self._version = version
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage versioned model artifacts.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    publish_parser = subparsers.add_parser("publish", help="Publish an artifact as a new version")
+    publish_parser.add_argument("name")
+    publish_parser.add_argument("path")
+    publish_parser.add_argument("--metrics", help="JSON file with metrics to store in the manifest")
+    publish_parser.add_argument("--companion", action="append", default=[],
+                                help="Extra file published alongside the artifact (repeatable)")
+    publish_parser.add_argument("--no-activate", action="store_true", help="Do not make it the current version")
+
+    activate_parser = subparsers.add_parser("activate", help="Point current at a version (rollout/rollback)")
+    activate_parser.add_argument("name")
+    activate_parser.add_argument("version")
+
+    list_parser = subparsers.add_parser("list", help="List versions of a model")
+    list_parser.add_argument("name")
+
+    args = parser.parse_args()
+    registry = ModelRegistry()
+
+    if args.command == "publish":
+        metrics = None
+        if args.metrics:
+            with open(args.metrics, "r") as f:
+                metrics = json.load(f)
+        manifest = registry.publish(args.name, args.path, metrics=metrics, activate=not args.no_activate,
+                                    companion_files=args.companion)
+        print(f"[SUCCESS] Published {args.name} {manifest['version']} ({manifest['sha256'][:12]})")
+    elif args.command == "activate":
+        registry.activate(args.name, args.version)
+        print(f"[SUCCESS] {args.name} current -> {args.version}")
+    elif args.command == "list":
+        current = registry.current_version(args.name)
+        for version in registry.versions(args.name):
+            manifest = registry.manifest(args.name, version)
+            marker = "*" if version == current else " "
+            print(f"{marker} {version}  {manifest['created']}  {manifest['sha256'][:12]}  {manifest.get('metrics', {})}")
@@ -1,6 +1,9 @@
 # utils/nlp_mood_detector.py
-import joblib
 import os
+import threading
+
+from utils.emotion_text import clean_text
+from utils.model_registry import ModelRegistry, RegistryWatcher, resolve_model_path
 
 # Get the absolute path to the directory containing this script (utils)
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -8,33 +11,82 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 # Construct the correct model path
 DEFAULT_MODEL_PATH = os.path.join(project_root, "models", "emotion_classifier.pkl")
+REGISTRY_NAME = "emotion_classifier"
 
 class NlpMoodDetector:
-    def __init__(self, model_path=DEFAULT_MODEL_PATH):
+    def __init__(self, model_path=None, registry=None):
         """
         Loads the pre-trained NLP model using a robust path.
+
+        Without an explicit path, the registry's current version is used if
+        one has been published, otherwise DEFAULT_MODEL_PATH.
         """
+        self.registry = registry or ModelRegistry()
+        if model_path is None:
+            model_path = resolve_model_path(REGISTRY_NAME, DEFAULT_MODEL_PATH, self.registry)
+
+        self.model = self._load_model(model_path)
+        self.model_path = model_path
+        self._watcher = None
+        print("[SUCCESS] NLP Mood Detector has been loaded.")
+
+    def _load_model(self, model_path):
         if not os.path.exists(model_path):
             print(f"[ERROR] MODEL NOT FOUND at '{model_path}'")
             print("Please ensure you have trained the model by running the train_model.py script.")
             # Re-raise the exception to stop the application from running without the model
             raise FileNotFoundError(f"Model not found at {model_path}")
-            
+
         try:
-            self.model = joblib.load(model_path)
-            print("[SUCCESS] NLP Mood Detector has been loaded.")
-        
+            import joblib
+            return joblib.load(model_path)
         except Exception as e:
             print(f"[ERROR] An error occurred while loading the model: {e}")
             raise
 
+    def reload(self, model_path, background=True):
+        """
+        Load a new model and swap it in.
+
+        The swap is a single attribute assignment, so predictions already running
+        finish on the old model and later ones use the new model, without pausing.
+        """
+        def load_and_swap():
+            try:
+                model = self._load_model(model_path)
+            except Exception:
+                print(f"[WARNING] Keeping the current mood model; reload from '{model_path}' failed.")
+                return
+            self.model = model
+            self.model_path = model_path
+            print(f"[SUCCESS] NLP Mood Detector switched to '{model_path}'.")
+
+        if not background:
+            load_and_swap()
+            return None
+        thread = threading.Thread(target=load_and_swap, name="mood-model-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def watch_registry(self, interval=5.0):
+        """Hot-swap to new registry versions as they are activated."""
+        if self._watcher is None:
+            self._watcher = RegistryWatcher(
+                self.registry, REGISTRY_NAME,
+                lambda path, version: self.reload(path, background=False),
+                interval=interval,
+            ).start()
+        return self._watcher
+
     def predict_mood(self, user_text: str) -> str:
         """Predicts the mood from a user's text input using the loaded NLP model."""
-        if not hasattr(self, 'model'):
+        model = getattr(self, 'model', None)
+        if model is None:
              return "Error: Model not loaded"
-        prediction = self.model.predict([user_text])
+        # Clean the text exactly as the training data was
+        prediction = model.predict([clean_text(user_text)])
         print("\n[Mood Detector]")
         print(f"Input text: {user_text}")
         print(f"Detected mood: {prediction[0]}")
         print("=" * 50)
-        return prediction[0]
\ No newline at end of file
+        return prediction[0]
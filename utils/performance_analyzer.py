@@ -1,18 +1,109 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
-import numpy as np
 from datetime import datetime
 import os
 import json
-from collections import defaultdict
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix, classification_report
+import math
+import time
+import threading
+from collections import deque
+
+from utils.streaming_stats import RingBuffer, QuantileSketch
+from utils.session_log import SessionLogWriter, read_session_log
+
+# Plotting and sklearn are imported inside the methods that use them; the app
+# only logs metrics, and importing them up front cost ~1.7s of startup.
+
+
+class MetricBuffers(dict):
+    """metric name -> RingBuffer, created on first use (which is when numpy gets imported)."""
+    def __init__(self, capacity):
+        super().__init__()
+        self.capacity = capacity
+
+    def __missing__(self, name):
+        buffer = self[name] = RingBuffer(self.capacity)
+        return buffer
+
+
+class MetricCollector:
+    """
+    Lock-free metric recording from many threads. Each thread appends
+    (name, value, timestamp) to its own deque; an aggregator thread drains
+    all of them every `interval` seconds into the analyzer, which therefore
+    has a single writer. deque append/popleft are atomic, so no sample is
+    lost or double-counted, and recording never waits on a shared lock.
+    """
+    def __init__(self, analyzer, interval=1.0):
+        self.analyzer = analyzer
+        self.interval = interval
+        self._local = threading.local()
+        self._buffers = []  # (thread, deque) per recording thread
+        self._register_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metric-aggregator", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the aggregator after merging everything recorded so far."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.flush()
+
+    def record(self, name, value, timestamp=None):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            # The only locked step, once per thread
+            buffer = self._local.buffer = deque()
+            with self._register_lock:
+                self._buffers.append((threading.current_thread(), buffer))
+        buffer.append((name, value, time.time() if timestamp is None else timestamp))
+
+    def flush(self):
+        """Merge every thread's pending samples into the analyzer now; returns how many."""
+        with self._flush_lock:
+            with self._register_lock:
+                buffers = list(self._buffers)
+            samples = []
+            for thread, buffer in buffers:
+                try:
+                    while True:
+                        samples.append(buffer.popleft())
+                except IndexError:
+                    pass
+                if not thread.is_alive() and not buffer:
+                    with self._register_lock:
+                        self._buffers.remove((thread, buffer))
+            if samples:
+                samples.sort(key=lambda sample: sample[2])  # Threads interleave; keep the buffers in time order
+                self.analyzer._merge(samples)
+            return len(samples)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[ERROR] Could not merge metrics: {e}")
+
 
 class PerformanceAnalyzer:
-    def __init__(self, log_dir="analysis_logs"):
+    def __init__(self, log_dir="analysis_logs", capacity=10000):
+        """
+        Each metric keeps its last `capacity` samples, each with its own
+        timestamp; response times also feed a quantile sketch that covers
+        the whole session in constant memory. Call start_collector() before
+        logging from several threads.
+        """
         self.log_dir = log_dir
-        self.metrics = defaultdict(list)
+        self.capacity = capacity
         self.session_start = datetime.now()
+        self.collector = None
+        self.session_log = None
+        self._lock = threading.RLock()  # Guards the buffers between the aggregator and readers
         
         # Create log directory if it doesn't exist
         os.makedirs(log_dir, exist_ok=True)
@@ -22,20 +113,75 @@ class PerformanceAnalyzer:
 
     def reset_metrics(self):
         """Reset all metrics for a new session."""
-        self.metrics = {
-            'intent_accuracy': [],
-            'mood_detection_accuracy': [],
-            'song_search_relevance': [],
-            'artist_match_accuracy': [],
-            'response_times': [],
-            'chat_satisfaction': [],
-            'timestamps': []
-        }
+        with self._lock:
+            self.metrics = MetricBuffers(self.capacity)
+            self.response_time_sketch = None  # QuantileSketch, created with the first response time
+
+    def start_collector(self, interval=1.0):
+        """Make log_* safe to call from any thread: samples go to per-thread buffers merged every `interval`s."""
+        if self.collector is None:
+            self.collector = MetricCollector(self, interval).start()
+        return self.collector
+
+    def stop_collector(self):
+        if self.collector is not None:
+            self.collector.stop()
+            self.collector = None
+
+    def flush(self):
+        """Merge samples still waiting in the collector's thread buffers."""
+        if self.collector is not None:
+            self.collector.flush()
+
+    def start_session_log(self, max_bytes=8 * 1024 * 1024, max_files=None):
+        """Stream every sample from now on to an append-only log in log_dir (see utils.session_log)."""
+        if self.session_log is None:
+            self.session_log = SessionLogWriter(self.log_dir, self.session_start, max_bytes, max_files).start()
+        return self.session_log
+
+    def stop_session_log(self):
+        """Write the remaining samples and close the log; returns its last part file."""
+        if self.session_log is None:
+            return None
+        self.flush()
+        session_log, self.session_log = self.session_log, None
+        session_log.close()
+        return session_log.path
 
-    def log_metric(self, metric_name, value):
-        """Log a metric value with timestamp."""
-        self.metrics[metric_name].append(value)
-        self.metrics['timestamps'].append(datetime.now())
+    def log_metric(self, metric_name, value, timestamp=None):
+        """Log a metric value with its timestamp (epoch seconds, default now)."""
+        # Coerce here so a bad value fails at the caller, not in the aggregator or log writer
+        value = float(value)
+        timestamp = time.time() if timestamp is None else float(timestamp)
+        if self.collector is not None:
+            self.collector.record(metric_name, value, timestamp)
+        else:
+            self._merge([(metric_name, value, timestamp)])
+
+    def _merge(self, samples, log=True):
+        with self._lock:
+            if log and self.session_log is not None:
+                samples = list(samples)
+                self.session_log.write_many(samples)
+            for metric_name, value, timestamp in samples:
+                self.metrics[metric_name].append(value, timestamp)
+                if metric_name == 'response_times':
+                    if self.response_time_sketch is None:
+                        self.response_time_sketch = QuantileSketch()
+                    self.response_time_sketch.add(value)
+
+    def snapshot(self):
+        """metric name -> (values, epoch timestamps) arrays, consistent across metrics."""
+        self.flush()
+        with self._lock:
+            return {name: (buffer.values(), buffer.timestamps()) for name, buffer in self.metrics.items()}
+
+    def metric_timestamps(self, metric_name):
+        """Datetimes of the retained samples of a metric, aligned with its values."""
+        self.flush()
+        with self._lock:
+            stamps = self.metrics[metric_name].timestamps().tolist()
+        return [datetime.fromtimestamp(ts) if not math.isnan(ts) else None for ts in stamps]
 
     def calculate_accuracy(self, predicted, actual):
         """Calculate accuracy between predicted and actual values."""
@@ -63,12 +209,28 @@ class PerformanceAnalyzer:
         """Log system response time in seconds."""
         self.log_metric('response_times', response_time)
 
+    def response_time_quantiles(self, qs=(0.5, 0.95, 0.99)):
+        """Count, mean, percentiles (p50, p95, ...) and max of every response time this session, in seconds."""
+        self.flush()
+        with self._lock:
+            return (self.response_time_sketch or QuantileSketch()).summary(qs)
+
+    def log_search_time(self, seconds):
+        """Log how long a Spotify search took, in seconds."""
+        self.log_metric('search_times', seconds)
+
     def log_chat_satisfaction(self, satisfaction_score):
         """Log chat interaction satisfaction score (0-1)."""
         self.log_metric('chat_satisfaction', satisfaction_score)
 
     def plot_performance_metrics(self, save_path=None):
         """Generate comprehensive performance visualization."""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        import numpy as np
+
+        series = {name: values for name, (values, _) in self.snapshot().items() if len(values)}
+
         plt.style.use('seaborn')
         fig = plt.figure(figsize=(15, 10))
         
@@ -81,9 +243,9 @@ class PerformanceAnalyzer:
                           'song_search_relevance', 'artist_match_accuracy']
         
         for metric in metrics_to_plot:
-            if self.metrics[metric]:  # Only plot if we have data
-                plt.plot(range(len(self.metrics[metric])), 
-                        self.metrics[metric], 
+            if metric in series:  # Only plot if we have data
+                plt.plot(range(len(series[metric])), 
+                        series[metric], 
                         label=metric.replace('_', ' ').title(),
                         marker='o')
         
@@ -95,16 +257,18 @@ class PerformanceAnalyzer:
         
         # Response Times Distribution
         ax2 = fig.add_subplot(gs[1, 0])
-        if self.metrics['response_times']:
-            sns.histplot(data=self.metrics['response_times'], bins=20, ax=ax2)
-            ax2.set_title('Response Time Distribution')
+        if 'response_times' in series:
+            sns.histplot(data=series['response_times'], bins=20, ax=ax2)
+            quantiles = self.response_time_quantiles()
+            ax2.set_title(f"Response Time Distribution (p50 {quantiles['p50']:.2f}s, "
+                          f"p95 {quantiles['p95']:.2f}s, p99 {quantiles['p99']:.2f}s)")
             ax2.set_xlabel('Response Time (seconds)')
             ax2.set_ylabel('Frequency')
         
         # Chat Satisfaction Distribution
         ax3 = fig.add_subplot(gs[1, 1])
-        if self.metrics['chat_satisfaction']:
-            sns.boxplot(data=self.metrics['chat_satisfaction'], ax=ax3)
+        if 'chat_satisfaction' in series:
+            sns.boxplot(data=series['chat_satisfaction'], ax=ax3)
             ax3.set_title('Chat Satisfaction Distribution')
             ax3.set_ylabel('Satisfaction Score')
         
@@ -112,8 +276,8 @@ class PerformanceAnalyzer:
         ax4 = fig.add_subplot(gs[2, :])
         summary_data = {}
         for metric in metrics_to_plot:
-            if self.metrics[metric]:
-                summary_data[metric] = np.mean(self.metrics[metric])
+            if metric in series:
+                summary_data[metric] = np.mean(series[metric])
         
         if summary_data:
             plt.bar(range(len(summary_data)), list(summary_data.values()))
@@ -162,12 +326,29 @@ class PerformanceAnalyzer:
         return dot
 
     def save_session_data(self):
-        """Save the current session's data to a JSON file."""
+        """
+        Save the current session's data. With a session log running, the log
+        already holds every sample, so it is just flushed and its current part
+        returned; otherwise the retained samples are dumped to one JSON file.
+        """
+        if self.session_log is not None:
+            self.flush()
+            self.session_log.flush()
+            return self.session_log.path
+
+        snapshot = self.snapshot()
+        metric_timestamps = {
+            k: [datetime.fromtimestamp(ts).isoformat() if not math.isnan(ts) else None for ts in stamps.tolist()]
+            for k, (_, stamps) in snapshot.items()
+        }
         session_data = {
             'session_start': self.session_start.isoformat(),
             'session_end': datetime.now().isoformat(),
-            'metrics': {k: list(v) for k, v in self.metrics.items() if k != 'timestamps'},
-            'timestamps': [ts.isoformat() for ts in self.metrics['timestamps']]
+            'metrics': {k: values.tolist() for k, (values, _) in snapshot.items()},
+            'metric_timestamps': metric_timestamps,
+            # All samples' timestamps in time order, as older readers expect
+            'timestamps': sorted(ts for stamps in metric_timestamps.values() for ts in stamps if ts),
+            'response_time_quantiles': self.response_time_quantiles()
         }
         
         filename = f"session_{self.session_start.strftime('%Y%m%d_%H%M%S')}.json"
@@ -179,22 +360,32 @@ class PerformanceAnalyzer:
         return filepath
 
     def load_session_data(self, filepath):
-        """Load session data from a JSON file."""
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-            
-        self.session_start = datetime.fromisoformat(data['session_start'])
-        self.metrics = defaultdict(list)
-        
-        for metric, values in data['metrics'].items():
-            self.metrics[metric] = values
-            
-        self.metrics['timestamps'] = [datetime.fromisoformat(ts) for ts in data['timestamps']]
-        
+        """Load session data from a JSON file or a session log (.jsonl part)."""
+        if filepath.endswith('.jsonl'):
+            data = read_session_log(filepath)
+        else:
+            with open(filepath, 'r') as f:
+                data = json.load(f)
+
+
+        self.flush()
+        with self._lock:
+            self.session_start = datetime.fromisoformat(data['session_start'])
+            self.reset_metrics()
+
+            # Older files only have one shared timestamp list that can't be matched to values
+            metric_timestamps = data.get('metric_timestamps', {})
+            for metric, values in data['metrics'].items():
+                stamps = metric_timestamps.get(metric) or [None] * len(values)
+                epochs = [datetime.fromisoformat(ts).timestamp() if ts else math.nan for ts in stamps]
+                self._merge(zip([metric] * len(values), values, epochs), log=False)
+
         return data
 
     def compute_ml_metrics(self, y_true, y_pred, labels=None):
         """Compute comprehensive ML metrics for model evaluation."""
+        from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
+
         metrics = {}
         metrics['accuracy'] = accuracy_score(y_true, y_pred)
         metrics['precision'] = precision_score(y_true, y_pred, average='weighted', labels=labels)
@@ -209,6 +400,9 @@ class PerformanceAnalyzer:
 
     def plot_confusion_matrix(self, cm, labels, save_path=None):
         """Plot confusion matrix."""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         plt.figure(figsize=(10, 8))
         sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
                     xticklabels=labels, yticklabels=labels)
@@ -224,4 +418,6 @@ class PerformanceAnalyzer:
 
     def generate_classification_report(self, y_true, y_pred, labels=None):
         """Generate a detailed classification report."""
+        from sklearn.metrics import classification_report
+
         return classification_report(y_true, y_pred, labels=labels, output_dict=True)
\ No newline at end of file
@@ -0,0 +1,420 @@
+# utils/recommendation_engine.py
+import json
+import time
+from collections import namedtuple
+
+from utils.enhanced_spotify_utils import (get_spotify_client, drive_search_steps, spotipy_call, track_search_steps,
+                                          artist_top_tracks_steps, playlist_search_steps)
+from utils.search_executor import SearchCancelled
+from utils.tracing import NO_TRACE
+# The tables are re-exported so existing imports from this module keep working
+from utils.routing_tables import (ACTIVITY_RESPONSES, MOOD_RESPONSES, EMOTION_MAP, EMOTION_RESPONSES_PATH,
+                                  shared_routing_tables)
+
+NEUTRAL_MOODS = ("neutral", "unknown", "error")
+
+# kind is "track", "artist" or "playlists"
+SearchPlan = namedtuple("SearchPlan", ["kind", "query"])
+
+# trace is the request's utils.tracing.Trace (None if untraced)
+RoutedDecision = namedtuple(
+    "RoutedDecision",
+    ["request_id", "text", "mood", "intent", "entity", "reply", "status", "search", "started_at", "classify_seconds",
+     "trace"],
+    defaults=(None,)
+)
+
+# status is "TRACKS", "PLAYLISTS" or "Error"; payload is the result list or the error message;
+# note is an extra bot message to show with the results (e.g. when nothing was found)
+SearchResult = namedtuple("SearchResult", ["status", "payload", "note"])
+
+EngineResult = namedtuple("EngineResult", ["decision", "result", "seconds"])
+
+HELP_MESSAGE = "I can help you find music using AI-powered mood detection! Try saying things like:\n• 'I'm feeling happy' (AI analyzes your mood and finds matching music)\n• 'Play Faded by Alan Walker' (for specific songs)\n• 'Find songs by Taylor Swift' (for artist tracks)\n• 'I want music for studying' (for activity playlists)\n• Just express how you're feeling naturally!"
+CHAT_FALLBACK_MESSAGE = "I'm not sure I understand, but I can use AI to analyze your mood! Try expressing how you're feeling, or ask me to:\n• Find songs by an artist\n• Play a specific song\n• Get music for activities like studying or working out\n• Just tell me how you're feeling and I'll find matching music!"
+DEFAULT_FALLBACK_MESSAGE = "I couldn't understand your request. Try asking for music, songs, or playlists!"
+
+class RecommendationEngine:
+    """
+    Turns a chat message into a reply and, when music was asked for, Spotify results.
+
+    `route(text)` classifies the message (ML mood + intent) and decides the
+    reply and the search to run; `search(plan)` runs that search with its
+    fallbacks; `handle(text)` does both. Nothing here touches Tk, so the GUI,
+    the batch CLI and benchmarks all share the same routing.
+    """
+    def __init__(self, mood_detector=None, intent_detector=None, chatbot=None, client_factory=get_spotify_client,
+                 routing=None):
+        """
+        Missing components are loaded with their defaults. `client_factory()`
+        returns the Spotify client for each search (None if unavailable); a
+        long-running service can pass one that reuses a single client.
+        `routing` is a RoutingTableStore (default: the shared one).
+        """
+        if mood_detector is None:
+            from utils.nlp_mood_detector import NlpMoodDetector
+            mood_detector = NlpMoodDetector()
+        if intent_detector is None:
+            from utils.enhanced_intent_detector import EnhancedIntentDetector
+            intent_detector = EnhancedIntentDetector()
+        if chatbot is None:
+            from utils.enhanced_chatbot import EnhancedChatbot
+            chatbot = EnhancedChatbot(routing=routing)
+        self.mood_detector = mood_detector
+        self.intent_detector = intent_detector
+        self.chatbot = chatbot
+        self.client_factory = client_factory
+        self.routing = routing or shared_routing_tables()
+
+    def route(self, text, request_id=None, started_at=None, trace=None, conversation_id="default"):
+        """
+        Detect mood and intent for `text` and decide how to answer it (timed as
+        route.* spans on `trace`). `conversation_id` keys the intent detector's
+        follow-up context, so concurrent conversations don't share it.
+        """
+        started_at = started_at or time.time()
+        classify_start = time.perf_counter()
+        spans = trace or NO_TRACE
+
+        # First detect mood using our trained ML model
+        with spans.span("route.mood"):
+            mood = self.mood_detector.predict_mood(text)
+        print(f"Detected mood: {mood}")
+
+        # Get intent using enhanced intent detector
+        with spans.span("route.intent"):
+            intent_data = self.intent_detector.detect_intent(text, conversation_id)
+        intent = intent_data.get("intent")
+        entity = intent_data.get("entity")
+
+        # If mood detection gives a clear result, prioritize it over pattern matching
+        if mood and mood.lower() not in NEUTRAL_MOODS:
+            print(f"[ML] Using mood detection: {mood}")
+            intent = "MoodSearch"
+            entity = mood.lower()
+        elif intent == "MoodSearch" and entity:
+            # Use pattern-matched mood if ML didn't detect anything clear
+            print(f"[PATTERN] Using pattern-matched mood: {entity}")
+            mood = entity
+        else:
+            print(f"[PATTERN] Using intent detection: {intent} -> {entity}")
+
+        print(f"[DEBUG] Input: '{text}'")
+        print(f"[DEBUG] ML Mood: '{mood}', Intent: '{intent}', Entity: '{entity}'")
+
+        with spans.span("route.plan"):
+            reply, status, search = self._plan(text, mood, intent, entity)
+        return RoutedDecision(request_id, text, mood, intent, entity, reply, status, search, started_at,
+                              time.perf_counter() - classify_start, trace)
+
+    def _plan(self, text, mood, intent, entity):
+        """Return (reply, status text, SearchPlan or None) for a classified message."""
+        # Check for greetings and general conversation first
+        if intent in ("GREETING", "Greeting"):
+            return self.chatbot.get_response(text), None, None
+
+        if intent == "Help":
+            return HELP_MESSAGE, None, None
+
+        if intent == "SongSearch":
+            print(f"Song search detected for: {entity}")
+            return "🎵 Let me find that track for you!", "🎵 Searching for your song...", SearchPlan("track", text)
+
+        if intent == "ArtistSearch":
+            print(f"Artist search detected for: {entity}")
+            return (f"🔍 Let me find some great tracks by {entity}...", f"Searching for music by {entity}...",
+                    SearchPlan("artist", entity))
+
+        if intent == "ActivitySearch":
+            print(f"Activity search detected: {entity}")
+            activities = self.routing.get().activities
+            if entity in activities:
+                status, reply, activity_mood = activities[entity]
+                return reply, status, SearchPlan("playlists", activity_mood)
+
+        elif intent == "DirectMusicSearch":
+            print(f"Direct music search detected: {entity}")
+            return (f"I'll find some great {entity} music for you!", f"Finding {entity} music...",
+                    SearchPlan("playlists", entity))
+
+        elif intent == "MoodSearch":
+            print(f"Mood search detected with ML mood: {mood}")
+            # Use the ML-detected mood for playlist search
+            mood_to_use = mood.lower() if mood else entity
+            responses = self.routing.get().mood_replies.get(mood_to_use, ["Let me find some music that matches how you're feeling."])
+            return (responses[0], f"Finding {mood_to_use} music based on your mood...",
+                    SearchPlan("playlists", mood_to_use))
+
+        if intent == "Chat":
+            return CHAT_FALLBACK_MESSAGE, None, None
+
+        return DEFAULT_FALLBACK_MESSAGE, None, None
+
+    def search(self, plan, check=None, on_status=None, trace=None):
+        """
+        Run a SearchPlan against Spotify and return a SearchResult.
+
+        `check()` is called between Spotify requests so a superseded search can
+        stop early (it may raise SearchCancelled, which is passed through);
+        `on_status(text)` receives progress messages. Each Spotify request is
+        a spotify.<strategy> span on `trace`.
+        """
+        trace = trace or NO_TRACE
+        client = []
+
+        def call(kind, arg, label=None):
+            if kind == "client":
+                with trace.span("spotify.client"):
+                    client.append(self.client_factory())
+                return client[-1] is not None
+            with trace.span(f"spotify.{label or kind}", q=_step_query(arg)):
+                return spotipy_call(client[-1], kind, arg)
+
+        with trace.span(f"search.{plan.kind}"):
+            return drive_search_steps(self._search_steps(plan, check, on_status, trace), call)
+
+    async def search_async(self, plan, client, check=None, on_status=None, trace=None):
+        """
+        Like `search`, but every Spotify request is awaited on `client`
+        (a utils.async_spotify.AsyncSpotifyClient, or None if unavailable).
+        """
+        from utils.async_spotify import drive_search_steps_async
+        trace = trace or NO_TRACE
+
+        async def call(kind, arg, label=None):
+            if kind == "client":
+                return client is not None
+            with trace.span(f"spotify.{label or kind}", q=_step_query(arg)):
+                return await client.call(kind, arg)
+
+        with trace.span(f"search.{plan.kind}"):
+            return await drive_search_steps_async(self._search_steps(plan, check, on_status, trace), call)
+
+    def _search_steps(self, plan, check=None, on_status=None, trace=NO_TRACE):
+        # The searches yield ("client", None) to ask the driver whether Spotify is
+        # available, then Spotify requests (see enhanced_spotify_utils.drive_search_steps)
+        check = check or (lambda: None)
+        on_status = on_status or (lambda text: None)
+        if plan.kind == "track":
+            return self._search_track(plan.query, check, on_status)
+        if plan.kind == "artist":
+            return self._search_artist(plan.query, check)
+        return self._search_playlists(plan.query, check, trace)
+
+    def handle(self, text, run_search=True, trace=None):
+        """Route `text` and run its search synchronously; returns an EngineResult."""
+        start = time.perf_counter()
+        decision = self.route(text, trace=trace)
+        result = None
+        if run_search and decision.search is not None:
+            result = self.search(decision.search, trace=trace)
+        return EngineResult(decision, result, time.perf_counter() - start)
+
+    def _search_track(self, track_name, check, on_status):
+        try:
+            on_status("[INFO] Connecting to Spotify...")
+
+            # Get Spotify client
+            if not (yield ("client", None)):
+                print("[ERROR] Could not connect to Spotify")
+                return SearchResult("Error", "[ERROR] Could not connect to Spotify. Please check your internet connection and .env file.", None)
+
+            check()
+            on_status("[INFO] Searching for tracks...")
+
+            # Perform search
+            tracks = yield from track_search_steps(track_name, limit=5)
+
+            if not tracks:
+                print("No tracks found")
+                return SearchResult("TRACKS", [], "I couldn't find any tracks matching your request. Try being more specific or check the spelling.")
+            print(f"\nFound {len(tracks)} tracks:")
+            for i, track in enumerate(tracks, 1):
+                print(f"{i}. {track.get('name')} - {track.get('artist')}")
+            return SearchResult("TRACKS", tracks, None)
+
+        except SearchCancelled:
+            raise
+        except Exception as e:
+            print(f"Error while searching: {str(e)}")
+            import traceback
+            print(traceback.format_exc())
+            # Safe error message without Unicode characters
+            return SearchResult("Error", "[ERROR] An error occurred while searching. Please try a different search term.", None)
+
+    def _search_artist(self, artist_name, check):
+        if not (yield ("client", None)):
+            return SearchResult("Error", "Could not connect to Spotify. Check your .env file.", None)
+        check()
+        tracks = yield from artist_top_tracks_steps(artist_name)
+        return SearchResult("TRACKS", tracks, None)
+
+    def _search_playlists(self, mood, check, trace=NO_TRACE):
+        try:
+            print(f"[DEBUG] Starting ML-based playlist search for mood: {mood}")
+
+            # Playlist suggestions come from the shared routing tables (reloaded only when the file changes)
+            tables = self.routing.get()
+
+            # Map the input mood to emotion category
+            emotion = tables.emotion_for(mood)
+            print(f"[DEBUG] Mapped ML mood '{mood}' to emotion '{emotion}'")
+
+            # Get playlist keywords for the emotion
+            keywords = tables.playlist_keywords(emotion)
+            if keywords:
+                query = " ".join(keywords)
+                print(f"[DEBUG] Using ML-enhanced playlist keywords: {list(keywords)}")
+            else:
+                # Fallback: Use the original mood as search query
+                query = mood
+                print(f"[DEBUG] Using fallback query: {query}")
+
+            print(f"[DEBUG] Final ML-enhanced search query: '{query}'")
+
+            # Get Spotify client
+            print(f"[DEBUG] Getting Spotify client...")
+            if not (yield ("client", None)):
+                error_msg = "Could not connect to Spotify. Please check your SPOTIPY_CLIENT_ID and SPOTIPY_CLIENT_SECRET in the .env file."
+                print(f"[ERROR] {error_msg}")
+                return SearchResult("Error", error_msg, None)
+
+            print(f"[DEBUG] Spotify client obtained successfully")
+            check()
+
+            # Search for playlists using ML-enhanced query
+            print(f"[DEBUG] Searching for playlists with ML-enhanced query...")
+            playlists = yield from playlist_search_steps(query)
+            print(f"[DEBUG] Search completed. Found {len(playlists) if playlists else 0} playlists")
+
+            if playlists:
+                print(f"[DEBUG] Sending {len(playlists)} ML-curated playlists to UI")
+                return SearchResult("PLAYLISTS", playlists, None)
+
+            print(f"[DEBUG] No playlists found, trying fallback searches...")
+
+            # Try multiple fallback strategies for better ML integration
+            fallback_queries = [
+                f"{mood} music",
+                f"{emotion} music",
+                "mood music",
+                "music"  # Very generic fallback
+            ]
+
+            for fallback_query in fallback_queries:
+                if fallback_query != query:  # Don't repeat the same query
+                    check()
+                    print(f"[DEBUG] Trying fallback query: '{fallback_query}'")
+                    with trace.span("search.mood_fallback", query=fallback_query):
+                        fallback_playlists = yield from playlist_search_steps(fallback_query)
+                    if fallback_playlists:
+                        print(f"[DEBUG] Found {len(fallback_playlists)} playlists with fallback query")
+                        return SearchResult("PLAYLISTS", fallback_playlists, None)
+
+            print(f"[DEBUG] No playlists found even with fallback queries")
+            return SearchResult("Error", f"I couldn't find any playlists for '{mood}' mood. Try expressing your feelings differently!", None)
+
+        except SearchCancelled:
+            raise
+        except Exception as e:
+            error_msg = f"Error in ML-enhanced playlist search: {str(e)}"
+            print(f"[ERROR] {error_msg}")
+            import traceback
+            print(traceback.format_exc())
+            return SearchResult("Error", "An error occurred while searching for mood-based playlists.", None)
+
+
+def _step_query(arg):
+    """The search text of a step request (the artist URI for top tracks)."""
+    return arg.get("q") if isinstance(arg, dict) else arg
+
+
+def _result_record(text, engine_result):
+    decision, result = engine_result.decision, engine_result.result
+    record = {
+        "text": text,
+        "mood": decision.mood,
+        "intent": decision.intent,
+        "entity": decision.entity,
+        "reply": decision.reply,
+        "search": decision.search._asdict() if decision.search else None,
+        "seconds": round(engine_result.seconds, 6),
+    }
+    if result is not None:
+        record["status"] = result.status
+        record["results"] = result.payload if result.status != "Error" else []
+        record["error"] = result.payload if result.status == "Error" else None
+    return record
+
+
+if __name__ == "__main__":
+    import argparse
+    import contextlib
+    import io
+    from concurrent.futures import ThreadPoolExecutor
+
+    parser = argparse.ArgumentParser(description="Run the recommendation engine without the GUI.")
+    parser.add_argument("message", nargs="?", help="A single message to answer")
+    parser.add_argument("--batch", help="Text file with one message per line to process")
+    parser.add_argument("--workers", type=int, default=4, help="Messages processed concurrently in batch mode")
+    parser.add_argument("--no-search", action="store_true", help="Only route messages; skip the Spotify searches")
+    parser.add_argument("--output", help="Write one JSON result per line to this file (batch mode)")
+    parser.add_argument("--verbose", action="store_true", help="Keep the engine's debug output in batch mode")
+    parser.add_argument("--trace", action="store_true",
+                        help="Print the per-stage latency waterfall (single message) or stage histograms (batch)")
+    args = parser.parse_args()
+
+    if not args.message and not args.batch:
+        parser.error("give a message or --batch FILE")
+
+    from utils.tracing import Tracer
+
+    engine = RecommendationEngine()
+    tracer = Tracer()
+
+    def process(text):
+        trace = tracer.start(text)
+        engine_result = engine.handle(text, run_search=not args.no_search, trace=trace)
+        trace.finish(intent=engine_result.decision.intent)
+        return engine_result
+
+    if args.message:
+        engine_result = process(args.message)
+        print(json.dumps(_result_record(args.message, engine_result), indent=2, ensure_ascii=False))
+        if args.trace:
+            print(tracer.recent[-1].waterfall())
+    else:
+        with open(args.batch, "r", encoding="utf-8") as f:
+            messages = [line.strip() for line in f if line.strip()]
+
+        start = time.perf_counter()
+        # The engine prints its routing trace; keep the batch summary readable unless asked
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with quiet, ThreadPoolExecutor(max_workers=args.workers) as pool:
+            engine_results = list(pool.map(process, messages))
+        elapsed = time.perf_counter() - start
+
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                for text, engine_result in zip(messages, engine_results):
+                    f.write(json.dumps(_result_record(text, engine_result), ensure_ascii=False) + "\n")
+            print(f"[SUCCESS] Wrote {len(engine_results)} results to {args.output}")
+
+        latencies = sorted(r.seconds for r in engine_results)
+        intents = {}
+        errors = 0
+        for r in engine_results:
+            intents[r.decision.intent] = intents.get(r.decision.intent, 0) + 1
+            errors += r.result is not None and r.result.status == "Error"
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1e3 if latencies else 0.0
+
+        print(f"\nMessages: {len(messages)}   workers: {args.workers}   searches: {'off' if args.no_search else 'on'}")
+        print(f"Throughput: {len(messages) / elapsed if elapsed else 0.0:.1f} messages/s ({elapsed:.2f}s)")
+        print(f"Latency: p50={percentile(0.5):.1f}ms p95={percentile(0.95):.1f}ms max={percentile(1.0):.1f}ms")
+        print(f"Intents: {', '.join(f'{k}={v}' for k, v in sorted(intents.items(), key=lambda kv: -kv[1]))}")
+        if not args.no_search:
+            print(f"Search errors: {errors}")
+        if args.trace:
+            print(f"\n{tracer.report()}")
@@ -0,0 +1,179 @@
+# utils/result_cards.py
+import customtkinter as ctk
+
+CARD_COLOR = "#1E293B"
+CARD_HOVER_COLOR = "#2D3748"
+ICON_COLOR = "#3B82F6"
+
+
+class ResultCard:
+    """
+    A track/playlist card whose widgets are built once and re-filled in place.
+
+    Clicks open whatever `url`/`name` the card currently shows, so the
+    bindings never need to be rebuilt when the card is reused.
+    """
+    def __init__(self, parent, on_click):
+        self.url = None
+        self.name = None
+        self.visible = False
+        self._texts = {}
+
+        self.frame = ctk.CTkFrame(parent, fg_color=CARD_COLOR, corner_radius=10, cursor="hand2")
+        self.frame.grid_columnconfigure(0, weight=1)
+        self.frame.bind("<Button-1>", lambda e: on_click(self.url, self.name))
+        self.frame.bind("<Enter>", lambda e: self.frame.configure(fg_color=CARD_HOVER_COLOR))
+        self.frame.bind("<Leave>", lambda e: self.frame.configure(fg_color=CARD_COLOR))
+
+        content = ctk.CTkFrame(self.frame, fg_color="transparent")
+        content.grid(row=0, column=0, sticky="nsew", padx=10, pady=5)
+        content.grid_columnconfigure(1, weight=1)
+
+        self.icon_label = ctk.CTkLabel(content, text="", font=("Arial", 20, "bold"), text_color=ICON_COLOR)
+        self.icon_label.grid(row=0, column=0, rowspan=3, padx=(5, 10))
+        self.title_label = ctk.CTkLabel(content, text="", font=("Poppins", 14, "bold"), text_color="white",
+                                        anchor="w", justify="left")
+        self.title_label.grid(row=0, column=1, sticky="w")
+        self.subtitle_label = ctk.CTkLabel(content, text="", font=("Poppins", 12), text_color="#94A3B8",
+                                           anchor="w", justify="left")
+        self.subtitle_label.grid(row=1, column=1, sticky="w", pady=(2, 0))
+        self.metrics_label = ctk.CTkLabel(content, text="", font=("Poppins", 11), text_color="#64748B",
+                                          anchor="w", justify="left")
+        self.metrics_label.grid(row=2, column=1, sticky="w", pady=(2, 0))
+        self.metrics_label.grid_remove()
+
+    def _set_text(self, label, text):
+        # Reconfiguring a CTk label redraws it, so skip unchanged text
+        if self._texts.get(label) != text:
+            label.configure(text=text)
+            self._texts[label] = text
+
+    def update(self, title, subtitle, icon, url, name, metrics=None):
+        self.url, self.name = url, name
+        self._set_text(self.icon_label, "♪" if icon == "♪" else "♫")
+        self._set_text(self.title_label, title)
+        self._set_text(self.subtitle_label, subtitle)
+        if metrics:
+            self._set_text(self.metrics_label, metrics)
+            self.metrics_label.grid()
+        else:
+            self.metrics_label.grid_remove()
+
+    def show(self, before=None):
+        if not self.visible:
+            options = {"before": before} if before is not None else {}
+            self.frame.pack(fill="x", padx=5, pady=2, **options)
+            self.visible = True
+
+    def hide(self):
+        if self.visible:
+            self.frame.pack_forget()
+            self.visible = False
+
+
+class ResultCardPool:
+    """
+    Renders result lists into a fixed set of recycled ResultCards.
+
+    At most `page_size` cards are ever created. Longer result lists are paged
+    through the same cards, so a search costs a few label updates instead of
+    building and destroying a widget tree per result.
+    """
+    def __init__(self, parent, on_click, page_size=10, accent_color=ICON_COLOR, message_color=CARD_COLOR):
+        self.parent = parent
+        self.on_click = on_click
+        self.page_size = page_size
+        self.accent_color = accent_color
+        self.message_color = message_color
+        self.cards = []
+        self.items = []
+        self.page = 0
+        self._pager = None
+        self._message = None
+
+    @property
+    def page_count(self):
+        return max(1, -(-len(self.items) // self.page_size))
+
+    def render(self, items):
+        """Show a new result list (dicts of ResultCard.update arguments) from its first page."""
+        self.items = list(items)
+        self.page = 0
+        self._hide_message()
+        self._render_page()
+
+    def show_page(self, page):
+        self.page = min(max(page, 0), self.page_count - 1)
+        self._render_page()
+
+    def clear(self):
+        self.items = []
+        self._hide_message()
+        self._render_page()
+
+    def _render_page(self):
+        start = self.page * self.page_size
+        page_items = self.items[start:start + self.page_size]
+        while len(self.cards) < len(page_items):
+            self.cards.append(ResultCard(self.parent, self.on_click))
+
+        # Visible cards are always a prefix of the pool, which keeps their pack order
+        anchor = self._pager if self._pager is not None and self._pager.winfo_manager() else None
+        for card, item in zip(self.cards, page_items):
+            card.update(**item)
+            card.show(before=anchor)
+        for card in self.cards[len(page_items):]:
+            card.hide()
+        self._update_pager()
+
+    def _update_pager(self):
+        if len(self.items) <= self.page_size:
+            if self._pager is not None:
+                self._pager.pack_forget()
+            return
+        if self._pager is None:
+            self._pager = ctk.CTkFrame(self.parent, fg_color="transparent")
+            self._prev_button = ctk.CTkButton(self._pager, text="◀", width=40,
+                                              command=lambda: self.show_page(self.page - 1))
+            self._prev_button.pack(side="left", padx=5)
+            self._page_label = ctk.CTkLabel(self._pager, text="", font=("Poppins", 12), text_color="#94A3B8")
+            self._page_label.pack(side="left", expand=True)
+            self._next_button = ctk.CTkButton(self._pager, text="▶", width=40,
+                                              command=lambda: self.show_page(self.page + 1))
+            self._next_button.pack(side="right", padx=5)
+        self._page_label.configure(text=f"Page {self.page + 1} of {self.page_count} • {len(self.items)} results")
+        self._prev_button.configure(state="normal" if self.page > 0 else "disabled")
+        self._next_button.configure(state="normal" if self.page < self.page_count - 1 else "disabled")
+        if not self._pager.winfo_manager():
+            self._pager.pack(fill="x", padx=5, pady=5)
+
+    def show_message(self, icon, text, hint):
+        """Replace the results with a single reusable notice panel (no results, errors)."""
+        self.items = []
+        self._render_page()
+        if self._message is None:
+            self._message = ctk.CTkFrame(self.parent, fg_color=self.message_color, corner_radius=15,
+                                         border_width=1, border_color=self.accent_color)
+            self._message_icon = ctk.CTkLabel(self._message, text="", font=("Poppins", 24), text_color="#A0AEC0")
+            self._message_icon.pack(pady=(15, 5))
+            self._message_text = ctk.CTkLabel(self._message, text="", font=("Poppins", 14, "bold"),
+                                              text_color="#A0AEC0")
+            self._message_text.pack(pady=5)
+            self._message_hint = ctk.CTkLabel(self._message, text="", font=("Poppins", 12), text_color="#64748B")
+            self._message_hint.pack(pady=(0, 15))
+        self._message_icon.configure(text=icon)
+        self._message_text.configure(text=text)
+        self._message_hint.configure(text=hint)
+        if not self._message.winfo_manager():
+            self._message.pack(fill="x", padx=10, pady=10)
+
+    def _hide_message(self):
+        if self._message is not None:
+            self._message.pack_forget()
+
+    def widget_count(self):
+        """Number of Tk widgets currently owned by the pool (for benchmarks)."""
+        def count(widget):
+            return 1 + sum(count(child) for child in widget.winfo_children())
+        roots = [card.frame for card in self.cards] + [w for w in (self._pager, self._message) if w is not None]
+        return sum(count(widget) for widget in roots)
@@ -0,0 +1,163 @@
+# utils/routing_tables.py
+import os
+import json
+import time
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+EMOTION_RESPONSES_PATH = os.path.join(project_root, "data", "emotion_responses.json")
+
+
+def _freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+# activity -> (status text, reply, mood used for the playlist search)
+ACTIVITY_RESPONSES = _freeze({
+    "studying": ("Finding study music...", "Perfect! I'll find some great music to help you focus and study. Let me search for some concentration-friendly playlists!", "calm"),
+    "workout": ("Finding workout music...", "Time to get pumped! I'll find some energetic music to power your workout!", "happy"),
+    "relaxation": ("Finding relaxing music...", "I'll help you unwind with some peaceful, relaxing music!", "calm"),
+    "party": ("Finding party music...", "Let's get this party started! I'll find some amazing dance music for you!", "happy"),
+    "work": ("Finding work music...", "Let me find some productive background music for your work session!", "calm"),
+    "gaming": ("Finding gaming music...", "Let's find some epic music for your gaming session!", "happy")
+})
+
+# ML-based empathetic responses for detected emotions
+MOOD_RESPONSES = _freeze({
+    "sad": [
+        "I can tell you're feeling down. Let me find some comforting music that might help lift your spirits.",
+        "Music can be really healing when we're feeling low. Let me find some soothing tracks for you.",
+        "I understand you're going through a difficult time. Let me find some gentle, comforting music for you."
+    ],
+    "happy": [
+        "I can sense your positive energy! Let me find some uplifting music to match your great mood!",
+        "That's wonderful to hear! I'll find some fantastic music to keep those good vibes going!",
+        "Your happiness is contagious! Let me find some joyful music to celebrate with you!"
+    ],
+    "angry": [
+        "I can feel your frustration. Sometimes intense music can help process strong emotions. Let me find something that resonates with how you're feeling.",
+        "It sounds like you're dealing with some intense emotions. Let me find some powerful music that might help you work through this.",
+        "I can sense you're upset. Music can be a great outlet for strong feelings. Let me find something that matches your energy."
+    ],
+    "calm": [
+        "I can tell you're in a peaceful state of mind. Let me find some serene music that matches your calm energy.",
+        "Your tranquility is beautiful. Let me find some peaceful music to complement your relaxed mood.",
+        "I can sense your inner peace. Let me find some gentle, soothing music for you."
+    ],
+    "excited": [
+        "I can feel your excitement! Let me find some energetic music to match your enthusiastic mood!",
+        "Your energy is amazing! I'll find some upbeat, exciting music to fuel your enthusiasm!",
+        "I love your positive energy! Let me find some thrilling music to keep you pumped up!"
+    ],
+    "tired": [
+        "I can tell you're feeling weary. Let me find some gentle, relaxing music to help you unwind.",
+        "You seem like you need some rest. Let me find some soothing, calming music for you.",
+        "I can sense your fatigue. Let me find some peaceful music to help you relax and recharge."
+    ]
+})
+
+# Enhanced emotion mapping for ML model outputs
+EMOTION_MAP = _freeze({
+    "sad": "sadness",
+    "sadness": "sadness",
+    "depressed": "sadness",
+    "unhappy": "sadness",
+    "happy": "joy",
+    "joy": "joy",
+    "excited": "joy",
+    "energetic": "joy",
+    "angry": "anger",
+    "anger": "anger",
+    "frustrated": "anger",
+    "calm": "neutral",
+    "neutral": "neutral",
+    "peaceful": "neutral",
+    "relaxed": "neutral",
+    "tired": "sadness",  # Map tired to sadness for mellow music
+    "fear": "sadness",   # Map fear to sadness for calming music
+    "surprise": "joy",   # Map surprise to joy for upbeat music
+    "disgust": "anger"   # Map disgust to anger for intense music
+})
+
+
+class RoutingTables(namedtuple("RoutingTables", ["activities", "mood_replies", "emotion_map", "moods", "mtime"])):
+    """
+    One immutable snapshot of the routing tables. `moods` is the "moods"
+    section of data/emotion_responses.json (emotion -> responses, playlists);
+    `mtime` is the file's st_mtime_ns it was read at (None if missing).
+    """
+    __slots__ = ()
+
+    def emotion_for(self, mood):
+        """Map an ML mood label to an emotion_responses.json category."""
+        return self.emotion_map.get(mood.lower(), "neutral")
+
+    def playlist_keywords(self, emotion):
+        return self.moods.get(emotion, {}).get("playlists")
+
+    def responses(self, emotion):
+        return self.moods.get(emotion, {}).get("responses")
+
+
+class RoutingTableStore:
+    """
+    Loads emotion_responses.json once and hands out the same RoutingTables
+    snapshot until the file changes. The mtime is checked at most every
+    `check_interval` seconds, so the hot path is a clock read. If a changed
+    file cannot be parsed, the previous tables are kept.
+    """
+    def __init__(self, path=EMOTION_RESPONSES_PATH, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._tables = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the current RoutingTables, reloading them if the file's mtime changed."""
+        tables = self._tables
+        if tables is not None and time.monotonic() < self._next_check:
+            return tables
+        with self._lock:
+            now = time.monotonic()
+            if self._tables is None or now >= self._next_check:
+                self._next_check = now + self.check_interval
+                try:
+                    mtime = os.stat(self.path).st_mtime_ns
+                except OSError:
+                    mtime = None
+                if self._tables is None or mtime != self._tables.mtime:
+                    self._tables = self._load(mtime)
+            return self._tables
+
+    def _load(self, mtime):
+        moods = {}
+        if mtime is None:
+            print(f"[WARNING] Emotion responses not found at {self.path}")
+        else:
+            try:
+                with open(self.path, "rb") as f:
+                    moods = json.load(f)["moods"]
+                print(f"[INFO] Loaded routing tables from {self.path}")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[ERROR] Could not load routing tables from {self.path}: {e}")
+                if self._tables is not None:
+                    # Keep serving the last good tables until the file changes again
+                    return self._tables._replace(mtime=mtime)
+        return RoutingTables(ACTIVITY_RESPONSES, MOOD_RESPONSES, EMOTION_MAP, _freeze(moods), mtime)
+
+
+_shared_store = RoutingTableStore()
+
+
+def shared_routing_tables():
+    """The process-wide RoutingTableStore used by the engine and the chatbot by default."""
+    return _shared_store
@@ -0,0 +1,93 @@
+# utils/search_executor.py
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SearchCancelled(Exception):
+    """Raised inside a search when a newer request has superseded it."""
+
+
+class SearchRequest:
+    """A search's id plus the cooperative cancellation flag its worker checks."""
+    def __init__(self, request_id):
+        self.request_id = request_id
+        self._cancelled = threading.Event()
+        self.future = None
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        # Searches that haven't started yet are dropped from the pool's queue
+        if self.future is not None:
+            self.future.cancel()
+
+    def check(self):
+        """Call between steps of a search; raises SearchCancelled once superseded."""
+        if self.cancelled:
+            raise SearchCancelled(self.request_id)
+
+
+class SearchExecutor:
+    """
+    Runs searches on a small, bounded thread pool where each new search
+    supersedes the previous one.
+
+    `submit(fn, *args)` calls `fn(request, *args)` on a worker. Results go
+    back through `post(request, kind, payload)`, which puts
+    `(request_id, kind, payload)` on `result_queue` unless the request was
+    superseded; the UI can additionally drop anything that isn't
+    `is_current`, since a result may have been posted just before a newer
+    search started. A search that raises is reported as an "Error" result.
+    """
+    def __init__(self, result_queue, max_workers=2):
+        self.result_queue = result_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="spotify-search")
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._current = None
+
+    def submit(self, fn, *args):
+        with self._lock:
+            if self._current is not None:
+                self._current.cancel()
+            request = SearchRequest(next(self._ids))
+            self._current = request
+            request.future = self._executor.submit(self._run, request, fn, args)
+        return request
+
+    def _run(self, request, fn, args):
+        if request.cancelled:
+            return
+        try:
+            fn(request, *args)
+        except SearchCancelled:
+            print(f"[INFO] Search #{request.request_id} was superseded by a newer request")
+        except Exception as e:
+            # Post the failure so the UI's completion path (button, status, trace) still runs
+            print(f"[ERROR] Search #{request.request_id} failed: {type(e).__name__}: {e}")
+            self.post(request, "Error", str(e) or type(e).__name__)
+
+    def post(self, request, kind, payload):
+        """Send a result to the UI; returns False (and drops it) if the request is stale."""
+        if request.cancelled:
+            return False
+        self.result_queue.put((request.request_id, kind, payload))
+        return True
+
+    def is_current(self, request_id):
+        current = self._current
+        return current is not None and current.request_id == request_id
+
+    def cancel_all(self):
+        with self._lock:
+            if self._current is not None:
+                self._current.cancel()
+                self._current = None
+
+    def shutdown(self):
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,198 @@
+# utils/session_log.py
+import os
+import re
+import glob
+import json
+import queue
+import threading
+from datetime import datetime
+
+PART_SUFFIX = re.compile(r"\.\d{4}\.jsonl$")
+
+
+class SessionLogWriter:
+    """
+    Append-only session log written by a background thread.
+
+    Samples are queued by `write`/`write_many` (never blocking on disk) and
+    the writer appends whatever has queued up as one batch of compact JSON
+    lines, `[metric, value, epoch_seconds]`, flushing after every batch, so
+    a crash loses at most the batch in flight. Each part file starts with a
+    {"type": "session"} header; when a part reaches `max_bytes` the log
+    rotates to the next one, and with `max_files` only that many parts are
+    kept. Parts are named session_<start>.<part>.jsonl.
+    """
+    def __init__(self, log_dir, session_start, max_bytes=8 * 1024 * 1024, max_files=None, batch_size=1000):
+        self.log_dir = log_dir
+        self.session_start = session_start
+        self.base = os.path.join(log_dir, f"session_{session_start.strftime('%Y%m%d_%H%M%S')}")
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.batch_size = batch_size
+        self.part = -1
+        self.path = None
+        self.records = 0
+        self._file = None
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="session-log", daemon=True)
+
+    def start(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._open_next_part()
+        self._thread.start()
+        return self
+
+    def write(self, metric_name, value, timestamp):
+        self._queue.put((metric_name, value, timestamp))
+
+    def write_many(self, samples):
+        for sample in samples:
+            self._queue.put(sample)
+
+    def flush(self, timeout=5.0):
+        """Block until everything queued so far is on disk (or `timeout` passes); returns True if it is."""
+        written = threading.Event()
+        self._queue.put(written)
+        return written.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Write what is queued plus an end record, then stop the writer."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _open_next_part(self):
+        if self._file is not None:
+            self._file.close()
+        self.part += 1
+        self.path = f"{self.base}.{self.part:04d}.jsonl"
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps({"type": "session", "session_start": self.session_start.isoformat(),
+                                     "part": self.part}) + "\n")
+        self._file.flush()
+        if self.max_files:
+            for old_part in session_log_parts(self.base)[:-self.max_files]:
+                os.remove(old_part)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines, waiting, closing = [], [], False
+            for item in batch:
+                if item is None:
+                    closing = True
+                elif isinstance(item, threading.Event):
+                    waiting.append(item)
+                else:
+                    try:
+                        lines.append(_encode_sample(*item))
+                    except (TypeError, ValueError) as e:
+                        # One bad sample must not stop the writer
+                        print(f"[WARNING] Skipping unloggable sample {item!r}: {e}")
+            try:
+                if lines:
+                    self._file.write("\n".join(lines) + "\n")
+                    self.records += len(lines)
+                if closing:
+                    self._file.write(json.dumps({"type": "end", "session_end": datetime.now().isoformat()}) + "\n")
+                    self._file.close()
+                    self._file = None
+                else:
+                    self._file.flush()
+                    if self._file.tell() >= self.max_bytes:
+                        self._open_next_part()
+            except OSError as e:
+                print(f"[ERROR] Could not write session log {self.path}: {e}")
+            for event in waiting:
+                event.set()
+            if closing:
+                return
+
+
+def _encode_sample(name, value, timestamp):
+    """One log line; values are coerced to float so NumPy scalars encode too."""
+    return json.dumps([str(name), float(value), round(float(timestamp), 6)], separators=(",", ":"),
+                      allow_nan=False)
+
+
+def session_log_parts(path):
+    """All part files of the session log that `path` (a part file or the session_<start> prefix) belongs to."""
+    base = PART_SUFFIX.sub("", path)
+    if base.endswith(".jsonl"):
+        base = base[:-len(".jsonl")]
+    return sorted(glob.glob(glob.escape(base) + ".[0-9][0-9][0-9][0-9].jsonl"))
+
+
+def read_session_log(path):
+    """
+    Rebuild a session from its log parts, in the format save_session_data
+    writes (and load_session_data returns). A line cut short by a crash is
+    skipped; without an end record the last sample's time is the session end.
+    """
+    metrics, metric_timestamps = {}, {}
+    session_start = session_end = None
+    last_timestamp = None
+    parts = session_log_parts(path)
+    if not parts:
+        raise FileNotFoundError(f"No session log parts found for {path}")
+    for part in parts:
+        with open(part, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    if record.get("type") == "session" and session_start is None:
+                        session_start = record["session_start"]
+                    elif record.get("type") == "end":
+                        session_end = record["session_end"]
+                    continue
+                name, value, timestamp = record
+                metrics.setdefault(name, []).append(value)
+                metric_timestamps.setdefault(name, []).append(datetime.fromtimestamp(timestamp).isoformat())
+                last_timestamp = timestamp if last_timestamp is None else max(last_timestamp, timestamp)
+
+    if session_end is None:
+        session_end = datetime.fromtimestamp(last_timestamp).isoformat() if last_timestamp else session_start
+    data = {
+        "session_start": session_start,
+        "session_end": session_end,
+        "metrics": metrics,
+        "metric_timestamps": metric_timestamps,
+        "timestamps": sorted(ts for stamps in metric_timestamps.values() for ts in stamps),
+    }
+    if metrics.get("response_times"):
+        from utils.streaming_stats import QuantileSketch
+        sketch = QuantileSketch()
+        for value in metrics["response_times"]:
+            sketch.add(value)
+        data["response_time_quantiles"] = sketch.summary()
+    return data
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Read a streaming session log.")
+    parser.add_argument("path", help="Any part file of the session (or its session_<start> prefix)")
+    parser.add_argument("--output", help="Write the rebuilt session as one JSON file (the save_session_data format)")
+    args = parser.parse_args()
+
+    data = read_session_log(args.path)
+    print(f"Session {data['session_start']} -> {data['session_end']} "
+          f"({len(session_log_parts(args.path))} part(s))")
+    for name, values in sorted(data["metrics"].items()):
+        print(f"  {name:<28} {len(values):>8} samples  mean {sum(values) / len(values):.4f}")
+    if "response_time_quantiles" in data:
+        q = data["response_time_quantiles"]
+        print(f"  response time p50={q['p50']:.3f}s p95={q['p95']:.3f}s p99={q['p99']:.3f}s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(data, f, indent=4)
+        print(f"[SUCCESS] Wrote {args.output}")
@@ -0,0 +1,66 @@
+# utils/speech_backends.py
+from abc import ABC, abstractmethod
+
+import speech_recognition as sr
+
+
+class SpeechBackend(ABC):
+    """
+    A speech recognition engine behind a common interface.
+
+    `recognize` takes an `sr.AudioData` and returns the transcript. Like the
+    speech_recognition engines it wraps, it raises `sr.UnknownValueError`
+    when nothing intelligible was heard and `sr.RequestError` when the engine
+    itself is unavailable.
+    """
+    name = "base"
+    offline = False
+
+    def __init__(self, recognizer=None):
+        self.recognizer = recognizer or sr.Recognizer()
+
+    @abstractmethod
+    def recognize(self, audio):
+        """Transcribe `audio` (an `sr.AudioData`)."""
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class GoogleBackend(SpeechBackend):
+    """Google Web Speech API (online, needs a network round-trip per utterance)."""
+    name = "google"
+
+    def __init__(self, recognizer=None, language="en-US"):
+        super().__init__(recognizer)
+        self.language = language
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_google(audio, language=self.language)
+
+
+class SphinxBackend(SpeechBackend):
+    """CMU PocketSphinx, decoded locally with no network access (pip install pocketsphinx)."""
+    name = "sphinx"
+    offline = True
+
+    def __init__(self, recognizer=None, language="en-US", keyword_entries=None):
+        super().__init__(recognizer)
+        self.language = language
+        self.keyword_entries = keyword_entries
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_sphinx(audio, language=self.language, keyword_entries=self.keyword_entries)
+
+
+BACKENDS = {backend.name: backend for backend in (GoogleBackend, SphinxBackend)}
+
+
+def get_backend(backend, recognizer=None):
+    """Return a backend instance from a name in BACKENDS or an existing SpeechBackend."""
+    if isinstance(backend, SpeechBackend):
+        return backend
+    try:
+        return BACKENDS[backend](recognizer)
+    except KeyError:
+        raise ValueError(f"Unknown speech backend '{backend}'. Available: {', '.join(BACKENDS)}")
@@ -0,0 +1,142 @@
+# utils/streaming_stats.py
+import math
+import time
+
+# numpy is imported when the first buffer or sketch is created, not at import
+# time, so the app can import the analyzer without paying for numpy at startup.
+
+
+class RingBuffer:
+    """
+    Fixed-capacity NumPy buffer of (timestamp, value) samples. Appends are
+    O(1); once full, each append overwrites the oldest sample. `total` counts
+    every sample ever appended.
+    """
+    def __init__(self, capacity=10000):
+        import numpy as np
+        self.capacity = capacity
+        self._values = np.zeros(capacity, dtype=np.float64)
+        self._times = np.zeros(capacity, dtype=np.float64)
+        self._next = 0
+        self.total = 0
+
+    def append(self, value, timestamp=None):
+        i = self._next
+        self._values[i] = value
+        self._times[i] = time.time() if timestamp is None else timestamp
+        self._next = (i + 1) % self.capacity
+        self.total += 1
+
+    def extend(self, values, timestamps):
+        for value, timestamp in zip(values, timestamps):
+            self.append(value, timestamp)
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def __iter__(self):
+        return iter(self.values().tolist())
+
+    def _ordered(self, column):
+        import numpy as np
+        if self.total <= self.capacity:
+            return column[:self.total].copy()
+        return np.concatenate((column[self._next:], column[:self._next]))
+
+    def values(self):
+        """The retained values, oldest first (a copy)."""
+        return self._ordered(self._values)
+
+    def timestamps(self):
+        """Epoch seconds of the retained values, aligned with values()."""
+        return self._ordered(self._times)
+
+
+class QuantileSketch:
+    """
+    Streaming quantiles with bounded relative error, in the style of
+    DDSketch: values are counted in log-spaced buckets whose bounds are
+    within `relative_accuracy` of each other, so every quantile is reported
+    to within that relative error. Memory is fixed by the value range
+    (values outside [min_value, max_value] land in the edge buckets) and each
+    add is O(1). Sketches with the same parameters can be merged.
+    """
+    def __init__(self, relative_accuracy=0.01, min_value=1e-4, max_value=1e4):
+        import numpy as np
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._offset = math.ceil(math.log(min_value) / self._log_gamma)
+        size = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value):
+        if value <= self.min_value:
+            return 0
+        index = math.ceil(math.log(value) / self._log_gamma) - self._offset
+        return min(index, len(self.counts) - 1)
+
+    def add(self, value):
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def _bucket_values(self):
+        import numpy as np
+        # Bucket i holds (gamma^(k-1), gamma^k] with k = i + offset; this point is within the accuracy of both ends
+        exponents = np.arange(len(self.counts)) + self._offset
+        return 2 * self.gamma ** exponents / (self.gamma + 1)
+
+    def quantile(self, q):
+        """Estimated q-quantile (0 <= q <= 1); 0.0 while empty."""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs):
+        import numpy as np
+        if not self.count:
+            return [0.0 for _ in qs]
+        cumulative = np.cumsum(self.counts)
+        ranks = np.asarray(qs, dtype=np.float64) * (self.count - 1)
+        indices = np.searchsorted(cumulative, ranks, side="right")
+        estimates = self._bucket_values()[np.minimum(indices, len(self.counts) - 1)]
+        return np.clip(estimates, self.min, self.max).tolist()
+
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def histogram(self, bins=20):
+        """(counts, edges) over `bins` log-spaced bins between the observed min and max."""
+        import numpy as np
+        if not self.count:
+            return np.zeros(bins, dtype=np.int64), np.zeros(bins + 1)
+        low = max(self.min, self.min_value)
+        high = max(self.max, low * self.gamma)
+        edges = np.geomspace(low, high, bins + 1)
+        values = np.clip(self._bucket_values(), low, high)
+        counts, _ = np.histogram(values, bins=edges, weights=self.counts)
+        return counts.astype(np.int64), edges
+
+    def merge(self, other):
+        """Add another sketch's samples to this one (both need the same parameters)."""
+        if len(other.counts) != len(self.counts) or other.gamma != self.gamma:
+            raise ValueError("Can only merge sketches with the same accuracy and range")
+        self.counts += other.counts
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def summary(self, qs=(0.5, 0.95, 0.99)):
+        p = self.quantiles(qs)
+        result = {"count": self.count, "mean": self.mean()}
+        result.update({f"p{round(q * 100):d}": value for q, value in zip(qs, p)})
+        result["max"] = self.max if self.count else 0.0
+        return result
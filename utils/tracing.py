@@ -0,0 +1,196 @@
+# utils/tracing.py
+import bisect
+import itertools
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in milliseconds; a last, open-ended bucket catches the rest
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# start/end are seconds since the trace started; thread is the recording thread's name
+Span = namedtuple("Span", ["name", "start", "end", "thread", "attrs"])
+
+
+class Trace:
+    """
+    The timeline of one request: named spans with start/end offsets from the
+    moment the request arrived. Spans can be recorded from any thread, and a
+    span opened with `begin` on one thread can be closed with `end` on
+    another (queue hand-offs).
+    """
+    def __init__(self, request_id, text="", tracer=None):
+        self.request_id = request_id
+        self.text = text
+        self.tracer = tracer
+        self.started_at = time.time()
+        self.spans = []
+        self.attrs = {}
+        self.duration = None
+        self._t0 = time.perf_counter()
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def now(self):
+        return time.perf_counter() - self._t0
+
+    def begin(self, name, **attrs):
+        """Open a span to be closed later with end(name)."""
+        with self._lock:
+            self._open[name] = (self.now(), attrs)
+
+    def end(self, name, **attrs):
+        with self._lock:
+            opened = self._open.pop(name, None)
+        if opened is not None:
+            start, begin_attrs = opened
+            self._add(name, start, self.now(), {**begin_attrs, **attrs})
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time the block as a span; yields its attrs dict so the block can add to it."""
+        start = self.now()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            self._add(name, start, self.now(), attrs)
+
+    def _add(self, name, start, end, attrs):
+        span = Span(name, start, end, threading.current_thread().name, attrs)
+        with self._lock:
+            self.spans.append(span)
+
+    def finish(self, **attrs):
+        """End the trace and report it to its tracer (only the first call counts); returns its seconds."""
+        with self._lock:
+            if self.duration is not None:
+                return self.duration
+            self.duration = self.now()
+            self.attrs.update(attrs)
+            self._open.clear()  # Hand-offs that never completed (e.g. a superseded search)
+        if self.tracer is not None:
+            self.tracer._finished(self)
+        return self.duration
+
+    def waterfall(self, width=40):
+        """Render the spans as a text waterfall, one line per span in start order."""
+        total = self.duration if self.duration is not None else self.now()
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        attrs = " ".join(f"{k}={v}" for k, v in self.attrs.items())
+        lines = [f"[TRACE] #{self.request_id} '{self.text[:40]}' {total * 1000:.1f} ms {attrs}".rstrip()]
+        scale = width / total if total > 0 else 0.0
+        name_width = max((len(s.name) for s in spans), default=0)
+        for s in spans:
+            offset = min(width - 1, int(s.start * scale))
+            length = max(1, min(width - offset, int(round((s.end - s.start) * scale))))
+            bar = "." * offset + "#" * length
+            detail = " ".join(f"{k}={v}" for k, v in s.attrs.items())
+            lines.append(f"  {s.name:<{name_width}} {s.start * 1000:8.1f} +{(s.end - s.start) * 1000:8.1f} ms "
+                         f"|{bar:<{width}}| {s.thread} {detail}".rstrip())
+        return "\n".join(lines)
+
+
+class _NullTrace:
+    """Stands in for a Trace when nobody is tracing, so callers need no checks."""
+    request_id = None
+
+    def begin(self, name, **attrs):
+        pass
+
+    def end(self, name, **attrs):
+        pass
+
+    @contextmanager
+    def span(self, name, **attrs):
+        yield attrs
+
+    def finish(self, **attrs):
+        return 0.0
+
+
+NO_TRACE = _NullTrace()
+
+
+class StageHistogram:
+    """Latency histogram of one stage over fixed log-spaced millisecond buckets."""
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-quantile (capped at the observed max)."""
+        rank = p * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(BUCKET_BOUNDS_MS[i], self.max_ms) if i < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return 0.0
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+            "buckets": dict(zip([*map(str, BUCKET_BOUNDS_MS), "inf"], self.buckets)),
+        }
+
+
+class Tracer:
+    """
+    Starts traces and, as they finish, keeps the last `keep` of them and a
+    StageHistogram per span name (plus "total" for whole requests).
+    `on_finish(trace)` is called on the thread that finished the trace.
+    """
+    def __init__(self, keep=100, on_finish=None):
+        self.recent = deque(maxlen=keep)
+        self.stages = {}
+        self.on_finish = on_finish
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, text="", request_id=None):
+        return Trace(request_id if request_id is not None else next(self._ids), text, self)
+
+    def _finished(self, trace):
+        with self._lock:
+            self.recent.append(trace)
+            for s in trace.spans:
+                self._stage(s.name).add((s.end - s.start) * 1000)
+            self._stage("total").add(trace.duration * 1000)
+        if self.on_finish is not None:
+            self.on_finish(trace)
+
+    def _stage(self, name):
+        histogram = self.stages.get(name)
+        if histogram is None:
+            histogram = self.stages[name] = StageHistogram()
+        return histogram
+
+    def summary(self):
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.stages.items())}
+
+    def report(self):
+        """Per-stage latency table (percentiles are histogram bucket bounds)."""
+        lines = [f"{'stage':<28} {'count':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:<28} {s['count']:>6} {s['mean_ms']:>9.1f} {s['p50_ms']:>9.1f} "
+                         f"{s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}")
+        return "\n".join(lines)
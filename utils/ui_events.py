@@ -0,0 +1,52 @@
+# utils/ui_events.py
+import queue
+import threading
+
+
+class EventQueue(queue.Queue):
+    """
+    A queue that wakes the Tk main loop when worker threads put items on it.
+
+    Each `put` schedules one Tk virtual event unless a wake-up is already
+    pending, so a burst of results costs a single wake-up and the handler
+    bound with `bind` drains everything queued so far. Nothing runs while the
+    queue is idle, unlike re-arming `after()` polling.
+    """
+    def __init__(self, widget, event_name, maxsize=0):
+        super().__init__(maxsize)
+        self.widget = widget
+        self.event_name = event_name
+        self._signal_lock = threading.Lock()
+        self._signaled = False
+
+    def bind(self, handler):
+        """Call `handler()` on the Tk thread whenever items are waiting."""
+        self.widget.bind(self.event_name, lambda event: handler())
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        with self._signal_lock:
+            if self._signaled:
+                return
+            self._signaled = True
+        try:
+            # Thread-safe with a threaded Tcl; "tail" queues it behind pending UI events
+            self.widget.event_generate(self.event_name, when="tail")
+        except Exception as e:
+            with self._signal_lock:
+                self._signaled = False
+            # RuntimeError means the main loop has stopped (window closing)
+            if not isinstance(e, RuntimeError):
+                print(f"[WARNING] Could not signal {self.event_name}: {e}")
+
+    def drain(self):
+        """Return every queued item, oldest first. Call from the Tk thread only."""
+        # Clear the flag before reading so an item put during the drain signals again
+        with self._signal_lock:
+            self._signaled = False
+        items = []
+        while True:
+            try:
+                items.append(self.get_nowait())
+            except queue.Empty:
+                return items
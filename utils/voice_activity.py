@@ -0,0 +1,88 @@
+# utils/voice_activity.py
+from collections import deque
+
+import numpy as np
+
+_SAMPLE_TYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+def pcm_rms(buffer, sample_width=2):
+    """Root-mean-square energy of a PCM buffer (same scale as speech_recognition's threshold)."""
+    samples = np.frombuffer(buffer, dtype=_SAMPLE_TYPES[sample_width])
+    if not len(samples):
+        return 0.0
+    return float(np.sqrt(np.mean(samples.astype(np.float64) ** 2)))
+
+
+class VADSegmenter:
+    """
+    Energy-based voice activity detection over a stream of PCM buffers.
+
+    Buffers louder than `energy_threshold` count as speech. Once speech has
+    started, a pause of `segment_pause` seconds (or `max_segment` seconds of
+    continuous speech) closes a segment so it can be decoded while capture
+    continues, and `end_pause` seconds of silence ends the utterance.
+    Segments that contain no speech are dropped.
+    """
+    def __init__(self, sample_rate, sample_width, energy_threshold,
+                 segment_pause=0.3, end_pause=0.8, max_segment=4.0, pre_roll=0.2):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.energy_threshold = energy_threshold
+        self.segment_pause = segment_pause
+        self.end_pause = end_pause
+        self.max_segment = max_segment
+        self.pre_roll = pre_roll
+
+        self.speech_started = False
+        self.audio_seconds = 0.0
+        self.onset_seconds = None
+        self._pre_roll = deque()
+        self._pre_roll_seconds = 0.0
+        self._segment = []
+        self._segment_seconds = 0.0
+        self._voiced = False
+        self._silence = 0.0
+
+    def _seconds(self, buffer):
+        return len(buffer) / float(self.sample_rate * self.sample_width)
+
+    def feed(self, buffer):
+        """Process one buffer; return (closed_segment_bytes_or_None, utterance_finished)."""
+        seconds = self._seconds(buffer)
+        self.audio_seconds += seconds
+        loud = pcm_rms(buffer, self.sample_width) > self.energy_threshold
+
+        if not self.speech_started:
+            if not loud:
+                # Keep a little audio from before the onset so the first word isn't clipped
+                self._pre_roll.append(buffer)
+                self._pre_roll_seconds += seconds
+                while self._pre_roll and self._pre_roll_seconds - self._seconds(self._pre_roll[0]) >= self.pre_roll:
+                    self._pre_roll_seconds -= self._seconds(self._pre_roll.popleft())
+                return None, False
+            self.speech_started = True
+            self.onset_seconds = self.audio_seconds - seconds
+            self._segment = list(self._pre_roll)
+            self._segment_seconds = self._pre_roll_seconds
+            self._pre_roll.clear()
+
+        self._segment.append(buffer)
+        self._segment_seconds += seconds
+        if loud:
+            self._voiced = True
+            self._silence = 0.0
+        else:
+            self._silence += seconds
+
+        if self._silence >= self.end_pause:
+            return self.flush(), True
+        if self._voiced and (self._silence >= self.segment_pause or self._segment_seconds >= self.max_segment):
+            return self.flush(), False
+        return None, False
+
+    def flush(self):
+        """Close the current segment and return its bytes, or None if it holds no speech."""
+        segment, voiced = self._segment, self._voiced
+        self._segment, self._segment_seconds, self._voiced = [], 0.0, False
+        return b"".join(segment) if voiced else None
@@ -1,54 +1,296 @@
 # utils/voice_input.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import speech_recognition as sr
 
+from utils.speech_backends import get_backend
+
 class SpeechToTextConverter:
     """
-    A class to handle speech-to-text conversion using the computer's microphone.
+    A class to handle speech-to-text conversion from the microphone, WAV files
+    or raw PCM, using a pluggable recognition backend (see speech_backends).
+
+    The microphone stream is opened once and kept open. Ambient noise is
+    calibrated when the stream opens and then recalibrated in the background
+    every `recalibrate_interval` seconds while idle, so listening starts
+    immediately.
+
+    The streaming methods split speech into segments at short pauses and
+    decode each segment while capture continues, reporting partial
+    transcripts as they arrive.
     """
-    def __init__(self):
-        """Initializes the speech recognizer."""
+    # A background reading this many times above the current threshold is
+    # more likely someone talking than ambient noise, so it is discarded
+    MAX_RECALIBRATION_RATIO = 3.0
+
+    def __init__(self, backend="google", recalibrate_interval=30.0, calibration_duration=1.0,
+                 recalibration_duration=0.5, vad_options=None, decode_workers=2):
+        """Initializes the speech recognizer and backend ("google", "sphinx" or a SpeechBackend).
+
+        `vad_options` are passed to VADSegmenter (segment_pause, end_pause,
+        max_segment, pre_roll); `decode_workers` segments decode concurrently.
+        """
         self.recognizer = sr.Recognizer()
+        self.backend = get_backend(backend, self.recognizer)
+        self.recalibrate_interval = recalibrate_interval
+        self.calibration_duration = calibration_duration
+        self.recalibration_duration = recalibration_duration
+        self.vad_options = vad_options or {}
+        self.decode_workers = decode_workers
+
+        self._microphone = None
+        self._source = None
+        # Serializes reads from the stream between listening and recalibration
+        self._stream_lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._recalibrator = None
+
+    @property
+    def is_open(self):
+        return self._source is not None
+
+    def open(self):
+        """Open the microphone stream and calibrate once (no-op if already open)."""
+        with self._open_lock:
+            if self._source is not None:
+                return
+            microphone = sr.Microphone()
+            source = microphone.__enter__()
+            print("🎤 Adjusting for ambient noise... Please wait.")
+            try:
+                with self._stream_lock:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=self.calibration_duration)
+            except Exception:
+                microphone.__exit__(None, None, None)
+                raise
+            self._microphone, self._source = microphone, source
+            self._stop.clear()
+            if self.recalibrate_interval:
+                self._recalibrator = threading.Thread(target=self._recalibrate_loop, name="mic-recalibration", daemon=True)
+                self._recalibrator.start()
+            print(f"[SUCCESS] Microphone ready (energy threshold {self.recognizer.energy_threshold:.0f}).")
 
-    def recognize_from_microphone(self):
+    def close(self):
+        """Stop background recalibration and release the microphone."""
+        with self._open_lock:
+            self._stop.set()
+            if self._source is None:
+                return
+            with self._stream_lock:
+                self._microphone.__exit__(None, None, None)
+                self._microphone, self._source = None, None
+
+    def _recalibrate_loop(self):
+        while not self._stop.wait(self.recalibrate_interval):
+            # Never hold up a listen that is in progress; try again next interval
+            if not self._stream_lock.acquire(blocking=False):
+                continue
+            try:
+                if self._source is not None:
+                    previous = self.recognizer.energy_threshold
+                    self.recognizer.adjust_for_ambient_noise(self._source, duration=self.recalibration_duration)
+                    if self.recognizer.energy_threshold > previous * self.MAX_RECALIBRATION_RATIO:
+                        self.recognizer.energy_threshold = previous
+            except Exception as e:
+                print(f"[WARNING] Background microphone recalibration failed: {e}")
+            finally:
+                self._stream_lock.release()
+
+    def listen(self, timeout=3, phrase_time_limit=5):
+        """Capture one phrase from the open stream and return it as AudioData."""
+        self.open()
+        with self._stream_lock:
+            print("[SUCCESS] Ready to listen. Please speak now.")
+            return self.recognizer.listen(self._source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+
+    def recognize_audio(self, audio):
         """
-        Captures audio from the microphone and converts it to text.
+        Converts captured audio to text with the configured backend.
 
         Returns:
             str: The recognized text as a string.
             None: If speech could not be recognized or an error occurred.
         """
-        with sr.Microphone() as source:
-            print("🎤 Adjusting for ambient noise... Please wait.")
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
-            print("[SUCCESS] Ready to listen. Please speak now.")
+        try:
+            text = self.backend.recognize(audio)
+            print(f"You said: {text}")
+            return text
+        except sr.UnknownValueError:
+            print(f"[ERROR] Speech recognition ({self.backend.name}) could not understand the audio.")
+            return None
+        except sr.RequestError as e:
+            print(f"[WARNING] Speech recognition backend '{self.backend.name}' is unavailable; {e}")
+            return None
+
+    def recognize_from_microphone(self, timeout=3, phrase_time_limit=5):
+        """Captures one phrase from the microphone and converts it to text (None on failure)."""
+        try:
+            # Listen for the user's input with a timeout
+            audio = self.listen(timeout=timeout, phrase_time_limit=phrase_time_limit)
+        except sr.WaitTimeoutError:
+            print("[WARNING] Listening timed out while waiting for phrase to start.")
+            return None
+        except (OSError, AttributeError) as e:
+            # No input device, or PyAudio is not installed
+            print(f"[ERROR] Microphone unavailable: {e}")
+            return None
+        print("🗣️ Recognizing...")
+        return self.recognize_audio(audio)
+
+    def recognize_stream(self, buffers, sample_rate=16000, sample_width=2, on_partial=None,
+                         timeout=3, phrase_time_limit=10):
+        """
+        Decode an iterable of PCM buffers segment by segment while it is still being captured.
 
+        `on_partial(text)` is called from a decoder thread with the transcript
+        so far whenever the next segment in order finishes decoding; every such
+        call has returned before this method does. Returns
+        the final transcript (None if nothing was understood). Raises
+        sr.WaitTimeoutError if speech doesn't start within `timeout` seconds
+        of audio and sr.RequestError if the backend is unavailable.
+        """
+        from utils.voice_activity import VADSegmenter
+
+        segmenter = VADSegmenter(sample_rate, sample_width, self.recognizer.energy_threshold, **self.vad_options)
+        texts = []  # One entry per segment, None until it is decoded
+        futures = []
+        lock = threading.Lock()
+        emitted = [0]
+        callbacks_done = threading.Semaphore(0)  # Released once per finished on_done
+
+        def decode(pcm):
             try:
-                # Listen for the user's input with a timeout
-                audio = self.recognizer.listen(source, timeout=3, phrase_time_limit=5)
-                print("🗣️ Recognizing...")
-
-                # Use Google's speech recognition engine to convert audio to text
-                text = self.recognizer.recognize_google(audio)
-                print(f"You said: {text}")
-                return text
-
-            except sr.WaitTimeoutError:
-                print("[WARNING] Listening timed out while waiting for phrase to start.")
-                return None
+                return self.backend.recognize(sr.AudioData(pcm, sample_rate, sample_width))
             except sr.UnknownValueError:
-                print("[ERROR] Google Speech Recognition could not understand the audio.")
-                return None
-            except sr.RequestError as e:
-                print(f"[WARNING] Could not request results from Google Speech Recognition service; {e}")
-                return None
+                return ""
+
+        def on_done(index, future):
+            try:
+                with lock:
+                    texts[index] = "" if future.cancelled() or future.exception() else future.result()
+                    ready = 0
+                    while ready < len(texts) and texts[ready] is not None:
+                        ready += 1
+                    if ready <= emitted[0]:
+                        return
+                    emitted[0] = ready
+                    partial = " ".join(text for text in texts[:ready] if text)
+                if on_partial and partial:
+                    on_partial(partial)
+            finally:
+                callbacks_done.release()
+
+        executor = ThreadPoolExecutor(max_workers=self.decode_workers, thread_name_prefix="speech-decode")
+
+        def submit(pcm):
+            with lock:
+                texts.append(None)
+                index = len(texts) - 1
+            future = executor.submit(decode, pcm)
+            futures.append(future)
+            future.add_done_callback(lambda f: on_done(index, f))
+
+        try:
+            for buffer in buffers:
+                segment, finished = segmenter.feed(buffer)
+                if segment:
+                    submit(segment)
+                if finished:
+                    break
+                if not segmenter.speech_started:
+                    if segmenter.audio_seconds >= timeout:
+                        raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                elif phrase_time_limit and segmenter.audio_seconds - segmenter.onset_seconds >= phrase_time_limit:
+                    break
+            segment = segmenter.flush()
+            if segment:
+                submit(segment)
+
+            # Only the segments still decoding are waited on here
+            results = [future.result() for future in futures]
+            # result() can return before a segment's callback has sent its partial; wait for those too,
+            # so no partial arrives after the caller has posted the final transcript
+            for _ in futures:
+                callbacks_done.acquire()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return " ".join(text for text in results if text) or None
+
+    def recognize_from_microphone_streaming(self, on_partial=None, timeout=3, phrase_time_limit=10):
+        """Streams one utterance from the microphone through recognize_stream (None on failure)."""
+        try:
+            self.open()
+            source = self._source
+
+            def buffers():
+                while True:
+                    yield source.stream.read(source.CHUNK)
+
+            with self._stream_lock:
+                print("[SUCCESS] Ready to listen. Please speak now.")
+                text = self.recognize_stream(buffers(), source.SAMPLE_RATE, source.SAMPLE_WIDTH,
+                                             on_partial=on_partial, timeout=timeout,
+                                             phrase_time_limit=phrase_time_limit)
+        except sr.WaitTimeoutError:
+            print("[WARNING] Listening timed out while waiting for phrase to start.")
+            return None
+        except sr.RequestError as e:
+            print(f"[WARNING] Speech recognition backend '{self.backend.name}' is unavailable; {e}")
+            return None
+        except (OSError, AttributeError) as e:
+            print(f"[ERROR] Microphone unavailable: {e}")
+            return None
+        if text:
+            print(f"You said: {text}")
+        else:
+            print(f"[ERROR] Speech recognition ({self.backend.name}) could not understand the audio.")
+        return text
+
+    @staticmethod
+    def iter_pcm(stream, chunk_size=1024, sample_width=2):
+        """Yield `chunk_size`-frame buffers from a binary PCM stream (e.g. for recognize_stream)."""
+        return iter(lambda: stream.read(chunk_size * sample_width), b"")
+
+    @staticmethod
+    def load_file(path):
+        """Read a WAV/AIFF/FLAC file into AudioData."""
+        with sr.AudioFile(path) as source:
+            return sr.Recognizer().record(source)
+
+    @staticmethod
+    def pcm_to_audio(pcm, sample_rate=16000, sample_width=2):
+        """Wrap mono little-endian PCM (bytes or a readable binary stream) as AudioData."""
+        if hasattr(pcm, "read"):
+            pcm = b"".join(iter(lambda: pcm.read(1 << 16), b""))
+        return sr.AudioData(bytes(pcm), sample_rate, sample_width)
+
+    def recognize_from_file(self, path):
+        """Converts a recorded WAV/AIFF/FLAC file to text (None on failure)."""
+        return self.recognize_audio(self.load_file(path))
+
+    def recognize_from_pcm(self, pcm, sample_rate=16000, sample_width=2):
+        """Converts raw mono PCM bytes or a binary stream to text (None on failure)."""
+        return self.recognize_audio(self.pcm_to_audio(pcm, sample_rate, sample_width))
 
 # Example of how to use this file directly for testing
 if __name__ == "__main__":
-    converter = SpeechToTextConverter()
-    recognized_text = converter.recognize_from_microphone()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert speech to text.")
+    parser.add_argument("--backend", default="google", help="Recognition backend (google, sphinx)")
+    parser.add_argument("--file", help="Recognize a WAV/AIFF/FLAC file instead of the microphone")
+    args = parser.parse_args()
+
+    converter = SpeechToTextConverter(backend=args.backend)
+    if args.file:
+        recognized_text = converter.recognize_from_file(args.file)
+    else:
+        recognized_text = converter.recognize_from_microphone()
+        converter.close()
 
     if recognized_text:
         print("\n--- Recognition Result ---")
         print(f"Text: {recognized_text}")
     else:
-        print("\n--- No text was recognized ---")
\ No newline at end of file
+        print("\n--- No text was recognized ---")